@@ -0,0 +1,183 @@
+"""Административный HTTP API для управления получателями без перезапуска.
+
+Сервер слушает только локальный адрес. Маршруты:
+
+- ``GET /tenants`` - состояние всех получателей;
+- ``GET /tenants/<name>`` - состояние одного получателя;
+- ``POST /tenants`` - добавление получателя из JSON-описания
+  после проверки его учётных данных;
+- ``POST /tenants/<name>/pause``, ``/resume``, ``/poll`` - приостановка,
+  возобновление и внеочередной опрос;
+- ``DELETE /tenants/<name>`` - удаление получателя.
+"""
+import json
+import logging
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from exceptions import CheckTokensError
+from tenants import tenant_from_dict
+
+
+logger = logging.getLogger(__name__)
+
+
+HOST = '127.0.0.1'
+MAX_BODY = 64 * 1024
+ACTIONS = {
+    'pause': 'pause',
+    'resume': 'resume',
+    'poll': 'poll_soon',
+}
+
+
+class AdminError(Exception):
+    """Ошибка запроса с кодом ответа."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class AdminHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов к административному API."""
+
+    server_version = 'HomeworkBotAdmin'
+
+    @property
+    def runtime(self):
+        """Расписание получателей, которым управляет сервер."""
+        return self.server.runtime
+
+    def log_message(self, format, *args):
+        """Журнал запросов через логгер модуля."""
+        logger.info(f'{self.address_string()} {format % args}')
+
+    def _path(self):
+        parts = [unquote(part) for part in
+                 self.path.split('?', 1)[0].strip('/').split('/')]
+        if parts[0] != 'tenants':
+            raise AdminError(HTTPStatus.NOT_FOUND, 'Неизвестный адрес.')
+        return parts[1:]
+
+    def _tenant(self, name, method='get'):
+        try:
+            return getattr(self.runtime, method)(name)
+        except KeyError:
+            raise AdminError(HTTPStatus.NOT_FOUND,
+                             f'Получателя {name} нет.') from None
+
+    def _body(self):
+        try:
+            size = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            size = -1
+        if size < 0:
+            raise AdminError(HTTPStatus.BAD_REQUEST,
+                             'Некорректный заголовок Content-Length.')
+        if size > MAX_BODY:
+            raise AdminError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                             'Слишком большой запрос.')
+        try:
+            return json.loads(self.rfile.read(size) or b'null')
+        except ValueError as err:
+            raise AdminError(HTTPStatus.BAD_REQUEST,
+                             f'Некорректный JSON: {err}') from err
+
+    def _reply(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, route):
+        try:
+            status, data = route(self._path())
+        except AdminError as err:
+            status, data = err.status, {'error': str(err)}
+        self._reply(status, data)
+
+    def do_GET(self):
+        """Чтение состояния."""
+        self._handle(self._get)
+
+    def do_POST(self):
+        """Добавление получателя и действия с ним."""
+        self._handle(self._post)
+
+    def do_DELETE(self):
+        """Удаление получателя."""
+        self._handle(self._delete)
+
+    def _get(self, path):
+        if not path:
+            return HTTPStatus.OK, self.runtime.states()
+        if len(path) == 1:
+            return HTTPStatus.OK, self.runtime.state(self._tenant(path[0]))
+        raise AdminError(HTTPStatus.NOT_FOUND, 'Неизвестный адрес.')
+
+    def _post(self, path):
+        if not path:
+            try:
+                tenant = tenant_from_dict(self._body(),
+                                          self.server.default_period)
+            except ValueError as err:
+                raise AdminError(HTTPStatus.BAD_REQUEST, str(err)) from err
+            self._prepare(tenant)
+            try:
+                self.runtime.add(tenant)
+            except ValueError as err:
+                raise AdminError(HTTPStatus.CONFLICT, str(err)) from err
+            logger.warning(f'Добавлен получатель {tenant.name}.')
+            return HTTPStatus.CREATED, self.runtime.state(tenant)
+        if len(path) == 2 and path[1] in ACTIONS:
+            tenant = self._tenant(path[0], ACTIONS[path[1]])
+            logger.warning(f'Получатель {tenant.name}: {path[1]}.')
+            return HTTPStatus.OK, self.runtime.state(tenant)
+        raise AdminError(HTTPStatus.NOT_FOUND, 'Неизвестный адрес.')
+
+    def _prepare(self, tenant):
+        if self.server.prepare is None:
+            return
+        try:
+            self.server.prepare(tenant)
+        except CheckTokensError as err:
+            raise AdminError(HTTPStatus.UNPROCESSABLE_ENTITY,
+                             tenant.quarantined or str(err)) from err
+
+    def _delete(self, path):
+        if len(path) != 1:
+            raise AdminError(HTTPStatus.NOT_FOUND, 'Неизвестный адрес.')
+        tenant = self._tenant(path[0], 'remove')
+        logger.warning(f'Удалён получатель {tenant.name}.')
+        return HTTPStatus.OK, {'name': tenant.name}
+
+
+class AdminServer(ThreadingHTTPServer):
+    """HTTP-сервер административного API поверх ``TenantRuntime``.
+
+    ``prepare(tenant)`` вызывается перед добавлением получателя;
+    ``CheckTokensError`` из него отклоняет получателя.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, runtime, port, default_period, host=HOST,
+                 prepare=None):
+        self.runtime = runtime
+        self.default_period = default_period
+        self.prepare = prepare
+        super().__init__((host, port), AdminHandler)
+
+    def start(self):
+        """Обслуживание запросов в фоновом потоке."""
+        thread = threading.Thread(target=self.serve_forever,
+                                  name='admin-api', daemon=True)
+        thread.start()
+        logger.info('Административный API доступен на '
+                    f'{self.server_address[0]}:{self.server_address[1]}.')
+        return thread
@@ -0,0 +1,103 @@
+"""Загрузка истории статусов для получателей без отправки уведомлений."""
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import snapshot
+from runtime import TenantRuntime
+from tenants import homework_key
+
+
+logger = logging.getLogger(__name__)
+
+
+WORKERS = 8
+
+
+def merge_homeworks(homeworks):
+    """Последний статус каждой работы без повторов."""
+    latest = {}
+    for homework in homeworks:
+        key = homework_key(homework)
+        known = latest.get(key)
+        if known is None or (homework.get('date_updated') or '') >= (
+                known.get('date_updated') or ''):
+            latest[key] = homework
+    return list(latest.values())
+
+
+def seed_tenant(tenant, response):
+    """Заполнение кэша статусов и курсора получателя из ответа API."""
+    homeworks = merge_homeworks(response['homeworks'])
+    tenant.statuses.update(
+        (homework_key(homework), homework['status'])
+        for homework in homeworks)
+    tenant.cursor = response['current_date']
+    return homeworks
+
+
+def backfill(tenants, fetch, workers=WORKERS, on_homeworks=None):
+    """Параллельная загрузка истории всех получателей.
+
+    ``fetch(tenant)`` возвращает проверенный ответ API за всё время.
+    Ошибки отдельных получателей не прерывают загрузку остальных
+    и возвращаются словарём имя -> исключение.
+    """
+    def load(tenant):
+        homeworks = seed_tenant(tenant, fetch(tenant))
+        if on_homeworks is not None:
+            on_homeworks(tenant, homeworks)
+        return len(homeworks)
+
+    errors = {}
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers,
+                            thread_name_prefix='backfill') as executor:
+        futures = {tenant.name: executor.submit(load, tenant)
+                   for tenant in tenants}
+    loaded = 0
+    for name, future in futures.items():
+        try:
+            loaded += future.result()
+        except Exception as error:
+            logger.error(f'[{name}] Не удалось загрузить историю: {error}')
+            errors[name] = error
+    logger.info(f'Загружена история {len(tenants) - len(errors)} '
+                f'получателей ({loaded} работ) за '
+                f'{time.monotonic() - started:.2f} с.')
+    return errors
+
+
+def main():
+    """Загрузка истории получателей в базу истории и в снимок.
+
+    Курсоры и статусы сохраняются в ``SNAPSHOT_PATH``, откуда их
+    загружает бот при запуске, а работы - в ``HISTORY_DB_PATH``. Если
+    не задано ни то, ни другое, загружать историю некуда.
+    """
+    import homework
+
+    if not (homework.SNAPSHOT_PATH or homework.HISTORY_DB_PATH):
+        logger.critical('Не задан ни SNAPSHOT_PATH, ни HISTORY_DB_PATH: '
+                        'загруженную историю некуда сохранить.')
+        return 2
+    tenants = homework.configured_tenants()
+    history = (homework.HistoryStore(homework.HISTORY_DB_PATH)
+               if homework.HISTORY_DB_PATH else None)
+
+    def store(tenant, homeworks):
+        for item in homeworks:
+            homework.record_status(history, item, tenant.name)
+
+    errors = backfill(tenants, homework.fetch_history, on_homeworks=store)
+    if history is not None:
+        history.close()
+    if homework.SNAPSHOT_PATH:
+        snapshot.save(homework.SNAPSHOT_PATH,
+                      TenantRuntime(tenants, lambda tenant: None))
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Сравнение декодеров JSON на больших ответах API.
+
+Запуск: python benchmarks/bench_decoding.py [число работ]
+"""
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from decoding import ProjectingDecoder, StdlibDecoder, orjson  # noqa: E402
+
+KEYS = ('homeworks', 'current_date', 'homework_name', 'status', 'id',
+        'date_updated')
+STATUSES = ('approved', 'reviewing', 'rejected')
+
+
+def make_payload(size):
+    """Тело ответа API с указанным числом работ."""
+    return json.dumps({
+        'homeworks': [
+            {'id': number,
+             'homework_name': f'user__hw{number}.zip',
+             'status': STATUSES[number % len(STATUSES)],
+             'reviewer_comment': 'Хорошая работа, есть пара замечаний. ' * 20,
+             'date_updated': '2021-04-11T10:31:09Z',
+             'lesson_name': 'Итоговый проект спринта'}
+            for number in range(size)],
+        'current_date': 1618137069}, ensure_ascii=False).encode()
+
+
+def retained(decoder, payload):
+    """Память, которую занимает результат разбора, байт."""
+    tracemalloc.start()
+    result = decoder.decode(payload)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    """Замеры для ответа указанного размера."""
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    payload = make_payload(size)
+    number = max(1, 20000 // size)
+    decoders = [StdlibDecoder(), ProjectingDecoder(KEYS)]
+    if orjson is not None:
+        from decoding import FastDecoder
+        decoders.insert(1, FastDecoder())
+    print(f'{size} работ, {len(payload) / 2 ** 20:.1f} МБ, '
+          f'orjson {"есть" if orjson else "не установлен"}')
+    for decoder in decoders:
+        seconds = min(timeit.repeat(
+            lambda: decoder.decode(payload), number=number, repeat=5))
+        print(f'{decoder.name:10} {seconds / number * 1e3:9.2f} мс, '
+              f'результат {retained(decoder, payload) / 2 ** 20:6.1f} МБ')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Сравнение строгой проверки ответа с прежней проверкой check_response.
+
+Запуск: python benchmarks/bench_validation.py [число работ]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from validation import ResponseValidator, field  # noqa: E402
+
+
+STATUSES = ('approved', 'reviewing', 'rejected')
+
+validator = ResponseValidator(
+    envelope_fields=(
+        field('homeworks', list),
+        field('current_date', int)),
+    item_fields=(
+        field('homework_name', str),
+        field('status', str, choices=STATUSES),
+        field('id', int, required=False),
+        field('date_updated', str, required=False)))
+
+
+def make_payload(size):
+    """Ответ API с указанным числом работ."""
+    return {
+        'homeworks': [
+            {'id': number,
+             'homework_name': f'user__hw{number}.zip',
+             'status': STATUSES[number % len(STATUSES)],
+             'reviewer_comment': 'Принято!',
+             'date_updated': '2021-04-11T10:31:09Z',
+             'lesson_name': 'Проект спринта'}
+            for number in range(size)],
+        'current_date': 1618137069}
+
+
+def legacy_check(response):
+    """Прежняя проверка: только конверт, работы без проверки."""
+    if not isinstance(response, dict):
+        raise TypeError('not a dict')
+    if 'homeworks' not in response:
+        raise TypeError('no homeworks')
+    homeworks = response.get('homeworks')
+    if not isinstance(homeworks, list):
+        raise TypeError('homeworks is not a list')
+    return homeworks
+
+
+def legacy_check_and_parse(response):
+    """Прежний путь с разбором каждой работы, как при догрузке."""
+    for homework in legacy_check(response):
+        status = homework.get('status')
+        if status is None or homework.get('homework_name') is None:
+            raise ValueError('bad homework')
+        if status not in STATUSES:
+            raise ValueError('unknown status')
+
+
+def main():
+    """Замеры для ответа указанного размера."""
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    payload = make_payload(size)
+    number = max(1, 100000 // size)
+    cases = (
+        ('legacy envelope only', lambda: legacy_check(payload)),
+        ('legacy + per-item parse', lambda: legacy_check_and_parse(payload)),
+        ('compiled validator', lambda: validator.validate(payload)),
+    )
+    print(f'{size} работ, {number} повторов')
+    for name, case in cases:
+        seconds = min(timeit.repeat(case, number=number, repeat=5))
+        print(f'{name:28} {seconds / number * 1e3:9.3f} мс на ответ')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""Общий кэш с ограничением по памяти, вытеснением LRU и сроком жизни."""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import registry as default_registry
+
+
+# Накладные расходы на запись: узел словаря, кортеж записи, ключ.
+ENTRY_OVERHEAD = 200
+MAX_DEPTH = 8
+
+
+def approximate_size(value, depth=0):
+    """Приблизительный размер значения в байтах вместе с вложенными.
+
+    Учитываются словари, списки, кортежи и множества; общие
+    объекты считаются при каждом вхождении, поэтому оценка сверху.
+    """
+    size = sys.getsizeof(value)
+    if depth >= MAX_DEPTH:
+        return size
+    if isinstance(value, dict):
+        size += sum(approximate_size(key, depth + 1)
+                    + approximate_size(item, depth + 1)
+                    for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approximate_size(item, depth + 1) for item in value)
+    return size
+
+
+class BudgetCache:
+    """Кэш, занимающий не больше ``budget`` байт.
+
+    Размер записи оценивается при добавлении. Когда сумма превышает
+    бюджет, вытесняются давно не использованные записи; записи старше
+    ``ttl`` секунд не выдаются и удаляются при обращении или
+    вытеснении. Попадания, промахи и вытеснения считаются в метриках
+    ``cache.<name>.*``. Ключи можно делать кортежами с именем
+    получателя, чтобы один кэш с общим бюджетом обслуживал всех.
+    """
+
+    def __init__(self, budget, ttl=None, name='cache', clock=time.monotonic,
+                 registry=default_registry, sizeof=approximate_size):
+        self.budget = budget
+        self.ttl = ttl
+        self.name = name
+        self._clock = clock
+        self._sizeof = sizeof
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = registry.counter(f'cache.{name}.hits')
+        self._misses = registry.counter(f'cache.{name}.misses')
+        self._evictions = registry.counter(f'cache.{name}.evictions')
+        self._expirations = registry.counter(f'cache.{name}.expirations')
+        self._bytes_gauge = registry.gauge(f'cache.{name}.bytes')
+        self._entries_gauge = registry.gauge(f'cache.{name}.entries')
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._live(key) is not None
+
+    @property
+    def size(self):
+        """Оценка занятой памяти в байтах."""
+        return self._bytes
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _live(self, key):
+        """Действующая запись или None; просроченная удаляется."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] is not None and entry[2] <= self._clock():
+            self._remove(key)
+            self._expirations.inc()
+            self._update_gauges()
+            return None
+        return entry
+
+    def _update_gauges(self):
+        self._bytes_gauge.set(self._bytes)
+        self._entries_gauge.set(len(self._entries))
+
+    def get(self, key, default=None):
+        """Значение по ключу с отметкой об использовании."""
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                self._misses.inc()
+                return default
+            self._entries.move_to_end(key)
+        self._hits.inc()
+        return entry[0]
+
+    def set(self, key, value, ttl=None):
+        """Добавление значения; False, если оно больше всего бюджета."""
+        ttl = self.ttl if ttl is None else ttl
+        size = ENTRY_OVERHEAD + self._sizeof(key) + self._sizeof(value)
+        expires = None if ttl is None else self._clock() + ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.budget:
+                self._update_gauges()
+                return False
+            self._entries[key] = (value, size, expires)
+            self._bytes += size
+            self._evict()
+            self._update_gauges()
+        return True
+
+    def _evict(self):
+        """Вытеснение записей, пока кэш не уложится в бюджет."""
+        now = self._clock()
+        while self._bytes > self.budget:
+            key, (_, _, expires) = next(iter(self._entries.items()))
+            self._remove(key)
+            if expires is not None and expires <= now:
+                self._expirations.inc()
+            else:
+                self._evictions.inc()
+
+    def get_or_set(self, key, factory, ttl=None):
+        """Значение из кэша или результат ``factory()`` с сохранением."""
+        marker = self._entries  # Значение, которого не может быть в кэше.
+        value = self.get(key, marker)
+        if value is marker:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    def pop(self, key, default=None):
+        """Удаление записи; возвращает её значение."""
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            self._update_gauges()
+        return entry[0]
+
+    def discard(self, predicate):
+        """Удаление записей, ключи которых подходят под ``predicate``."""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            self._update_gauges()
+        return len(keys)
+
+    def clear(self):
+        """Удаление всех записей."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._update_gauges()
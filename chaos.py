@@ -0,0 +1,429 @@
+"""Внесение сбоев в работу бота и замер времени восстановления.
+
+Бот опрашивает локальные заглушки API Практикума и Telegram через
+настоящие ``requests`` и ``telebot``, а с ``clock.VirtualClock`` -
+их заменители в том же процессе на виртуальном времени. По расписанию
+сценария заглушки отвечают с задержкой, обрывают соединение,
+возвращают 5xx/429, некорректный JSON или ошибку Telegram. По итогам
+прогона для каждого сбоя считаются время обнаружения и восстановления
+и число запросов во время сбоя, а для всего прогона - потерянные и
+повторные уведомления. ``gate`` сравнивает результаты с допустимыми пределами.
+"""
+import argparse
+import json
+import re
+import socket
+import struct
+import sys
+import threading
+from collections import Counter, namedtuple
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+import telebot
+
+import homework
+from clock import system_clock
+from runtime import TenantRuntime
+from simulation import quiet_logs
+from tenants import Tenant
+
+
+PRACTICUM_FAULTS = ('latency', 'reset', 'http_status', 'malformed')
+TELEGRAM_FAULTS = ('telegram',)
+MALFORMED_BODY = b'{"homeworks": [{"homework_name": '
+MESSAGE_PATTERN = re.compile(r'Изменился статус проверки работы "(.*)"\. ')
+
+# Время в сценарии отсчитывается в секундах от начала прогона.
+Fault = namedtuple('Fault', ('kind', 'start', 'duration', 'options'),
+                   defaults=({},))
+Event = namedtuple('Event', ('at', 'homework_id', 'homework_name', 'status'))
+Request = namedtuple('Request', ('at', 'faulty'))
+PollRecord = namedtuple('PollRecord', ('started', 'finished', 'ok'))
+FaultReport = namedtuple('FaultReport', (
+    'fault', 'detected_after', 'recovered_after', 'requests',
+    'amplification'))
+Report = namedtuple('Report', (
+    'faults', 'lost', 'duplicated', 'polls', 'practicum_requests',
+    'telegram_requests'))
+
+
+def active_fault(faults, kinds, moment):
+    """Сбой одного из видов ``kinds``, действующий в момент ``moment``."""
+    for fault in faults:
+        if (fault.kind in kinds
+                and fault.start <= moment < fault.start + fault.duration):
+            return fault
+    return None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Общая часть обработчиков заглушек."""
+
+    def log_message(self, format, *args):
+        """Запросы к заглушкам не журналируются."""
+
+    def reply(self, status, data=None, body=None, headers=()):
+        """Ответ с JSON или готовым телом."""
+        if body is None:
+            body = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def reset(self):
+        """Обрыв соединения без ответа."""
+        self.connection.setsockopt(
+            socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        self.close_connection = True
+
+
+class PracticumHandler(StubHandler):
+    """Заглушка API Практикума со статусами из сценария."""
+
+    def do_GET(self):
+        """Статусы работ, изменившиеся с ``from_date``."""
+        query = dict(parse_qsl(urlsplit(self.path).query))
+        reply = self.server.harness.practicum(
+            int(query.get('from_date', 0)))
+        if reply is None:
+            self.reset()
+        else:
+            status, body, headers = reply
+            self.reply(status, body=body, headers=headers)
+
+
+class TelegramHandler(StubHandler):
+    """Заглушка Bot API, запоминающая доставленные сообщения."""
+
+    def do_POST(self):
+        """Ответ на ``sendMessage``."""
+        size = int(self.headers.get('Content-Length') or 0)
+        params = dict(parse_qsl(urlsplit(self.path).query))
+        params.update(parse_qsl(self.rfile.read(size).decode()))
+        self.reply(*self.server.harness.telegram(
+            params.get('chat_id', 0), params.get('text', '')))
+
+
+class StubResponse:
+    """Ответ заглушки без сети с интерфейсом ``requests.Response``."""
+
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+    def json(self):
+        """Данные ответа; ValueError для некорректного JSON."""
+        return json.loads(self.content)
+
+
+class StubBot:
+    """Бот, отправляющий сообщения в заглушку Telegram без сети."""
+
+    def __init__(self, harness):
+        self.harness = harness
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Отправка; при сбое - ошибка Bot API, как у ``telebot``."""
+        status, data = self.harness.telegram(chat_id, text)
+        if status != HTTPStatus.OK:
+            raise telebot.apihelper.ApiTelegramException(
+                'sendMessage', None, data)
+        return data['result']
+
+
+class StubServer(ThreadingHTTPServer):
+    """Локальный сервер заглушки на свободном порту."""
+
+    daemon_threads = True
+
+    def __init__(self, handler, harness):
+        self.harness = harness
+        super().__init__(('127.0.0.1', 0), handler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        """Адрес сервера."""
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def stop(self):
+        """Остановка сервера."""
+        self.shutdown()
+        self.server_close()
+
+
+class ChaosHarness:
+    """Прогон бота против заглушек со сбоями по расписанию.
+
+    ``events`` - изменения статусов работ, ``faults`` - сбои. Опрос
+    идёт через ``homework.poll_tenant`` и ``TenantRuntime`` с периодом
+    ``period`` секунд, то есть с настоящими повторами и отсрочками.
+    Изменения статусов стоит разносить больше чем на период, а сбои
+    заканчивать раньше ``duration``, чтобы бот успел восстановиться.
+
+    С ``clock.VirtualClock`` прогон идёт без сети и без ожидания:
+    заглушки вызываются напрямую, а задержки сдвигают часы. Такой
+    прогон детерминирован и подходит для тестов.
+    """
+
+    def __init__(self, events, faults, duration, period=0.1,
+                 clock=system_clock):
+        self.events = sorted(events)
+        self.faults = list(faults)
+        self.duration = duration
+        self.period = period
+        self.clock = clock
+        self.practicum_requests = []
+        self.telegram_requests = []
+        self.telegram_failures = 0
+        self.delivered = []
+        self.polls = []
+        self._started = None
+
+    @property
+    def virtual(self):
+        """Идёт ли прогон на виртуальном времени."""
+        return self.clock is not system_clock
+
+    def elapsed(self):
+        """Секунды от начала прогона."""
+        return self.clock.monotonic() - self._started
+
+    def statuses(self, from_date):
+        """Ответ API: работы, изменившиеся с ``from_date``.
+
+        Время API - миллисекунды от начала прогона.
+        """
+        now = int(self.elapsed() * 1000)
+        latest = {}
+        for event in self.events:
+            if event.at * 1000 <= now:
+                latest[event.homework_id] = event
+        homeworks = [
+            {'id': event.homework_id, 'homework_name': event.homework_name,
+             'status': event.status}
+            for event in sorted(latest.values(), reverse=True)
+            if event.at * 1000 >= from_date]
+        return {'homeworks': homeworks, 'current_date': now}
+
+    def practicum(self, from_date):
+        """Ответ API Практикума с учётом сбоев.
+
+        Возвращает статус, тело и заголовки или None для обрыва
+        соединения.
+        """
+        now = self.elapsed()
+        fault = active_fault(self.faults, PRACTICUM_FAULTS, now)
+        self.practicum_requests.append(Request(now, fault is not None))
+        if fault is None or fault.kind == 'latency':
+            if fault is not None:
+                self.clock.sleep(fault.options.get('delay', 0.5))
+            return HTTPStatus.OK, self.body(self.statuses(from_date)), []
+        if fault.kind == 'reset':
+            return None
+        if fault.kind == 'http_status':
+            status = fault.options.get('status', 500)
+            headers = [('Retry-After', '1')] if status == 429 else []
+            return status, self.body({'message': 'fault'}), headers
+        return HTTPStatus.OK, fault.options.get('body', MALFORMED_BODY), []
+
+    @staticmethod
+    def body(data):
+        """Тело ответа в JSON."""
+        return json.dumps(data, ensure_ascii=False).encode()
+
+    def telegram(self, chat_id, text):
+        """Ответ Bot API на ``sendMessage`` с учётом сбоев."""
+        now = self.elapsed()
+        fault = active_fault(self.faults, TELEGRAM_FAULTS, now)
+        self.telegram_requests.append(Request(now, fault is not None))
+        # Сбой с deliver=True: сообщение доставлено, но ответ потерян.
+        if fault is None or fault.options.get('deliver'):
+            self.delivered.append(text)
+        if fault is not None:
+            code = fault.options.get('error_code', 500)
+            self.telegram_failures += 1
+            return code, {'ok': False, 'error_code': code,
+                          'description': 'fault'}
+        return HTTPStatus.OK, {'ok': True, 'result': {
+            'message_id': len(self.delivered),
+            'date': int(self.clock.time()),
+            'chat': {'id': int(chat_id), 'type': 'private'},
+            'text': text}}
+
+    def _poll(self, bot, tenant, http_get):
+        """Опрос с пометкой, прошёл ли он без ошибок."""
+        errors = tenant.error_count, self.telegram_failures
+        started = self.elapsed()
+        homework.poll_tenant(bot, tenant, http_get=http_get,
+                             clock=self.clock)
+        self.polls.append(PollRecord(
+            started, self.elapsed(),
+            errors == (tenant.error_count, self.telegram_failures)))
+
+    def run(self):
+        """Прогон сценария; возвращает ``Report``."""
+        if self.virtual:
+            return self._run_virtual()
+        practicum = StubServer(PracticumHandler, self)
+        telegram = StubServer(TelegramHandler, self)
+        api_url = telebot.apihelper.API_URL
+        telebot.apihelper.API_URL = telegram.url + '/bot{0}/{1}'
+        try:
+            bot = telebot.TeleBot('0:chaos')
+            tenant = Tenant('chaos', 'chaos', '1', self.period)
+            tenant.cursor = 0
+
+            def http_get(url, **kwargs):
+                return requests.get(practicum.url, **kwargs)
+
+            runtime = TenantRuntime(
+                [tenant], lambda item: self._poll(bot, item, http_get),
+                ramp_up=0, jitter=0)
+            self._started = self.clock.monotonic()
+            with quiet_logs():
+                runtime.start()
+                while self.elapsed() < self.duration:
+                    for name in runtime.scheduler.wait_due(
+                            self.duration - self.elapsed()):
+                        runtime.poll_now(runtime.tenants[name])
+        finally:
+            telebot.apihelper.API_URL = api_url
+            practicum.stop()
+            telegram.stop()
+        return self.report()
+
+    def _run_virtual(self):
+        """Прогон без сети: часы сдвигаются от опроса к опросу."""
+        bot = StubBot(self)
+        tenant = Tenant('chaos', 'chaos', '1', self.period)
+        tenant.cursor = 0
+
+        def http_get(url, params, **kwargs):
+            reply = self.practicum(params['from_date'])
+            if reply is None:
+                raise requests.exceptions.ConnectionError(
+                    'Connection reset by peer')
+            return StubResponse(*reply[:2])
+
+        runtime = TenantRuntime(
+            [tenant], lambda item: self._poll(bot, item, http_get),
+            clock=self.clock, ramp_up=0, jitter=0)
+        self._started = self.clock.monotonic()
+        with quiet_logs():
+            runtime.start()
+            runtime.run_until(self._started + self.duration)
+        return self.report()
+
+    def _fault_report(self, fault):
+        """Показатели одного сбоя."""
+        end = fault.start + fault.duration
+        detected = next((poll.finished - fault.start for poll in self.polls
+                         if not poll.ok and poll.finished >= fault.start
+                         and poll.started < end), None)
+        recovered = next((poll.finished - end for poll in self.polls
+                          if poll.ok and poll.started >= end), None)
+        log = (self.telegram_requests if fault.kind in TELEGRAM_FAULTS
+               else self.practicum_requests)
+        count = sum(fault.start <= request.at < end for request in log)
+        return FaultReport(fault, detected, recovered, count,
+                           count / max(fault.duration / self.period, 1))
+
+    def report(self):
+        """Итоги прогона."""
+        verdicts = {verdict: status for status, verdict
+                    in homework.HOMEWORK_VERDICTS.items()}
+        delivered = Counter()
+        for text in self.delivered:
+            match = MESSAGE_PATTERN.match(text)
+            verdict = text[match.end():] if match else None
+            if verdict in verdicts:
+                delivered[match.group(1), verdicts[verdict]] += 1
+        expected = {(event.homework_name, event.status)
+                    for event in self.events}
+        return Report(
+            faults=[self._fault_report(fault) for fault in self.faults],
+            lost=sorted(expected - set(delivered)),
+            duplicated=sum(count - 1 for count in delivered.values()),
+            polls=len(self.polls),
+            practicum_requests=len(self.practicum_requests),
+            telegram_requests=len(self.telegram_requests))
+
+
+def gate(report, max_detect=None, max_recover=None, max_amplification=None,
+         max_lost=0, max_duplicated=0):
+    """Нарушения допустимых пределов; пустой список, если их нет."""
+    violations = []
+    for item in report.faults:
+        name = f'{item.fault.kind}@{item.fault.start}'
+        if max_recover is not None and (
+                item.recovered_after is None
+                or item.recovered_after > max_recover):
+            violations.append(
+                f'{name}: восстановление {item.recovered_after}')
+        if (max_detect is not None and item.fault.kind != 'latency'
+                and (item.detected_after is None
+                     or item.detected_after > max_detect)):
+            violations.append(f'{name}: обнаружение {item.detected_after}')
+        if (max_amplification is not None
+                and item.amplification > max_amplification):
+            violations.append(
+                f'{name}: запросов в {item.amplification:.1f} раз больше')
+    if len(report.lost) > max_lost:
+        violations.append(f'Потеряны уведомления: {report.lost}')
+    if report.duplicated > max_duplicated:
+        violations.append(f'Повторных уведомлений: {report.duplicated}')
+    return violations
+
+
+def default_scenario(period):
+    """Сценарий со сбоями всех видов по очереди."""
+    step = period * 10
+    faults = [
+        Fault('latency', step, step / 2, {'delay': period * 3}),
+        Fault('reset', step * 2, step / 2),
+        Fault('http_status', step * 3, step / 2, {'status': 500}),
+        Fault('http_status', step * 4, step / 2, {'status': 429}),
+        Fault('malformed', step * 5, step / 2),
+        Fault('telegram', step * 6, step / 2),
+    ]
+    statuses = list(homework.HOMEWORK_VERDICTS)
+    events = [Event(fault.start + fault.duration / 2, number,
+                    f'work{number}', statuses[number % len(statuses)])
+              for number, fault in enumerate(faults)]
+    return events, faults, step * 8
+
+
+def main():
+    """Прогон сценария по умолчанию из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--period', type=float, default=0.1,
+                        help='период опроса, с')
+    parser.add_argument('--max-detect', type=float)
+    parser.add_argument('--max-recover', type=float)
+    parser.add_argument('--max-amplification', type=float)
+    args = parser.parse_args()
+    events, faults, duration = default_scenario(args.period)
+    report = ChaosHarness(events, faults, duration, args.period).run()
+    for item in report.faults:
+        print(f'{item.fault.kind:12} обнаружение {item.detected_after} '
+              f'восстановление {item.recovered_after} '
+              f'запросов {item.requests} ({item.amplification:.1f}x)')
+    print(f'Опросов: {report.polls}, потеряно: {report.lost}, '
+          f'повторов: {report.duplicated}')
+    violations = gate(report, args.max_detect, args.max_recover,
+                      args.max_amplification)
+    for violation in violations:
+        print(violation, file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
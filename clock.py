@@ -0,0 +1,58 @@
+"""Часы бота: системные и виртуальные для моделирования."""
+import threading
+import time
+
+
+class SystemClock:
+    """Настоящее время."""
+
+    def time(self):
+        """Текущее unix-время."""
+        return time.time()
+
+    def monotonic(self):
+        """Монотонное время для интервалов и сроков."""
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        """Ожидание."""
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """Время, которое идёт только по команде.
+
+    ``sleep`` и ``advance`` сдвигают время мгновенно, поэтому сутки
+    опросов моделируются за миллисекунды.
+    """
+
+    def __init__(self, start=0.0):
+        self._now = float(start)
+        self._lock = threading.Lock()
+
+    def time(self):
+        """Текущее виртуальное unix-время."""
+        return self._now
+
+    def monotonic(self):
+        """Виртуальное монотонное время (совпадает с ``time``)."""
+        return self._now
+
+    def advance(self, seconds):
+        """Сдвиг времени вперёд."""
+        if seconds < 0:
+            raise ValueError('Время не может идти назад.')
+        with self._lock:
+            self._now += seconds
+
+    def advance_to(self, moment):
+        """Перевод времени на указанный момент, если он в будущем."""
+        with self._lock:
+            self._now = max(self._now, moment)
+
+    def sleep(self, seconds):
+        """Мгновенное «ожидание»."""
+        self.advance(seconds)
+
+
+system_clock = SystemClock()
@@ -0,0 +1,90 @@
+"""Декодеры JSON для ответов API.
+
+``stdlib`` - ``json`` из стандартной библиотеки, ``fast`` - orjson,
+если он установлен, ``projected`` - разбор с сохранением только
+нужных ключей: остальные значения (комментарии ревьюера, названия
+уроков) не попадают в результат и сразу освобождаются.
+"""
+import json
+import logging
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class StdlibDecoder:
+    """Разбор стандартным ``json``."""
+
+    name = 'stdlib'
+
+    def decode(self, data):
+        """Объект из байтов или строки JSON."""
+        return json.loads(data)
+
+
+class FastDecoder:
+    """Разбор через orjson."""
+
+    name = 'fast'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError('Для декодера fast нужен пакет orjson.')
+
+    def decode(self, data):
+        """Объект из байтов или строки JSON."""
+        return orjson.loads(data)
+
+
+def project(value, keys):
+    """Копия значения, в словарях которой оставлены только ``keys``."""
+    if isinstance(value, dict):
+        return {key: project(item, keys)
+                for key, item in value.items() if key in keys}
+    if isinstance(value, list):
+        return [project(item, keys) for item in value]
+    return value
+
+
+class ProjectingDecoder:
+    """Разбор с отбрасыванием ключей, которых нет в ``keys``.
+
+    Ключи отбираются на всех уровнях вложенности. Со стандартным
+    ``json`` словари сразу строятся только из нужных пар; с orjson
+    разбор быстрее, поэтому лишнее отбрасывается после него.
+    """
+
+    name = 'projected'
+
+    def __init__(self, keys):
+        self.keys = frozenset(keys)
+        self._decoder = json.JSONDecoder(object_pairs_hook=lambda pairs: {
+            key: value for key, value in pairs if key in self.keys})
+
+    def decode(self, data):
+        """Объект из байтов или строки JSON только с нужными ключами."""
+        if orjson is not None:
+            return project(orjson.loads(data), self.keys)
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode('utf-8')
+        return self._decoder.decode(data)
+
+
+def get_decoder(name, keys=()):
+    """Декодер по имени; без orjson вместо ``fast`` - стандартный."""
+    if name == 'stdlib':
+        return StdlibDecoder()
+    if name == 'fast':
+        try:
+            return FastDecoder()
+        except ImportError as err:
+            logger.warning(f'{err} Используется стандартный json.')
+            return StdlibDecoder()
+    if name == 'projected':
+        return ProjectingDecoder(keys)
+    raise ValueError(f'Неизвестный декодер JSON: {name}.')
@@ -0,0 +1,63 @@
+"""Отправка сообщений в Telegram через общий пул соединений.
+
+``telebot`` по умолчанию создаёт по сессии ``requests`` на поток
+и пересоздаёт её каждые 10 минут, поэтому каждый поток держит своё
+соединение и периодически заново проходит TLS-рукопожатие. Клиент
+устанавливает одну сессию с пулом постоянных соединений и хранит
+по боту на токен. Одновременные отправки выполняют потоки опроса
+получателей и ``dispatch.FanOutDispatcher``, а соединения они берут
+из общего пула.
+"""
+import threading
+
+import requests
+import telebot
+from requests.adapters import HTTPAdapter
+
+
+POOL_SIZE = 32
+
+
+def pooled_session(pool_size=POOL_SIZE):
+    """Сессия ``requests`` с пулом до ``pool_size`` соединений на хост."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size,
+                          pool_block=True)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class DeliveryClient:
+    """Общий пул соединений с Telegram и боты по токенам.
+
+    Размер пула соединений стоит держать не меньше числа потоков,
+    которые отправляют сообщения одновременно.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE):
+        self.pool_size = pool_size
+        self.session = None
+        self._bots = {}
+        self._lock = threading.Lock()
+
+    def install(self):
+        """Подключение общего пула соединений ко всем ботам ``telebot``."""
+        if self.session is None:
+            self.session = pooled_session(self.pool_size)
+        telebot.apihelper.session = self.session
+        # Без срока жизни: иначе telebot пересоздаёт сессии потоков.
+        telebot.apihelper.SESSION_TIME_TO_LIVE = None
+
+    def bot(self, token):
+        """Бот для токена; для каждого токена создаётся один раз."""
+        with self._lock:
+            bot = self._bots.get(token)
+            if bot is None:
+                bot = self._bots[token] = telebot.TeleBot(token=token)
+            return bot
+
+    def close(self):
+        """Закрытие соединений."""
+        if self.session is not None:
+            self.session.close()
@@ -0,0 +1,64 @@
+"""Параллельная рассылка уведомлений по нескольким получателям."""
+import logging
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+
+MAX_WORKERS = 8
+RETRIES = 2
+RETRY_DELAY = 1.0
+
+
+DeliveryResult = namedtuple(
+    'DeliveryResult', ('destination', 'ok', 'attempts', 'error'))
+
+
+class FanOutDispatcher:
+    """Отправка одного сообщения всем получателям одновременно.
+
+    Каждый получатель обслуживается отдельной задачей в ограниченном
+    пуле потоков и повторяет попытки независимо от остальных, поэтому
+    общее время рассылки определяется самым медленным получателем.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, retries=RETRIES,
+                 retry_delay=RETRY_DELAY, errors=(Exception,)):
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.errors = errors
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='fan-out')
+
+    def _deliver(self, send, destination):
+        """Доставка одному получателю с повторными попытками."""
+        error = None
+        for attempt in range(1, self.retries + 2):
+            try:
+                send(destination)
+            except self.errors as err:
+                error = err
+                logger.warning(f'Попытка {attempt} отправки получателю '
+                               f'{destination} не удалась: {err}')
+                if attempt <= self.retries:
+                    time.sleep(self.retry_delay * attempt)
+                continue
+            return DeliveryResult(destination, True, attempt, None)
+        return DeliveryResult(destination, False, attempt, error)
+
+    def dispatch(self, send, destinations):
+        """Рассылка всем получателям, результат по каждому из них.
+
+        ``send`` вызывается с одним аргументом - получателем - и должен
+        выбрасывать исключение, если доставка не удалась.
+        """
+        futures = [self._executor.submit(self._deliver, send, destination)
+                   for destination in destinations]
+        return [future.result() for future in futures]
+
+    def shutdown(self):
+        """Остановка пула потоков."""
+        self._executor.shutdown(wait=True)
@@ -12,3 +12,19 @@ class UnknownStatusError(Exception):
 
 class UnsuccessfulHTTPStatusCodeError(Exception):
     """Статус-код ответа сервера не равен 200."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class InvalidResponseError(TypeError):
+    """Структура ответа API не соответствует ожидаемой."""
+
+
+class QuotaExceededError(Exception):
+    """Не удалось получить разрешение на запрос к API в отведённое время."""
+
+
+class SnapshotError(Exception):
+    """Снимок состояния повреждён, устарел или в другом формате."""
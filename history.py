@@ -0,0 +1,244 @@
+"""Хранилище истории статусов проверки и аналитика по ней."""
+import argparse
+import logging
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+
+logger = logging.getLogger(__name__)
+
+
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0
+QUEUE_SIZE = 10000
+REVIEWING_STATUS = 'reviewing'
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS status_history ('
+    ' id INTEGER PRIMARY KEY,'
+    ' tenant TEXT NOT NULL,'
+    ' homework_id INTEGER,'
+    ' homework_name TEXT NOT NULL,'
+    ' status TEXT NOT NULL,'
+    ' updated_at INTEGER NOT NULL,'
+    ' observed_at INTEGER NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS idx_history_tenant_homework_time '
+    'ON status_history (tenant, homework_name, updated_at)',
+    'CREATE INDEX IF NOT EXISTS idx_history_time '
+    'ON status_history (updated_at)',
+    # Одно и то же изменение статуса приходит в ответах API повторно,
+    # поэтому запись по нему хранится одна.
+    'CREATE UNIQUE INDEX IF NOT EXISTS idx_history_change '
+    'ON status_history (tenant, homework_name, status, updated_at)',
+)
+
+INSERT_SQL = (
+    'INSERT OR IGNORE INTO status_history (tenant, homework_id, '
+    'homework_name, status, updated_at, observed_at) '
+    'VALUES (?, ?, ?, ?, ?, ?)')
+
+# Интервалы, которые работа провела в статусе: от записи со статусом
+# до следующей записи по той же работе.
+INTERVALS_SQL = (
+    'SELECT tenant, homework_name, status, updated_at, '
+    'LEAD(updated_at) OVER ('
+    ' PARTITION BY tenant, homework_name ORDER BY updated_at, id'
+    ') AS next_updated_at '
+    'FROM status_history WHERE (:tenant IS NULL OR tenant = :tenant)')
+
+REVIEWING_SQL = (
+    'SELECT tenant, homework_name, '
+    'SUM(next_updated_at - updated_at) AS seconds '
+    f'FROM ({INTERVALS_SQL}) '
+    'WHERE status = :status AND next_updated_at IS NOT NULL '
+    'GROUP BY tenant, homework_name ORDER BY seconds DESC')
+
+TURNAROUND_COUNT_SQL = (
+    'SELECT COUNT(*) '
+    f'FROM ({INTERVALS_SQL}) '
+    'WHERE status = :status AND next_updated_at IS NOT NULL')
+
+TURNAROUND_AT_SQL = (
+    'SELECT next_updated_at - updated_at AS seconds '
+    f'FROM ({INTERVALS_SQL}) '
+    'WHERE status = :status AND next_updated_at IS NOT NULL '
+    'ORDER BY seconds LIMIT 1 OFFSET :offset')
+
+DAILY_SQL = (
+    "SELECT date(updated_at, 'unixepoch') AS day, status, COUNT(*) "
+    'FROM status_history WHERE (:tenant IS NULL OR tenant = :tenant) '
+    'GROUP BY day, status ORDER BY day, status')
+
+
+def connect(path):
+    """Подключение к базе истории в режиме WAL."""
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    for statement in SCHEMA:
+        connection.execute(statement)
+    connection.commit()
+    return connection
+
+
+def parse_timestamp(value, default):
+    """Перевод даты из ответа API (ISO 8601) в unix-время."""
+    if not value:
+        return default
+    try:
+        return int(datetime.fromisoformat(
+            value.replace('Z', '+00:00')).timestamp())
+    except (TypeError, ValueError):
+        return default
+
+
+class HistoryStore:
+    """Запись изменений статусов в SQLite в фоновом потоке.
+
+    Вызов ``record`` только кладёт событие в очередь и не блокирует
+    цикл опроса; поток-писатель сбрасывает события пачками,
+    по одной транзакции на пачку.
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL, queue_size=QUEUE_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = object()
+        # Схему создаём сразу, чтобы ошибки доступа к файлу
+        # проявились при запуске, а не в фоне.
+        connect(path).close()
+        self._writer = threading.Thread(
+            target=self._run, name='history-writer', daemon=True)
+        self._writer.start()
+
+    def record(self, tenant, homework, observed_at=None):
+        """Постановка изменения статуса в очередь на запись."""
+        if observed_at is None:
+            observed_at = int(time.time())
+        row = (str(tenant),
+               homework.get('id'),
+               homework.get('homework_name'),
+               homework.get('status'),
+               parse_timestamp(homework.get('date_updated'), observed_at),
+               observed_at)
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning('Очередь истории статусов переполнена, '
+                           f'событие отброшено: {row}')
+
+    def flush(self):
+        """Ожидание записи всех поставленных в очередь событий."""
+        self._queue.join()
+
+    def close(self):
+        """Запись остатка очереди и остановка потока-писателя."""
+        self._queue.put(self._stop)
+        self._writer.join()
+
+    def _collect_batch(self):
+        """Сбор пачки событий из очереди."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and batch[-1] is not self._stop:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        """Цикл потока-писателя."""
+        connection = connect(self.path)
+        stopped = False
+        while not stopped:
+            batch = self._collect_batch()
+            rows = [row for row in batch if row is not self._stop]
+            stopped = len(rows) != len(batch)
+            try:
+                with connection:
+                    connection.executemany(INSERT_SQL, rows)
+            except sqlite3.Error as err:
+                logger.error(f'Ошибка записи истории статусов: {err}')
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        connection.close()
+
+
+def time_in_status(connection, status=REVIEWING_STATUS, tenant=None):
+    """Суммарное время (в секундах) каждой работы в статусе."""
+    return connection.execute(
+        REVIEWING_SQL, {'status': status, 'tenant': tenant}).fetchall()
+
+
+def turnaround_percentiles(connection, percentiles=DEFAULT_PERCENTILES,
+                           status=REVIEWING_STATUS, tenant=None):
+    """Перцентили времени проверки работы ревьюером.
+
+    Перцентили считаются методом ближайшего ранга прямо в SQLite,
+    без выгрузки всех интервалов в память.
+    """
+    params = {'status': status, 'tenant': tenant}
+    total = connection.execute(TURNAROUND_COUNT_SQL, params).fetchone()[0]
+    result = {}
+    if not total:
+        return result
+    for percentile in percentiles:
+        rank = max(1, -(-percentile * total // 100))
+        row = connection.execute(
+            TURNAROUND_AT_SQL, {**params, 'offset': rank - 1}).fetchone()
+        result[percentile] = row[0]
+    return result
+
+
+def daily_volumes(connection, tenant=None):
+    """Количество изменений статусов по дням."""
+    return connection.execute(DAILY_SQL, {'tenant': tenant}).fetchall()
+
+
+def print_rows(header, rows):
+    """Вывод результата запроса таблицей."""
+    print('\t'.join(header))
+    for row in rows:
+        print('\t'.join(str(value) for value in row))
+
+
+def main(argv=None):
+    """Командная строка для аналитики по истории статусов."""
+    parser = argparse.ArgumentParser(
+        description='Аналитика по истории статусов проверки.')
+    parser.add_argument('--db', required=True, help='Путь к базе истории.')
+    parser.add_argument('--tenant', help='Идентификатор получателя.')
+    parser.add_argument('report',
+                        choices=('reviewing', 'turnaround', 'daily'))
+    args = parser.parse_args(argv)
+    connection = connect(args.db)
+    if args.report == 'reviewing':
+        print_rows(('tenant', 'homework', 'seconds'),
+                   time_in_status(connection, tenant=args.tenant))
+    elif args.report == 'turnaround':
+        print_rows(('percentile', 'seconds'),
+                   turnaround_percentiles(
+                       connection, tenant=args.tenant).items())
+    else:
+        print_rows(('day', 'status', 'count'),
+                   daily_volumes(connection, tenant=args.tenant))
+    connection.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,18 +1,48 @@
+import atexit
 import logging
 import os
+import signal
 import sys
+import threading
 import time
+from datetime import datetime, timezone
 from http import HTTPStatus
 
 import requests
 import telebot
 from dotenv import load_dotenv
 
+from admin import AdminServer
+from backfill import backfill
+from cache import BudgetCache
+from clock import system_clock
+from delivery import DeliveryClient
+from decoding import get_decoder
+from dispatch import FanOutDispatcher
 from exceptions import (
     CheckTokensError,
     RequestExceptError,
     UnknownStatusError,
     UnsuccessfulHTTPStatusCodeError)
+from history import HistoryStore
+from journal import Journal
+from leadership import (
+    LeaderElector,
+    SQLiteLeaseBackend,
+    ensure_leadership)
+from limiter import AdaptiveLimiter
+import logs
+from pipeline import Pipeline, Stage
+from quota import QuotaLedger, SingleFlight
+from rendering import VERDICTS, Renderer
+from runtime import TenantRuntime
+from shadow import ShadowBot
+from shedding import LoadShedder
+from slo import Objective, SLOMonitor
+from snapshot import SnapshotWriter, warm_start
+from tenants import Tenant, homework_key, load_tenants
+from validation import ResponseValidator, field
+from verification import quarantine, verify
 
 
 load_dotenv()
@@ -21,6 +51,71 @@ load_dotenv()
 PRACTICUM_TOKEN = os.getenv('YANDEX_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+HISTORY_DB_PATH = os.getenv('HISTORY_DB_PATH')
+# Дополнительные получатели уведомлений (группа наставников,
+# канал аудита) через запятую.
+TELEGRAM_EXTRA_CHAT_IDS = [
+    chat_id.strip()
+    for chat_id in os.getenv('TELEGRAM_EXTRA_CHAT_IDS', '').split(',')
+    if chat_id.strip()]
+# Общий для всех процессов журнал лимита запросов к API.
+QUOTA_DB_PATH = os.getenv('QUOTA_DB_PATH')
+QUOTA_LIMIT = int(os.getenv('QUOTA_LIMIT', 30))
+QUOTA_WINDOW = float(os.getenv('QUOTA_WINDOW', 60))
+# Теневой режим: сообщения записываются в этот файл вместо отправки.
+SHADOW_LOG_PATH = os.getenv('SHADOW_LOG_PATH')
+# Файл аренды для запуска нескольких экземпляров: опрашивает
+# только ведущий, остальные ждут в резерве.
+LEADER_LEASE_PATH = os.getenv('LEADER_LEASE_PATH')
+LEADER_LEASE_NAME = os.getenv('LEADER_LEASE_NAME', 'homework-bot')
+# Каталог журнала событий (ответы API, статусы, доставка).
+JOURNAL_DIR = os.getenv('JOURNAL_DIR')
+# Порт административного API на 127.0.0.1 (режим нескольких получателей).
+ADMIN_PORT = int(os.getenv('ADMIN_PORT', 0))
+# Файл снимка состояния получателей для тёплого перезапуска.
+SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH')
+# Бюджет памяти кэша готовых уведомлений, байт.
+CACHE_BUDGET = int(os.getenv('CACHE_BUDGET', 16 * 1024 * 1024))
+# Размер общего пула соединений с Telegram.
+TELEGRAM_POOL_SIZE = int(os.getenv('TELEGRAM_POOL_SIZE', 32))
+# Опоздание расписания, с, после которого опросы простаивающих
+# получателей откладываются в пользу получателей с работой на проверке.
+SHED_MAX_LAG = float(os.getenv('SHED_MAX_LAG', 60))
+# Декодер ответов API: stdlib, fast (orjson) или projected.
+JSON_DECODER = os.getenv('JSON_DECODER', 'stdlib')
+# Язык уведомлений по умолчанию и режим разметки Telegram
+# (MarkdownV2 или HTML; без него - обычный текст).
+NOTIFY_LOCALE = os.getenv('NOTIFY_LOCALE', 'ru')
+TELEGRAM_PARSE_MODE = os.getenv('TELEGRAM_PARSE_MODE') or None
+# Добавлять ли в уведомление комментарий ревьюера.
+NOTIFY_COMMENTS = os.getenv('NOTIFY_COMMENTS', '').lower() in (
+    '1', 'true', 'yes')
+# Формат лога (text или json) и выборка записей одного места вызова:
+# каждая N-я и не больше M в секунду.
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_SAMPLE_EVERY = int(os.getenv('LOG_SAMPLE_EVERY', 1))
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 10))
+# Верхняя граница адаптивного лимита одновременных запросов к API.
+API_CONCURRENCY_MAX = int(os.getenv('API_CONCURRENCY_MAX', 32))
+# JSON-файл со списком получателей для опроса нескольких аккаунтов.
+TENANTS_FILE = os.getenv('TENANTS_FILE')
+# Загрузка истории статусов получателей перед первым опросом.
+BACKFILL_ON_START = os.getenv('BACKFILL_ON_START', '').lower() in (
+    '1', 'true', 'yes')
+# Проверка учётных данных при запуске. В режиме нескольких
+# получателей выполняется всегда.
+VERIFY_ON_START = os.getenv('VERIFY_ON_START', '').lower() in (
+    '1', 'true', 'yes')
+PIPELINE_ENABLED = os.getenv('PIPELINE_ENABLED', '').lower() in (
+    '1', 'true', 'yes')
+# Чат для оповещений о нарушении SLO; без него они только в логе.
+TELEGRAM_ADMIN_CHAT_ID = os.getenv('TELEGRAM_ADMIN_CHAT_ID')
+# Пороги SLO, секунды: ответ API, доставка с момента изменения
+# статуса и опоздание опроса относительно расписания.
+SLO_API_LATENCY = float(os.getenv('SLO_API_LATENCY', 5))
+SLO_DELIVERY_LAG = float(os.getenv('SLO_DELIVERY_LAG', 1800))
+SLO_SCHEDULER_LAG = float(os.getenv('SLO_SCHEDULER_LAG', 5))
+SLO_BURN_RATE = float(os.getenv('SLO_BURN_RATE', 14.4))
 
 
 RETRY_PERIOD = 600
@@ -33,21 +128,81 @@ HOMEWORK_VERDICTS = {
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'}
 
+# Ответы API, которые говорят о его перегрузке.
+OVERLOAD_STATUSES = frozenset(
+    (HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.INTERNAL_SERVER_ERROR,
+     HTTPStatus.BAD_GATEWAY, HTTPStatus.SERVICE_UNAVAILABLE,
+     HTTPStatus.GATEWAY_TIMEOUT))
+
+
+response_validator = ResponseValidator(
+    envelope_fields=(
+        field('homeworks', list),
+        field('current_date', int)),
+    item_fields=(
+        field('homework_name', str),
+        field('status', str, choices=HOMEWORK_VERDICTS),
+        field('id', int, required=False),
+        field('date_updated', str, required=False)))
+
+
+renderer = Renderer(verdicts={**VERDICTS, 'ru': HOMEWORK_VERDICTS},
+                    locale=NOTIFY_LOCALE, parse_mode=TELEGRAM_PARSE_MODE,
+                    cache=BudgetCache(CACHE_BUDGET, name='messages'))
+
+# Ключи ответа API, которые оставляет декодер projected.
+RESPONSE_KEYS = ('homeworks', 'current_date', 'homework_name', 'status',
+                 'id', 'date_updated', 'reviewer_comment')
+
+# Число обработчиков на каждой стадии конвейера.
+PIPELINE_WORKERS = {'fetch': 1, 'check': 1, 'parse': 1, 'send': 4}
+PIPELINE_QUEUE_SIZE = 10
+# Число одновременных опросов разных получателей.
+TENANT_WORKERS = 8
+# Потоков опроса столько, сколько запросов может разрешить лимитер:
+# лишние потоки ждут в нём, и одновременность определяет его лимит.
+POLL_WORKERS = max(TENANT_WORKERS, API_CONCURRENCY_MAX)
+
+
+SEND_ERRORS = (telebot.apihelper.ApiException,
+               requests.exceptions.RequestException)
+dispatcher = FanOutDispatcher(errors=SEND_ERRORS)
+delivery = DeliveryClient(TELEGRAM_POOL_SIZE)
+quota_ledger = (QuotaLedger(QUOTA_DB_PATH, QUOTA_LIMIT, QUOTA_WINDOW)
+                if QUOTA_DB_PATH else None)
+single_flight = SingleFlight()
+api_limiter = AdaptiveLimiter(TENANT_WORKERS, max_limit=API_CONCURRENCY_MAX)
+journal = Journal(JOURNAL_DIR) if JOURNAL_DIR else None
+if journal is not None:
+    # Последняя группа событий фиксируется при выходе.
+    atexit.register(journal.close)
+log_redactor = logs.RedactingFilter((PRACTICUM_TOKEN, TELEGRAM_TOKEN))
+json_decoder = (None if JSON_DECODER == 'stdlib'
+                else get_decoder(JSON_DECODER, RESPONSE_KEYS))
+slo_monitor = SLOMonitor((
+    Objective('api_latency', 0.99, SLO_API_LATENCY),
+    Objective('delivery_lag', 0.99, SLO_DELIVERY_LAG),
+    Objective('send_success', 0.99),
+    Objective('scheduler_lag', 0.99, SLO_SCHEDULER_LAG)),
+    burn_rate=SLO_BURN_RATE)
+
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
-logger.addHandler(logging.StreamHandler(sys.stdout))
-logger.addHandler(logging.FileHandler(
-    filename='bot_check_homework_logs.log',
-    mode='a',
-    encoding='utf-8'))
+
+
+def journal_event(kind, **data):
+    """Запись события в журнал, если он включён."""
+    if journal is not None:
+        journal.append({'type': kind, 'at': time.time(), **data})
 
 
 def check_tokens():
     """Доступность токенов."""
-    env_variables = {'practicum_token': PRACTICUM_TOKEN,
-                     'telegram_token': TELEGRAM_TOKEN,
-                     'telegram_chat_id': TELEGRAM_CHAT_ID}
+    env_variables = {'telegram_token': TELEGRAM_TOKEN}
+    if not TENANTS_FILE:
+        env_variables.update(practicum_token=PRACTICUM_TOKEN,
+                             telegram_chat_id=TELEGRAM_CHAT_ID)
     env_variables_stack = []
     for key, value in env_variables.items():
         if value is None:
@@ -60,43 +215,92 @@ def check_tokens():
 
 def get_api_answer(timestamp_label):
     """Отправка запроса и получение данных с API."""
+    return request_api(timestamp_label, HEADERS)
+
+
+def request_api(timestamp_label, headers, http_get=None):
+    """Запрос к API с заголовками конкретного получателя.
+
+    Одинаковые одновременные запросы (тот же токен и ``from_date``)
+    объединяются в один. ``http_get`` заменяет ``requests.get``,
+    например, в моделировании.
+    """
+    return single_flight.do(
+        (headers['Authorization'], timestamp_label),
+        lambda: fetch_api(timestamp_label, headers, http_get))
+
+
+def decode_response(response):
+    """Данные ответа, разобранные выбранным декодером JSON."""
+    if json_decoder is None:
+        return response.json()
+    return json_decoder.decode(response.content)
+
+
+def redacted(headers):
+    """Заголовки запроса со скрытым токеном для лога."""
+    return {**headers, 'Authorization': 'OAuth ' + logs.MASK}
+
+
+def fetch_api(timestamp_label, headers, http_get=None):
+    """Запрос к API в пределах общего лимита на токен.
+
+    Число одновременных запросов ограничивает ``api_limiter``: ошибки
+    сети и ответы из ``OVERLOAD_STATUSES`` снижают его лимит.
+    """
+    if quota_ledger is not None:
+        quota_ledger.acquire(headers['Authorization'])
     payload = {'from_date': timestamp_label}
     response_data = {'url': ENDPOINT,
-                     'headers': HEADERS,
+                     'headers': headers,
                      'params': payload}
+    started = api_limiter.acquire()
+    overloaded = True
     try:
-        logger.debug(str.format(('Программа начала запрос '
-                                 'на адрес {url} '
-                                 'данные заголовка {headers} '
-                                 'с параметрами {params}.'), **response_data))
-        response = requests.get(**response_data)
+        # По этим записям logstats считает интервалы опроса,
+        # поэтому выборка их не отбрасывает.
+        logger.debug('Программа начала запрос на адрес %s '
+                     'данные заголовка %s с параметрами %s.',
+                     ENDPOINT, redacted(headers), payload,
+                     extra=logs.UNSAMPLED)
+        response = (http_get or requests.get)(**response_data)
+        overloaded = response.status_code in OVERLOAD_STATUSES
     except requests.exceptions.RequestException as err:
         msg = f'Код ответа API: {err}'
         raise RequestExceptError(msg)
+    finally:
+        api_limiter.release(started, overloaded)
+        slo_monitor.observe('api_latency', time.monotonic() - started)
     if response.status_code != HTTPStatus.OK:
         msg = ('Статус-код ответа отличается от успешного: '
                f'{response.status_code}.')
-        raise UnsuccessfulHTTPStatusCodeError(msg)
-    return response.json()
+        raise UnsuccessfulHTTPStatusCodeError(msg, response.status_code)
+    data = decode_response(response)
+    journal_event('response', from_date=timestamp_label, data=data)
+    return data
 
 
 def check_response(response):
-    """Проверка данных запроса."""
-    if not isinstance(response, dict):
-        raise TypeError('Ответ API не имеет структуры словаря. '
-                        f'Получен тип данных {type(response)}.')
-    if 'homeworks' not in response:
-        raise TypeError('В ответе нет ключа "homeworks".')
-    response_homeworks = response.get('homeworks')
-    if not isinstance(response_homeworks, list):
-        raise TypeError('Данные под ключом "homeworks" не являются списком.'
-                        f'Ключ "homeworks" содержит данные типа {
-                            type(response_homeworks)}.')
-    return response_homeworks
+    """Проверка данных запроса.
+
+    Возвращает только корректные работы, остальные логируются
+    и не прерывают цикл опроса.
+    """
+    homeworks, rejections = response_validator.validate(response)
+    for rejection in rejections:
+        logger.warning(f'Работа №{rejection.index} из ответа API '
+                       f'отклонена: {"; ".join(rejection.reasons)}. '
+                       f'Данные: {rejection.item}')
+    return homeworks
 
 
 def parse_status(homework):
     """Анализируем статус если изменился."""
+    return status_message(homework)
+
+
+def status_message(homework, locale=None):
+    """Проверка работы и уведомление о её статусе на языке ``locale``."""
     status = homework.get('status')
     homework_name = homework.get('homework_name')
     if status is None:
@@ -105,53 +309,446 @@ def parse_status(homework):
     if homework_name is None:
         msg = f'Ошибка значения homework_name: {homework_name}.'
         raise UnknownStatusError(msg)
-    try:
-        verdict = HOMEWORK_VERDICTS[status]
-    except KeyError:
+    if status not in HOMEWORK_VERDICTS:
         msg = f'Неизвестный статус проверки: {status}.'
         raise UnknownStatusError(msg)
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+    journal_event('status', homework_id=homework.get('id'),
+                  homework_name=homework_name, status=status)
+    comment = homework.get('reviewer_comment') if NOTIFY_COMMENTS else None
+    return renderer.status(str(homework_name), status, locale,
+                           comment and str(comment))
+
+
+def error_message(error, locale=None):
+    """Уведомление о сбое в работе программы."""
+    return renderer.render('error', locale, error=error)
+
+
+def fan_out_message(bot, msg):
+    """Параллельная отправка сообщения всем получателям.
+
+    Успех определяется доставкой в основной чат: сбой дополнительного
+    чата только логируется, иначе ``main`` не сдвинул бы отметку
+    и повторил бы сообщение во всех чатах, включая основной.
+    """
+    destinations = [TELEGRAM_CHAT_ID, *TELEGRAM_EXTRA_CHAT_IDS]
+    logger.debug('Началась отправка сообщения получателям %s: %s',
+                 destinations, msg)
+    results = dispatcher.dispatch(
+        lambda chat_id: bot.send_message(
+            chat_id, msg, **renderer.send_options()),
+        destinations)
+    for result in results:
+        journal_event('delivery', chat_id=result.destination, ok=result.ok,
+                      attempts=result.attempts,
+                      error=result.error and str(result.error))
+        slo_monitor.record('send_success', result.ok)
+        if result.ok:
+            logger.debug('В Telegram (%s) отправлено сообщение: %s',
+                         result.destination, msg)
+        else:
+            logger.error('Ошибка при отправке сообщения '
+                         f'получателю {result.destination}: '
+                         f'{result.error}. (Попыток: {result.attempts})')
+    return results[0].ok
 
 
 def send_message(bot, msg):
     """Отправка сообщения в Телеграм."""
+    if TELEGRAM_EXTRA_CHAT_IDS:
+        return fan_out_message(bot, msg)
+    return send_message_to(bot, TELEGRAM_CHAT_ID, msg)
+
+
+def send_message_to(bot, chat_id, msg):
+    """Отправка сообщения в указанный чат."""
     try:
-        logger.debug(f'Началась отправка сообщения в Telegram: {msg}')
-        bot.send_message(TELEGRAM_CHAT_ID, msg)
-        logger.debug(f'В Telegram отправлено сообщение: {msg}')
-    except (telebot.apihelper.ApiException,
-            requests.exceptions.RequestException) as err:
+        logger.debug('Началась отправка сообщения в Telegram: %s', msg)
+        bot.send_message(chat_id, msg, **renderer.send_options())
+        logger.debug('В Telegram отправлено сообщение: %s', msg)
+    except SEND_ERRORS as err:
         logger.error(f'Ошибка при отправке сообщения: {err}. '
                      f'(Тип ошибки: {type(err).__name__})')
+        journal_event('delivery', chat_id=chat_id, ok=False, error=str(err))
+        slo_monitor.record('send_success', False)
         return False
+    journal_event('delivery', chat_id=chat_id, ok=True)
+    slo_monitor.record('send_success', True)
     return True
 
 
+def observe_delivery(homework, clock=system_clock):
+    """Учёт задержки доставки с момента изменения статуса."""
+    try:
+        updated = datetime.fromisoformat(homework['date_updated'])
+    except (KeyError, TypeError, ValueError):
+        return
+    if updated.tzinfo is None:
+        updated = updated.replace(tzinfo=timezone.utc)
+    slo_monitor.observe('delivery_lag', clock.time() - updated.timestamp())
+
+
+def send_alert(bot, msg):
+    """Оповещение оператора в служебный чат."""
+    try:
+        bot.send_message(TELEGRAM_ADMIN_CHAT_ID, msg)
+    except SEND_ERRORS as err:
+        logger.error(f'Не удалось отправить оповещение: {err}')
+
+
+def start_slo_alerts(bot):
+    """Запуск проверки SLO с оповещениями в служебный чат."""
+    slo_monitor.start(
+        (lambda msg: send_alert(bot, msg)) if TELEGRAM_ADMIN_CHAT_ID
+        else None)
+
+
+def record_status(history, homework, tenant=None):
+    """Сохранение изменения статуса в историю, если она включена."""
+    if history is not None:
+        history.record(tenant or TELEGRAM_CHAT_ID, homework)
+
+
+def start_election():
+    """Запуск выбора ведущего экземпляра, если он настроен."""
+    if not LEADER_LEASE_PATH:
+        return None
+    elector = LeaderElector(
+        SQLiteLeaseBackend(LEADER_LEASE_PATH), LEADER_LEASE_NAME)
+    elector.start()
+    return elector
+
+
+def send_messages(bot, messages):
+    """Отправка сообщений по порядку до первой неудачи."""
+    return all(send_message(bot, message) for message in messages)
+
+
+def build_pipeline(bot, history=None, cursor=None):
+    """Сборка конвейера запрос -> проверка -> разбор -> отправка.
+
+    Работы одного ответа проходят стадии вместе с его ``current_date``.
+    Когда все уведомления отправлены, стадия отправки сдвигает
+    ``cursor['from_date']`` на эту отметку, как ``main``.
+    """
+    last_errors = {}
+    cursor = {} if cursor is None else cursor
+    cursor_lock = threading.Lock()
+
+    def on_error(stage, item, error):
+        message = error_message(error)
+        logger.error(f'Сбой в работе программы: {error}')
+        if last_errors.get(stage.name) != str(error):
+            send_message(bot, message)
+        last_errors[stage.name] = str(error)
+
+    def on_success(stage, item):
+        # Та же ошибка после восстановления стадии снова сообщается.
+        last_errors.pop(stage.name, None)
+
+    def check(response):
+        # Сначала самые старые изменения, как в poll_tenant.
+        return [(list(reversed(check_response(response))),
+                 response.get('current_date'))]
+
+    def parse(batch):
+        homeworks, current_date = batch
+        messages = []
+        for homework in homeworks:
+            messages.append(parse_status(homework))
+            record_status(history, homework)
+            logger.info('Статус проверки изменился: %s', homework['status'])
+        return [(messages, current_date)]
+
+    def send(batch):
+        messages, current_date = batch
+        if not send_messages(bot, messages) or current_date is None:
+            return
+        with cursor_lock:
+            cursor['from_date'] = max(cursor.get('from_date', 0),
+                                      current_date)
+
+    handlers = {
+        'fetch': lambda timestamp_label: [get_api_answer(timestamp_label)],
+        'check': check,
+        'parse': parse,
+        'send': send}
+    return Pipeline(
+        [Stage(name, handler, workers=PIPELINE_WORKERS[name],
+               queue_size=PIPELINE_QUEUE_SIZE)
+         for name, handler in handlers.items()],
+        on_error=on_error, on_success=on_success)
+
+
+def run_pipeline(bot, history=None, elector=None):
+    """Опрос API через конвейер: стадии работают независимо."""
+    cursor = {'from_date': int(time.time())}
+    pipeline = build_pipeline(bot, history, cursor)
+    pipeline.start()
+    while True:
+        if ensure_leadership(elector):
+            # Изменения до этого момента разослал прежний ведущий.
+            cursor['from_date'] = int(time.time())
+        # Если отправка не успевает, очередь заполняется и
+        # постановка нового запроса блокируется.
+        pipeline.submit(cursor['from_date'])
+        time.sleep(RETRY_PERIOD)
+
+
+def register_tenants(tenants):
+    """Добавление токенов получателей в скрываемые в логе секреты."""
+    for tenant in tenants:
+        log_redactor.add(tenant.practicum_token)
+        log_redactor.add(tenant.telegram_token)
+    return tenants
+
+
+def admit_tenant(bot, tenant):
+    """Проверка получателя, добавляемого через административный API.
+
+    Тот же путь, что и при запуске: токены скрываются в логе, а при
+    отказе в доступе выбрасывается ``CheckTokensError``.
+    """
+    register_tenants([tenant])
+    verify_credentials(bot, [tenant])
+
+
+def configured_tenants():
+    """Получатели из TENANTS_FILE или один получатель из окружения."""
+    if TENANTS_FILE:
+        return register_tenants(load_tenants(TENANTS_FILE, RETRY_PERIOD))
+    return [Tenant(TELEGRAM_CHAT_ID, PRACTICUM_TOKEN, TELEGRAM_CHAT_ID,
+                   RETRY_PERIOD)]
+
+
+def fetch_history(tenant):
+    """Проверенный ответ API со всеми работами получателя."""
+    response = request_api(0, tenant.headers)
+    return {'homeworks': check_response(response),
+            'current_date': response['current_date']}
+
+
+def tenant_bot(bot, tenant):
+    """Бот получателя: отдельный по его токену или общий.
+
+    В теневом режиме ``bot`` - теневой бот, и он используется для всех
+    получателей, чтобы ничего не уходило в настоящий Telegram.
+    """
+    if tenant.telegram_token and not SHADOW_LOG_PATH:
+        return delivery.bot(tenant.telegram_token)
+    return bot
+
+
+def notify_tenant(bot, tenant, homework, history=None, clock=system_clock):
+    """Уведомление получателя, если статус работы изменился.
+
+    Возвращает False, если уведомление не удалось отправить.
+    """
+    key = homework_key(homework)
+    if tenant.statuses.get(key) == homework['status']:
+        return True
+    message = status_message(homework, tenant.locale)
+    record_status(history, homework, tenant.name)
+    logger.info('[%s] Статус проверки изменился: %s',
+                tenant.name, homework['status'])
+    if not send_message_to(bot, tenant.chat_id, message):
+        return False
+    observe_delivery(homework, clock)
+    tenant.statuses[key] = homework['status']
+    tenant.changed_at = clock.time()
+    return True
+
+
+def poll_tenant(bot, tenant, history=None, http_get=None,
+                clock=system_clock):
+    """Один цикл опроса API для получателя.
+
+    Уведомления отправляются по всем изменившимся работам, начиная
+    с давних. Если отправка не удалась, курсор не сдвигается и
+    неотправленные изменения придут в следующем опросе. ``clock`` -
+    часы ``TenantRuntime``, по ним отмечается время изменения.
+    """
+    bot = tenant_bot(bot, tenant)
+    logs.start_cycle(tenant.name)
+    try:
+        response = request_api(tenant.cursor, tenant.headers, http_get)
+        for homework in reversed(check_response(response)):
+            if not notify_tenant(bot, tenant, homework, history, clock):
+                return
+        tenant.cursor = response.get('current_date', tenant.cursor)
+        tenant.last_error = None
+        tenant.failures = 0
+    except Exception as error:
+        tenant.error_count += 1
+        tenant.failures += 1
+        message = error_message(error, tenant.locale)
+        logger.error(f'[{tenant.name}] Сбой в работе программы: {error}')
+        if str(error) != tenant.last_error:
+            send_message_to(bot, tenant.chat_id, message)
+        tenant.last_error = str(error)
+
+
+def run_tenants(bot, tenants, history=None, elector=None,
+                clock=system_clock):
+    """Опрос нескольких получателей, каждого со своим периодом.
+
+    Сроки следующих опросов хранит планировщик; наступившие
+    опросы выполняются в пуле потоков. При ошибках подряд интервал
+    опроса получателя растёт. Если задан ``ADMIN_PORT``, получателями
+    можно управлять через административный API, а с ``SNAPSHOT_PATH``
+    состояние переживает перезапуск.
+    """
+    runtime = TenantRuntime(
+        tenants, lambda tenant: poll_tenant(bot, tenant, history,
+                                            clock=clock),
+        clock=clock, workers=POLL_WORKERS, elector=elector,
+        monitor=slo_monitor,
+        shedder=LoadShedder(POLL_WORKERS * 2, SHED_MAX_LAG,
+                            clock=clock.time),
+        on_takeover=(lambda runtime: warm_start(SNAPSHOT_PATH, runtime))
+        if SNAPSHOT_PATH else None)
+    if ADMIN_PORT:
+        AdminServer(runtime, ADMIN_PORT, RETRY_PERIOD,
+                    prepare=lambda tenant: admit_tenant(bot, tenant)).start()
+    deadlines = writer = None
+    if SNAPSHOT_PATH:
+        deadlines = warm_start(SNAPSHOT_PATH, runtime)
+        writer = SnapshotWriter(SNAPSHOT_PATH, runtime, elector=elector)
+        writer.start()
+    try:
+        runtime.run_forever(deadlines)
+    finally:
+        runtime.stop()
+        if writer is not None:
+            writer.stop()
+
+
+def verify_credentials(bot, tenants):
+    """Проверка учётных данных всех получателей при запуске.
+
+    Получатели, которым отказано в доступе, исключаются из опроса;
+    если неверен токен бота или исправных получателей не осталось,
+    бот останавливается. Временные сбои проверки только логируются.
+    """
+    problems = verify(
+        bot, tenants,
+        lambda tenant: request_api(int(time.time()), tenant.headers),
+        bot_for=lambda tenant: tenant_bot(bot, tenant))
+    for problem in problems:
+        owner = problem.tenant.name if problem.tenant else 'bot'
+        if problem.fatal:
+            logger.critical(f'[{owner}] Ошибка проверки {problem.check}: '
+                            f'{problem.error}')
+        else:
+            logger.warning(f'[{owner}] Проверка {problem.check} не прошла '
+                           f'из-за временного сбоя: {problem.error}')
+    if any(problem.tenant is None and problem.fatal for problem in problems):
+        raise CheckTokensError('telegram_token')
+    tenants = quarantine(tenants, problems)
+    if not tenants:
+        raise CheckTokensError('Нет получателей с верными учётными данными.')
+    return tenants
+
+
+def prepare_tenants(bot):
+    """Проверенные получатели с загруженной историей."""
+    tenants = verify_credentials(bot, configured_tenants())
+    if BACKFILL_ON_START:
+        backfill(tenants, fetch_history)
+    return tenants
+
+
+def start_cursor():
+    """Начальная отметка ``main``.
+
+    Отметка берётся из снимка ``SNAPSHOT_PATH`` (его записывает
+    и ``backfill.py``), а с ``BACKFILL_ON_START`` - из ответа с историей
+    получателя: уже известные статусы не присылаются заново.
+    """
+    now = int(time.time())
+    if not (SNAPSHOT_PATH or BACKFILL_ON_START):
+        return now
+    tenants = configured_tenants()
+    if SNAPSHOT_PATH:
+        warm_start(SNAPSHOT_PATH, TenantRuntime(tenants, lambda tenant: None))
+    if BACKFILL_ON_START:
+        backfill(tenants, fetch_history)
+    return tenants[0].cursor or now
+
+
+def run_configured_mode(bot, history, elector):
+    """Запуск режима из настроек, если он отличается от основного.
+
+    Режимы нескольких получателей и конвейера работают бесконечно;
+    для одного получателя функция возвращает управление в ``main``.
+    """
+    if TENANTS_FILE:
+        run_tenants(bot, prepare_tenants(bot), history, elector=elector)
+    if VERIFY_ON_START:
+        verify_credentials(bot, configured_tenants())
+    if PIPELINE_ENABLED:
+        run_pipeline(bot, history, elector)
+
+
+def open_history():
+    """База истории статусов, если она задана.
+
+    Остаток очереди записи сохраняется при выходе, в том числе
+    при остановке по SIGTERM.
+    """
+    if not HISTORY_DB_PATH:
+        return None
+    history = HistoryStore(HISTORY_DB_PATH)
+    atexit.register(history.close)
+    return history
+
+
 def main():
     """Основная логика работы бота."""
     check_tokens()
     # Создаем объект класса бота
     bot = telebot.TeleBot(token=TELEGRAM_TOKEN)
-    timestamp_label = int(time.time())
-    last_timestamp_label = None
+    delivery.install()
+    if SHADOW_LOG_PATH:
+        logger.warning('Теневой режим: сообщения записываются '
+                       f'в {SHADOW_LOG_PATH} и не отправляются.')
+        bot = ShadowBot(SHADOW_LOG_PATH)
+    timestamp_label = start_cursor()
     last_error = None
+    history = open_history()
+    start_slo_alerts(bot)
+    elector = start_election()
+    run_configured_mode(bot, history, elector)
     while True:
+        if ensure_leadership(elector):
+            # Изменения до этого момента разослал прежний ведущий.
+            timestamp_label = int(time.time())
+        logs.start_cycle()
         try:
             response = get_api_answer(timestamp_label)
             homework = check_response(response)
+            delivered = True
             if homework:
                 homework = homework[0]
                 message = parse_status(homework)
+                record_status(history, homework)
                 homework_status = homework['status']
-                logger.info(f'Статус проверки изменился: {homework_status}')
-                if send_message(bot, message):
-                    response.get('current_date', last_timestamp_label)
-            logger.info(
-                'Статус проверки не изменился. '
-                f'Повторная проверка через {RETRY_PERIOD / 60} минут.')
+                logger.info('Статус проверки изменился: %s', homework_status)
+                delivered = send_message(bot, message)
+                if delivered:
+                    observe_delivery(homework)
+            # Курсор сдвигается после доставки: иначе то же изменение
+            # вернулось бы снова и задержка доставки учитывалась бы
+            # в каждом цикле.
+            if delivered:
+                timestamp_label = response.get('current_date',
+                                               timestamp_label)
+            logger.info('Статус проверки не изменился. '
+                        'Повторная проверка через %s минут.',
+                        RETRY_PERIOD / 60)
             last_error = None
         except Exception as error:
-            message = f'Сбой в работе программы: {error}'
+            message = error_message(error)
             if last_error != error:
                 send_message(bot, message)
                 logger.error(message)
@@ -160,11 +757,23 @@ def main():
             time.sleep(RETRY_PERIOD)
 
 
+def terminate(signum, frame):
+    """Остановка по SIGTERM так же, как по Ctrl+C."""
+    logger.info('Получен SIGTERM, бот останавливается.')
+    raise SystemExit(0)
+
+
 if __name__ == '__main__':
+    signal.signal(signal.SIGTERM, terminate)
+    # Обработчики только у корневого логгера: так выборка, маскирование
+    # и формат одинаковы для всех записей бота.
     logging.basicConfig(
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         level=logging.DEBUG,
-        filename='bot_check_homework_logs.log',
-        filemode='a',
-        encoding='utf-8',)
+        handlers=(
+            logging.FileHandler(filename='bot_check_homework_logs.log',
+                                mode='a', encoding='utf-8'),
+            logging.StreamHandler(sys.stdout)))
+    logs.configure(json_format=LOG_FORMAT == 'json', every=LOG_SAMPLE_EVERY,
+                   per_second=LOG_SAMPLE_RATE, redactor=log_redactor)
     main()
@@ -0,0 +1,235 @@
+"""Журнал событий бота только на дозапись с групповой фиксацией.
+
+Запись в файле: длина данных (4 байта), CRC32 данных (4 байта)
+и сами данные - JSON в UTF-8. Журнал делится на сегменты
+``journal-NNNNNN.log``; повреждённый или недописанный хвост
+последнего сегмента при чтении отбрасывается.
+"""
+import json
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+
+logger = logging.getLogger(__name__)
+
+
+HEADER = struct.Struct('<II')
+SEGMENT_SIZE = 64 * 1024 * 1024
+COMMIT_INTERVAL = 0.05
+COMMIT_BYTES = 1024 * 1024
+SEGMENT_PATTERN = 'journal-{:06d}.log'
+READ_BUFFER = 1024 * 1024
+
+
+def encode(event):
+    """Запись журнала для события."""
+    data = json.dumps(event, ensure_ascii=False,
+                      separators=(',', ':')).encode()
+    return HEADER.pack(len(data), zlib.crc32(data)) + data
+
+
+def segments(directory):
+    """Сегменты журнала по порядку."""
+    names = sorted(name for name in os.listdir(directory)
+                   if name.startswith('journal-') and name.endswith('.log'))
+    return [os.path.join(directory, name) for name in names]
+
+
+def read_records(path):
+    """Данные записей сегмента с их концом до первой повреждённой."""
+    with open(path, 'rb', buffering=READ_BUFFER) as file:
+        position = 0
+        while True:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return
+            size, checksum = HEADER.unpack(header)
+            data = file.read(size)
+            if len(data) < size or zlib.crc32(data) != checksum:
+                logger.warning(f'Повреждённая запись в {path} '
+                               f'на позиции {position}.')
+                return
+            position += HEADER.size + size
+            yield data, position
+
+
+def read_segment(path):
+    """События одного сегмента."""
+    for data, _ in read_records(path):
+        yield json.loads(data)
+
+
+def read_journal(directory):
+    """Последовательное чтение всех событий журнала."""
+    for path in segments(directory):
+        yield from read_segment(path)
+
+
+class Journal:
+    """Журнал с фоновой записью и одним fsync на группу событий.
+
+    ``append`` кодирует событие и ставит его в очередь, не дожидаясь
+    диска. Поток-писатель собирает события за ``commit_interval``
+    секунд (или до ``commit_bytes`` байт), записывает их и вызывает
+    fsync один раз на всю группу. Дождаться сохранности события
+    можно через ``wait_durable``. Если группу записать не удалось,
+    её недописанные данные отбрасываются, чтобы следующие события
+    оставались читаемыми.
+    """
+
+    def __init__(self, directory, segment_size=SEGMENT_SIZE,
+                 commit_interval=COMMIT_INTERVAL, commit_bytes=COMMIT_BYTES):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.commit_interval = commit_interval
+        self.commit_bytes = commit_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._segment = self._recover()
+        self._file = self._open_segment()
+        self._queue = queue.Queue()
+        self._sequence = 0
+        # Номер последнего обработанного события и диапазоны номеров
+        # групп, которые не удалось записать.
+        self._done = 0
+        self._failed = []
+        self._lock = threading.Lock()
+        self._committed = threading.Condition(self._lock)
+        self._stop = object()
+        self._writer = threading.Thread(
+            target=self._run, name='journal-writer', daemon=True)
+        self._writer.start()
+
+    def _recover(self):
+        """Номер текущего сегмента; недописанный хвост обрезается."""
+        existing = segments(self.directory)
+        if not existing:
+            return 1
+        last = existing[-1]
+        number = int(os.path.basename(last)[len('journal-'):-len('.log')])
+        valid = 0
+        for _, valid in read_records(last):
+            pass
+        if valid != os.path.getsize(last):
+            logger.warning(f'Хвост сегмента {last} после позиции {valid} '
+                           'повреждён и будет отброшен.')
+            os.truncate(last, valid)
+        return number + 1 if valid >= self.segment_size else number
+
+    def _open_segment(self):
+        path = os.path.join(self.directory,
+                            SEGMENT_PATTERN.format(self._segment))
+        return open(path, 'ab')
+
+    def append(self, event):
+        """Постановка события в журнал; возвращает его номер."""
+        record = encode(event)
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+            self._queue.put((sequence, record))
+        return sequence
+
+    def wait_durable(self, sequence, timeout=None):
+        """Ожидание, пока событие с номером не окажется на диске.
+
+        False, если срок вышел или событие записать не удалось.
+        """
+        with self._committed:
+            if not self._committed.wait_for(
+                    lambda: self._done >= sequence, timeout):
+                return False
+            return not any(first <= sequence <= last
+                           for first, last in self._failed)
+
+    def _finish(self, records, failed=False):
+        """Пробуждение ожидающих после обработки группы."""
+        with self._committed:
+            if failed:
+                self._failed.append((records[0][0], records[-1][0]))
+            self._done = records[-1][0]
+            self._committed.notify_all()
+
+    def _collect(self):
+        """Сбор группы записей для одной фиксации."""
+        batch = [self._queue.get()]
+        size = 0 if batch[0] is self._stop else len(batch[0][1])
+        deadline = time.monotonic() + self.commit_interval
+        while size < self.commit_bytes and batch[-1] is not self._stop:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is not self._stop:
+                size += len(item[1])
+        return batch
+
+    def _commit(self, records):
+        """Запись группы, fsync и смена сегмента при переполнении."""
+        if self._file.closed:
+            self._file = self._open_segment()
+        start = self._file.tell()
+        try:
+            for _, record in records:
+                self._file.write(record)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError:
+            self._discard(start)
+            raise
+        self._finish(records)
+        if self._file.tell() >= self.segment_size:
+            self._file.close()
+            self._segment += 1
+            self._file = self._open_segment()
+
+    def _discard(self, start):
+        """Обрезка сегмента до начала недописанной группы.
+
+        Если обрезать не удаётся, следующие группы пишутся в новый
+        сегмент: чтение сегмента останавливается на повреждённой
+        записи, и записанное после неё было бы потеряно.
+        """
+        path = self._file.name
+        try:
+            # Буфер с недописанными данными при закрытии отбрасывается.
+            self._file.close()
+        except OSError:
+            pass
+        try:
+            os.truncate(path, start)
+        except OSError as err:
+            logger.error(f'Не удалось обрезать сегмент {path}: {err}')
+            self._segment += 1
+        try:
+            self._file = self._open_segment()
+        except OSError as err:
+            logger.error(f'Не удалось открыть сегмент журнала: {err}')
+
+    def _run(self):
+        """Цикл потока-писателя."""
+        while True:
+            batch = self._collect()
+            records = [item for item in batch if item is not self._stop]
+            if records:
+                try:
+                    self._commit(records)
+                except OSError as err:
+                    logger.error(f'Ошибка записи журнала событий: {err}')
+                    self._finish(records, failed=True)
+            if len(records) != len(batch):
+                self._file.close()
+                return
+
+    def close(self):
+        """Фиксация оставшихся событий и остановка писателя."""
+        self._queue.put(self._stop)
+        self._writer.join()
@@ -0,0 +1,154 @@
+"""Выбор единственного активного экземпляра бота через аренду."""
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+
+logger = logging.getLogger(__name__)
+
+
+LEASE_TTL = 6.0
+HEARTBEAT_INTERVAL = 2.0
+
+
+class LeaseBackend(ABC):
+    """Хранилище аренд: базовый класс для разных реализаций."""
+
+    @abstractmethod
+    def acquire(self, name, owner, ttl):
+        """Взятие или продление аренды; True, если она у ``owner``."""
+
+    @abstractmethod
+    def release(self, name, owner):
+        """Освобождение аренды, если ею владеет ``owner``."""
+
+
+class SQLiteLeaseBackend(LeaseBackend):
+    """Аренды в локальном файле SQLite."""
+
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None,
+            check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS leases ('
+            ' name TEXT PRIMARY KEY,'
+            ' owner TEXT NOT NULL,'
+            ' expires_at REAL NOT NULL)')
+
+    def acquire(self, name, owner, ttl):
+        """Взятие или продление аренды; True, если она у ``owner``."""
+        now = self._clock()
+        with self._lock:
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                updated = self._connection.execute(
+                    'INSERT INTO leases (name, owner, expires_at) '
+                    'VALUES (?, ?, ?) '
+                    'ON CONFLICT (name) DO UPDATE SET '
+                    ' owner = excluded.owner,'
+                    ' expires_at = excluded.expires_at '
+                    'WHERE leases.owner = excluded.owner '
+                    ' OR leases.expires_at <= ?',
+                    (name, owner, now + ttl, now)).rowcount
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+            self._connection.execute('COMMIT')
+        return updated == 1
+
+    def release(self, name, owner):
+        """Освобождение аренды, если ею владеет ``owner``."""
+        with self._lock:
+            self._connection.execute(
+                'DELETE FROM leases WHERE name = ? AND owner = ?',
+                (name, owner))
+
+
+class LeaderElector:
+    """Удержание аренды в фоновом потоке.
+
+    Ведущий продлевает аренду каждые ``heartbeat`` секунд; резервные
+    экземпляры с той же периодичностью пытаются её взять и становятся
+    ведущими не позже чем через ``ttl + heartbeat`` секунд после
+    остановки прежнего. Для разбиения получателей на части достаточно
+    запустить по экземпляру на каждое имя аренды.
+    """
+
+    def __init__(self, backend, name, owner=None, ttl=LEASE_TTL,
+                 heartbeat=HEARTBEAT_INTERVAL):
+        self.backend = backend
+        self.name = name
+        self.owner = owner or (
+            f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}')
+        self.ttl = ttl
+        self.heartbeat = heartbeat
+        self._leader = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self):
+        """Является ли экземпляр ведущим."""
+        return self._leader.is_set()
+
+    def _beat(self):
+        """Одна попытка взять или продлить аренду."""
+        try:
+            acquired = self.backend.acquire(self.name, self.owner, self.ttl)
+        except Exception as error:
+            logger.error(f'Ошибка продления аренды {self.name}: {error}')
+            acquired = False
+        if acquired and not self.is_leader:
+            logger.info(f'{self.owner} стал ведущим ({self.name}).')
+            self._leader.set()
+        elif not acquired and self.is_leader:
+            logger.warning(f'{self.owner} потерял аренду ({self.name}).')
+            self._leader.clear()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._beat()
+            self._stopped.wait(self.heartbeat)
+
+    def start(self):
+        """Запуск фонового продления аренды."""
+        self._beat()
+        self._thread = threading.Thread(
+            target=self._run, name=f'lease-{self.name}', daemon=True)
+        self._thread.start()
+
+    def wait_for_leadership(self, timeout=None):
+        """Ожидание, пока экземпляр не станет ведущим."""
+        return self._leader.wait(timeout)
+
+    def stop(self):
+        """Остановка продления и освобождение аренды."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.is_leader:
+            self.backend.release(self.name, self.owner)
+            self._leader.clear()
+
+
+def ensure_leadership(elector):
+    """Ожидание роли ведущего; без выбора ведущего не ждёт.
+
+    Возвращает True, если экземпляр ждал и только что стал ведущим:
+    его состояние опроса устарело и его нужно обновить.
+    """
+    if elector is None or elector.is_leader:
+        return False
+    logger.info('Экземпляр в резерве, ожидается освобождение аренды '
+                f'{elector.name}.')
+    elector.wait_for_leadership()
+    return True
@@ -0,0 +1,98 @@
+"""Адаптивный лимит одновременных запросов к API (AIMD).
+
+Постоянное число одновременных запросов либо мало, либо перегружает
+API, когда тот замедляется. ``AdaptiveLimiter`` подбирает лимит сам:
+пока ответы быстрые и успешные, лимит растёт на единицу за каждый
+полный лимит ответов, а при ошибке перегрузки или росте задержки
+относительно базовой лимит умножается на ``backoff``.
+"""
+import threading
+import time
+
+from metrics import registry as default_registry
+
+
+MIN_LIMIT = 1
+MAX_LIMIT = 32
+BACKOFF = 0.5
+# Во сколько раз сглаженная задержка может превышать базовую.
+TOLERANCE = 2.0
+SMOOTHING = 0.2
+# Насколько базовая задержка подтягивается к текущей за ответ: так она
+# следует за медленным изменением сети, но не за перегрузкой.
+BASELINE_DRIFT = 0.01
+
+
+class AdaptiveLimiter:
+    """Лимит одновременных запросов по принципу AIMD.
+
+    ``acquire`` ждёт свободного места и возвращает время начала
+    запроса, ``release`` освобождает место и учитывает результат.
+    Ответы на запросы, начатые до последнего снижения, снова лимит
+    не снижают: они отражают ещё прежнюю нагрузку. Лимит растёт, только
+    если занята хотя бы половина его, иначе успешные ответы ничего
+    не говорят о пропускной способности API.
+    """
+
+    def __init__(self, initial=MIN_LIMIT, min_limit=MIN_LIMIT,
+                 max_limit=MAX_LIMIT, backoff=BACKOFF, tolerance=TOLERANCE,
+                 name='api', clock=time.monotonic,
+                 registry=default_registry):
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.clock = clock
+        self.in_flight = 0
+        self.baseline = None
+        self.latency = None
+        self._decreased_at = None
+        self._condition = threading.Condition()
+        self._limit_gauge = registry.gauge(f'limiter.{name}.limit')
+        self._in_flight_gauge = registry.gauge(f'limiter.{name}.in_flight')
+        self._decreases = registry.counter(f'limiter.{name}.decreases')
+        self._limit_gauge.set(int(self.limit))
+
+    def acquire(self):
+        """Ожидание свободного места; время начала запроса."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+            self._in_flight_gauge.set(self.in_flight)
+            return self.clock()
+
+    def release(self, started, overloaded=False):
+        """Освобождение места и пересчёт лимита по результату запроса."""
+        now = self.clock()
+        with self._condition:
+            if self._decreased_at is None or started >= self._decreased_at:
+                self._update(now - started, overloaded, now)
+            self.in_flight -= 1
+            self._in_flight_gauge.set(self.in_flight)
+            self._condition.notify_all()
+
+    def _update(self, latency, overloaded, now):
+        if not overloaded:
+            self._observe(latency)
+        if overloaded or self.latency > self.tolerance * self.baseline:
+            self.limit = max(self.limit * self.backoff, self.min_limit)
+            self._decreased_at = now
+            # Сглаженная задержка снова набирается уже при новом лимите.
+            self.latency = self.baseline
+            self._decreases.inc()
+        elif self.in_flight * 2 >= self.limit:
+            self.limit = min(self.limit + 1 / int(self.limit),
+                             self.max_limit)
+        self._limit_gauge.set(int(self.limit))
+
+    def _observe(self, latency):
+        if self.baseline is None:
+            self.baseline = self.latency = latency
+            return
+        self.latency += (latency - self.latency) * SMOOTHING
+        if latency < self.baseline:
+            self.baseline = latency
+        else:
+            self.baseline += (latency - self.baseline) * BASELINE_DRIFT
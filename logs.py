@@ -0,0 +1,173 @@
+"""Настройка вывода логов: JSON, выборка по месту вызова, скрытие секретов.
+
+Фильтры и форматтер ставятся на обработчики, а не на логгеры, поэтому
+другие обработчики (например, в тестах) получают все записи как есть.
+"""
+import contextvars
+import itertools
+import json
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+
+SECRET_PATTERNS = (
+    # Токен Практикума в заголовке Authorization.
+    re.compile(r'(OAuth\s+)[^\s\'",}]+'),
+    # Токен бота в адресах Bot API.
+    re.compile(r'(bot\d+:)[\w-]+'),
+)
+MASK = '***'
+# ``extra`` для записей, которые выборка не отбрасывает.
+UNSAMPLED = {'sampled': False}
+
+context = contextvars.ContextVar('log_context', default={})
+cycles = itertools.count(1)
+
+
+def start_cycle(tenant=None):
+    """Новый номер цикла опроса в контексте логов текущего потока."""
+    cycle = next(cycles)
+    context.set({'tenant': tenant, 'cycle': cycle})
+    return cycle
+
+
+class ContextFilter(logging.Filter):
+    """Добавление в запись получателя и номера цикла из контекста."""
+
+    def filter(self, record):
+        """Запись всегда пропускается."""
+        fields = context.get()
+        record.tenant = fields.get('tenant')
+        record.cycle = fields.get('cycle')
+        return True
+
+
+class RedactingFilter(logging.Filter):
+    """Замена токенов в тексте записи на ``***``.
+
+    Кроме известных секретов из ``add`` скрываются всё, что похоже на
+    токен Практикума в заголовке и на токен бота в адресе Bot API.
+    """
+
+    def __init__(self, secrets=()):
+        super().__init__()
+        self.secrets = {secret for secret in secrets if secret}
+
+    def add(self, secret):
+        """Добавление секрета."""
+        if secret:
+            self.secrets.add(secret)
+
+    def redact(self, text):
+        """Текст со скрытыми секретами."""
+        for secret in self.secrets:
+            text = text.replace(secret, MASK)
+        for pattern in SECRET_PATTERNS:
+            text = pattern.sub(rf'\g<1>{MASK}', text)
+        return text
+
+    def filter(self, record):
+        """Текст записи заменяется уже отформатированным и очищенным."""
+        message = record.getMessage()
+        redacted = self.redact(message)
+        if redacted != message:
+            record.msg, record.args = redacted, ()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.redact(
+                logging.Formatter().formatException(record.exc_info))
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Выборка записей по месту вызова.
+
+    Из записей одного места (файл и строка) проходит каждая
+    ``every``-я и не больше ``per_second`` в секунду; первая проходит
+    всегда. Пропущенные считаются, и их число попадает в поле
+    ``suppressed`` следующей прошедшей записи. Предупреждения,
+    ошибки и записи с ``extra=UNSAMPLED`` не отбрасываются.
+
+    Выборка экономит форматирование, только если текст записи
+    собирается лениво: ``logger.debug('... %s', value)``, а не f-строкой.
+    """
+
+    def __init__(self, every=1, per_second=None, level=logging.WARNING,
+                 clock=time.monotonic):
+        super().__init__()
+        self.every = every
+        self.per_second = per_second
+        self.level = level
+        self.clock = clock
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        """Пропустить ли запись."""
+        record.suppressed = 0
+        if record.levelno >= self.level or not getattr(
+                record, 'sampled', True):
+            return True
+        now = self.clock()
+        with self._lock:
+            site = self._sites.setdefault(
+                (record.pathname, record.lineno),
+                {'seen': 0, 'second': now, 'emitted': 0, 'suppressed': 0})
+            site['seen'] += 1
+            if now - site['second'] >= 1:
+                site['second'], site['emitted'] = now, 0
+            if ((site['seen'] - 1) % self.every
+                    or self.per_second is not None
+                    and site['emitted'] >= self.per_second):
+                site['suppressed'] += 1
+                return False
+            site['emitted'] += 1
+            record.suppressed, site['suppressed'] = site['suppressed'], 0
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись лога одной строкой JSON."""
+
+    def format(self, record):
+        """JSON с текстом, местом вызова и полями контекста."""
+        data = {
+            'time': datetime.fromtimestamp(
+                record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'site': f'{record.module}:{record.lineno}',
+        }
+        for name in ('tenant', 'cycle', 'suppressed'):
+            value = getattr(record, name, None)
+            if value:
+                data[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+def configure(logger=None, json_format=False, every=1, per_second=None,
+              redactor=None):
+    """Установка фильтров и форматтера на все обработчики логгера.
+
+    У каждого обработчика своя выборка: общая считала бы каждую запись
+    столько раз, сколько обработчиков её получает. Возвращает общие
+    фильтры контекста и маскирования.
+    """
+    logger = logger or logging.getLogger()
+    filters = [ContextFilter(), redactor or RedactingFilter()]
+    for handler in logger.handlers:
+        if every > 1 or per_second is not None:
+            # Выборка первой: отброшенные записи не форматируются.
+            handler.addFilter(SamplingFilter(every, per_second))
+        for log_filter in filters:
+            handler.addFilter(log_filter)
+        if json_format:
+            handler.setFormatter(JsonFormatter())
+    return filters
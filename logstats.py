@@ -0,0 +1,247 @@
+"""Статистика по логу бота без загрузки файла в память.
+
+Понимает и текстовый лог, и JSON-строки из ``LOG_FORMAT=json``.
+Запуск: python logstats.py [путь к логу] [--json] [--workers N]
+"""
+import argparse
+import glob
+import json
+import mmap
+import os
+import re
+import statistics
+import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+
+LOG_PATH = 'bot_check_homework_logs.log'
+# Строки в формате logging.basicConfig из homework.py:
+# "2024-01-01 10:00:00,123 - __main__ - ERROR - сообщение".
+RECORD_PATTERN = re.compile(
+    rb'^(\d{4}-\d\d-\d\d \d\d:\d\d):(\d\d),(\d{3}) - [^ ]+ - '
+    rb'([A-Z]+) - (.*)$')
+ERROR_TYPE_PATTERN = re.compile(r'\(Тип ошибки: (\w+)\)'.encode())
+DIGITS_PATTERN = re.compile(r'\d+')
+POLL_MARKER = 'Программа начала запрос'.encode()
+SEND_FAILURE_MARKER = 'Ошибка при отправке сообщения'.encode()
+FAILURE_MARKER = 'Сбой в работе программы: '.encode()
+ERROR_LEVELS = (b'ERROR', b'CRITICAL')
+CHUNK_SIZE = 64 * 1024 * 1024
+
+
+def log_files(path):
+    """Лог и его ротированные копии от старых к новым."""
+    def age(name):
+        suffix = name[len(path) + 1:]
+        return int(suffix) if suffix.isdigit() else 0
+
+    rotated = [name for name in glob.glob(glob.escape(path) + '.*')
+               if name[len(path) + 1:].isdigit()]
+    files = sorted(rotated, key=age, reverse=True)
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def split_chunks(path, size, parts):
+    """Границы частей файла, выровненные по концам строк."""
+    if size == 0:
+        return []
+    step = max(size // parts, 1)
+    bounds = [0]
+    with open(path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            while bounds[-1] + step < size:
+                end = data.find(b'\n', bounds[-1] + step)
+                if end == -1:
+                    break
+                bounds.append(end + 1)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def error_signature(message):
+    """Тип ошибки из сообщения лога."""
+    match = ERROR_TYPE_PATTERN.search(message)
+    if match:
+        return match.group(1).decode()
+    if message.startswith(FAILURE_MARKER):
+        message = message[len(FAILURE_MARKER):]
+    text = message.decode(errors='replace').split(':')[0]
+    return DIGITS_PATTERN.sub('N', text)[:80]
+
+
+def poll_time(minute, second, millisecond):
+    """Время записи в секундах."""
+    return (datetime.strptime(minute.decode(), '%Y-%m-%d %H:%M').timestamp()
+            + int(second) + int(millisecond) / 1000)
+
+
+def record_time(stamp):
+    """Время записи в секундах по отметке из ``parse_record``."""
+    if isinstance(stamp, str):
+        return datetime.fromisoformat(stamp).timestamp()
+    return poll_time(*stamp)
+
+
+def parse_record(line):
+    """Минута, отметка времени, уровень, текст и получатель записи.
+
+    Время разбирается только по запросу через ``record_time``:
+    для большинства строк оно не нужно. None, если строка
+    не является записью лога.
+    """
+    if line.startswith(b'{'):
+        try:
+            record = json.loads(line)
+            stamp = record['time']
+            return (stamp[:16].replace('T', ' '), stamp,
+                    record['level'].encode(), record['message'].encode(),
+                    record.get('tenant'))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+    match = RECORD_PATTERN.match(line)
+    if match is None:
+        return None
+    minute, second, millisecond, level, message = match.groups()
+    return minute.decode(), (minute, second, millisecond), level, message, None
+
+
+def scan_chunk(path, start, end):
+    """Разбор части файла; возвращает частичную статистику.
+
+    Моменты опросов собираются отдельно по каждому получателю.
+    """
+    lines = Counter()
+    errors = Counter()
+    error_types = Counter()
+    polls = defaultdict(list)
+    send_failures = 0
+    with open(path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            data.seek(start)
+            while data.tell() < end:
+                record = parse_record(data.readline().rstrip(b'\r\n'))
+                if record is None:
+                    continue
+                bucket, stamp, level, message, tenant = record
+                lines[bucket] += 1
+                if level in ERROR_LEVELS:
+                    errors[bucket] += 1
+                    error_types[error_signature(message)] += 1
+                if message.startswith(POLL_MARKER):
+                    polls[tenant].append(record_time(stamp))
+                elif message.startswith(SEND_FAILURE_MARKER):
+                    send_failures += 1
+    return lines, errors, error_types, dict(polls), send_failures
+
+
+def interval_stats(intervals, polls):
+    """Сводка по интервалам между опросами или None."""
+    if not intervals:
+        return None
+    return {
+        'polls': polls,
+        'mean': round(statistics.fmean(intervals), 3),
+        'stdev': round(statistics.pstdev(intervals), 3),
+        'min': round(min(intervals), 3),
+        'max': round(max(intervals), 3),
+    }
+
+
+def summarize(results, top):
+    """Сведение частичной статистики по всем частям.
+
+    Интервалы считаются между опросами одного получателя;
+    ``poll_interval`` - сводка по интервалам всех получателей.
+    """
+    lines = Counter()
+    errors = Counter()
+    error_types = Counter()
+    polls = defaultdict(list)
+    send_failures = 0
+    for part_lines, part_errors, part_types, part_polls, failures in results:
+        lines.update(part_lines)
+        errors.update(part_errors)
+        error_types.update(part_types)
+        for tenant, moments in part_polls.items():
+            polls[tenant].extend(moments)
+        send_failures += failures
+    by_tenant = {}
+    intervals = []
+    for tenant, moments in polls.items():
+        tenant_intervals = [later - earlier for earlier, later
+                            in zip(moments, moments[1:])]
+        by_tenant[tenant] = interval_stats(tenant_intervals, len(moments))
+        intervals.extend(tenant_intervals)
+    return {
+        'timeline': [
+            {'minute': minute, 'lines': count, 'errors': errors[minute],
+             'error_rate': round(errors[minute] / count, 4)}
+            for minute, count in sorted(lines.items())],
+        'top_errors': error_types.most_common(top),
+        'poll_interval': interval_stats(
+            intervals, sum(len(moments) for moments in polls.values())),
+        'poll_interval_by_tenant': by_tenant,
+        'send_failures': send_failures,
+    }
+
+
+def analyze(path, workers=None, top=10, chunk_size=CHUNK_SIZE):
+    """Статистика по логу и его ротированным копиям.
+
+    Большие файлы делятся на части по границам строк и разбираются
+    в нескольких процессах; части собираются в исходном порядке.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = []
+    for name in log_files(path):
+        size = os.path.getsize(name)
+        parts = max(1, min(workers, -(-size // chunk_size)))
+        tasks.extend((name, start, end)
+                     for start, end in split_chunks(name, size, parts))
+    if workers == 1 or len(tasks) <= 1:
+        results = [scan_chunk(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(scan_chunk, *zip(*tasks)))
+    return summarize(results, top)
+
+
+def print_report(report):
+    """Вывод статистики таблицами."""
+    print('minute\tlines\terrors\terror_rate')
+    for row in report['timeline']:
+        print(f'{row["minute"]}\t{row["lines"]}\t{row["errors"]}\t'
+              f'{row["error_rate"]}')
+    print('\ncount\terror')
+    for signature, count in report['top_errors']:
+        print(f'{count}\t{signature}')
+    print(f'\npoll_interval\t{report["poll_interval"]}')
+    for tenant, stats in report['poll_interval_by_tenant'].items():
+        if tenant is not None:
+            print(f'poll_interval[{tenant}]\t{stats}')
+    print(f'send_failures\t{report["send_failures"]}')
+
+
+def main(argv=None):
+    """Командная строка для статистики по логу."""
+    parser = argparse.ArgumentParser(description='Статистика по логу бота.')
+    parser.add_argument('path', nargs='?', default=LOG_PATH)
+    parser.add_argument('--json', action='store_true',
+                        help='Вывод в формате JSON.')
+    parser.add_argument('--workers', type=int,
+                        help='Число процессов (по умолчанию - число ядер).')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args(argv)
+    report = analyze(args.path, workers=args.workers, top=args.top)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Простые потокобезопасные метрики бота."""
+import threading
+
+
+class Counter:
+    """Монотонно растущий счётчик."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Увеличение счётчика."""
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        """Текущее значение."""
+        return self._value
+
+
+class Gauge:
+    """Значение, которое может как расти, так и уменьшаться."""
+
+    def __init__(self):
+        self._value = 0
+
+    def set(self, value):
+        """Установка значения."""
+        self._value = value
+
+    @property
+    def value(self):
+        """Текущее значение."""
+        return self._value
+
+
+class Registry:
+    """Именованный набор метрик."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name, metric_class):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class()
+            if not isinstance(metric, metric_class):
+                raise TypeError(f'Метрика {name} уже зарегистрирована '
+                                f'как {type(metric).__name__}.')
+            return metric
+
+    def counter(self, name):
+        """Счётчик с указанным именем."""
+        return self._get(name, Counter)
+
+    def gauge(self, name):
+        """Измеритель с указанным именем."""
+        return self._get(name, Gauge)
+
+    def snapshot(self):
+        """Текущие значения всех метрик."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {name: metric.value for name, metric in sorted(
+            metrics.items())}
+
+
+registry = Registry()
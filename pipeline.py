@@ -0,0 +1,131 @@
+"""Конвейер обработки из независимых стадий с ограниченными очередями."""
+import logging
+import queue
+import threading
+import time
+
+from metrics import registry as default_registry
+
+
+logger = logging.getLogger(__name__)
+
+
+QUEUE_SIZE = 100
+
+
+class Stage:
+    """Стадия конвейера: очередь на входе и пул обработчиков.
+
+    ``handler`` принимает один элемент и возвращает список элементов
+    для следующей стадии (пустой список, если передавать нечего).
+    """
+
+    def __init__(self, name, handler, workers=1, queue_size=QUEUE_SIZE,
+                 registry=default_registry):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.inbox = queue.Queue(maxsize=queue_size)
+        self.next_stage = None
+        self.on_error = None
+        self.on_success = None
+        self.processed = registry.counter(f'pipeline.{name}.processed')
+        self.errors = registry.counter(f'pipeline.{name}.errors')
+        self.busy_seconds = registry.counter(f'pipeline.{name}.busy_seconds')
+        self.queue_depth = registry.gauge(f'pipeline.{name}.queue_depth')
+        self._threads = []
+
+    def put(self, item):
+        """Постановка элемента в очередь стадии.
+
+        Блокируется, пока в очереди нет места, - так медленные
+        последующие стадии притормаживают предыдущие.
+        """
+        self.inbox.put(item)
+        self.queue_depth.set(self.inbox.qsize())
+
+    def process(self, item):
+        """Обработка одного элемента и передача результата дальше."""
+        started = time.monotonic()
+        try:
+            outputs = self.handler(item) or []
+        except Exception as error:
+            self.errors.inc()
+            if self.on_error is None:
+                logger.error(f'Сбой на стадии {self.name}: {error}')
+            else:
+                self.on_error(self, item, error)
+            return
+        finally:
+            self.busy_seconds.inc(time.monotonic() - started)
+        self.processed.inc()
+        if self.on_success is not None:
+            self.on_success(self, item)
+        if self.next_stage is not None:
+            for output in outputs:
+                self.next_stage.put(output)
+
+    def _run(self):
+        """Цикл обработчика стадии."""
+        while True:
+            item = self.inbox.get()
+            self.queue_depth.set(self.inbox.qsize())
+            try:
+                if item is Pipeline.STOP:
+                    return
+                self.process(item)
+            finally:
+                self.inbox.task_done()
+
+    def start(self):
+        """Запуск обработчиков стадии."""
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f'{self.name}-{number}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Остановка обработчиков после обработки очереди."""
+        for _ in self._threads:
+            self.inbox.put(Pipeline.STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+
+class Pipeline:
+    """Последовательность стадий, связанных ограниченными очередями.
+
+    ``on_error(stage, item, error)`` вызывается при сбое обработки,
+    ``on_success(stage, item)`` - после успешной.
+    """
+
+    STOP = object()
+
+    def __init__(self, stages, on_error=None, on_success=None):
+        self.stages = stages
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.next_stage = next_stage
+        for stage in stages:
+            stage.on_error = on_error
+            stage.on_success = on_success
+
+    def start(self):
+        """Запуск всех стадий."""
+        for stage in self.stages:
+            stage.start()
+
+    def submit(self, item):
+        """Передача элемента на первую стадию."""
+        self.stages[0].put(item)
+
+    def join(self):
+        """Ожидание обработки всех поставленных элементов."""
+        for stage in self.stages:
+            stage.inbox.join()
+
+    def stop(self):
+        """Остановка стадий по порядку, начиная с первой."""
+        for stage in self.stages:
+            stage.stop()
@@ -0,0 +1,175 @@
+"""Общий для процессов бюджет запросов к API на каждый токен."""
+import hashlib
+import sqlite3
+import threading
+import time
+
+from exceptions import QuotaExceededError
+
+
+LIMIT = 30
+WINDOW = 60.0
+POLL_INTERVAL = 0.05
+ACQUIRE_TIMEOUT = 30.0
+# Ожидающий, который столько не обновлял свою отметку, считается
+# завершившимся (процесс упал) и удаляется из очереди.
+STALE_AFTER = 5.0
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS quota_slots ('
+    ' token TEXT NOT NULL,'
+    ' acquired_at REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS idx_quota_slots_token '
+    'ON quota_slots (token, acquired_at)',
+    'CREATE TABLE IF NOT EXISTS quota_waiters ('
+    ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+    ' token TEXT NOT NULL,'
+    ' seen_at REAL NOT NULL)',
+)
+
+
+def token_key(token):
+    """Ключ токена в журнале: сам токен в файл не записывается."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class QuotaLedger:
+    """Журнал выданных разрешений на запросы в файле SQLite.
+
+    На каждый токен выдаётся не больше ``limit`` разрешений
+    за скользящее окно ``window`` секунд, сколько бы процессов
+    ни работало с тем же файлом. Ожидающие обслуживаются в порядке
+    очереди (FIFO по всем процессам).
+    """
+
+    def __init__(self, path, limit=LIMIT, window=WINDOW,
+                 poll_interval=POLL_INTERVAL, timeout=ACQUIRE_TIMEOUT,
+                 clock=time.time):
+        self.path = path
+        self.limit = limit
+        self.window = window
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self._clock = clock
+        self._local = threading.local()
+        connection = self._connection()
+        for statement in SCHEMA:
+            connection.execute(statement)
+
+    def _connection(self):
+        """Соединение текущего потока."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+
+    def _try_acquire(self, connection, token, waiter_id):
+        """Попытка занять разрешение; возвращает время до повтора."""
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            delay = self._take_slot(connection, token, waiter_id)
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return delay
+
+    def _take_slot(self, connection, token, waiter_id):
+        """Выдача разрешения внутри транзакции, если подошла очередь."""
+        now = self._clock()
+        connection.execute(
+            'DELETE FROM quota_slots WHERE acquired_at <= ?',
+            (now - self.window,))
+        connection.execute(
+            'DELETE FROM quota_waiters WHERE seen_at < ?',
+            (now - STALE_AFTER,))
+        connection.execute(
+            'UPDATE quota_waiters SET seen_at = ? WHERE id = ?',
+            (now, waiter_id))
+        first = connection.execute(
+            'SELECT MIN(id) FROM quota_waiters WHERE token = ?',
+            (token,)).fetchone()[0]
+        used, oldest = connection.execute(
+            'SELECT COUNT(*), MIN(acquired_at) FROM quota_slots '
+            'WHERE token = ?', (token,)).fetchone()
+        if used >= self.limit:
+            return max(oldest + self.window - now, self.poll_interval)
+        if first != waiter_id:
+            return self.poll_interval
+        connection.execute(
+            'INSERT INTO quota_slots (token, acquired_at) VALUES (?, ?)',
+            (token, now))
+        connection.execute(
+            'DELETE FROM quota_waiters WHERE id = ?', (waiter_id,))
+        return 0
+
+    def acquire(self, token):
+        """Ожидание свободного разрешения на запрос с токеном."""
+        key = token_key(token)
+        connection = self._connection()
+        waiter_id = connection.execute(
+            'INSERT INTO quota_waiters (token, seen_at) VALUES (?, ?)',
+            (key, self._clock())).lastrowid
+        deadline = time.monotonic() + self.timeout
+        try:
+            while True:
+                delay = self._try_acquire(connection, key, waiter_id)
+                if not delay:
+                    return
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    raise QuotaExceededError(
+                        'Исчерпан лимит запросов к API: не более '
+                        f'{self.limit} за {self.window} с.')
+                # Будим ожидающего чаще, чем STALE_AFTER, чтобы
+                # его не сочли завершившимся.
+                time.sleep(min(delay, left, STALE_AFTER / 2))
+        except BaseException:
+            connection.execute(
+                'DELETE FROM quota_waiters WHERE id = ?', (waiter_id,))
+            raise
+
+    def used(self, token):
+        """Число разрешений, выданных токену в текущем окне."""
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM quota_slots '
+            'WHERE token = ? AND acquired_at > ?',
+            (token_key(token), self._clock() - self.window)).fetchone()[0]
+
+
+class SingleFlight:
+    """Объединение одинаковых запросов, выполняющихся одновременно.
+
+    Пока запрос с ключом выполняется, остальные вызовы с тем же
+    ключом ждут и получают его результат (или его исключение).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function):
+        """Выполнение ``function`` один раз на все одновременные вызовы."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {'done': threading.Event()}
+        if not leader:
+            call['done'].wait()
+            if 'error' in call:
+                raise call['error']
+            return call['result']
+        try:
+            call['result'] = function()
+        except BaseException as error:
+            call['error'] = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call['done'].set()
+        return call['result']
@@ -0,0 +1,147 @@
+"""Тексты уведомлений: шаблоны, языки и разметка Telegram.
+
+Шаблоны разбираются один раз при создании ``Renderer``; постоянный
+текст шаблона экранируется для режима разметки тогда же, а значения
+полей - при подстановке. Уведомления о статусах повторяются для
+множества получателей, поэтому готовые тексты хранятся в LRU-кэше.
+"""
+import html
+import re
+import string
+from functools import lru_cache
+
+
+MARKDOWN_V2 = 'MarkdownV2'
+HTML = 'HTML'
+PARSE_MODES = {mode.lower(): mode for mode in (MARKDOWN_V2, HTML)}
+# Символы, которые в MarkdownV2 нужно экранировать вне разметки.
+MARKDOWN_SPECIAL = re.compile(r'([_*\[\]()~`>#+\-=|{}.!\\])')
+CACHE_SIZE = 4096
+
+TEMPLATES = {
+    'ru': {
+        'status_changed': (
+            'Изменился статус проверки работы "{homework_name}". {verdict}'),
+        'status_changed_comment': (
+            'Изменился статус проверки работы "{homework_name}". {verdict}\n'
+            'Комментарий ревьюера: {reviewer_comment}'),
+        'error': 'Сбой в работе программы: {error}',
+    },
+    'en': {
+        'status_changed': (
+            'Review status of "{homework_name}" has changed. {verdict}'),
+        'status_changed_comment': (
+            'Review status of "{homework_name}" has changed. {verdict}\n'
+            'Reviewer comment: {reviewer_comment}'),
+        'error': 'The bot has failed: {error}',
+    },
+}
+
+VERDICTS = {
+    'en': {
+        'approved': 'Reviewed: the reviewer liked everything. Hooray!',
+        'reviewing': 'The reviewer has started the review.',
+        'rejected': 'Reviewed: the reviewer has some remarks.',
+    },
+}
+
+
+def parse_mode_name(value):
+    """Режим разметки в написании Telegram; ValueError для неизвестного."""
+    if not value:
+        return None
+    try:
+        return PARSE_MODES[value.lower()]
+    except KeyError:
+        raise ValueError(f'Неизвестный режим разметки: {value}.') from None
+
+
+def escape(text, parse_mode):
+    """Экранирование текста для режима разметки Telegram."""
+    if parse_mode == MARKDOWN_V2:
+        return MARKDOWN_SPECIAL.sub(r'\\\1', text)
+    if parse_mode == HTML:
+        return html.escape(text, quote=False)
+    return text
+
+
+class Template:
+    """Шаблон, заранее разобранный на текст и поля."""
+
+    def __init__(self, source, parse_mode=None):
+        self.parse_mode = parse_mode
+        self.parts = [
+            (escape(literal, parse_mode), field)
+            for literal, field, _, _ in string.Formatter().parse(source)]
+
+    def render(self, values):
+        """Текст с подставленными и экранированными значениями."""
+        return ''.join(
+            literal if field is None
+            else literal + escape(str(values[field]), self.parse_mode)
+            for literal, field in self.parts)
+
+
+class Renderer:
+    """Тексты уведомлений на нужном языке.
+
+    ``templates`` и ``verdicts`` - словари по языкам. Если для языка
+    нет шаблона или вердикта, используется язык ``locale``, поэтому для
+    него нужны все шаблоны и вердикты, иначе ValueError. Режим разметки
+    принимается в любом регистре. Метод
+    ``status`` кэширует готовые уведомления по названию работы,
+    статусу, языку и комментарию: в ``cache`` (``cache.BudgetCache``),
+    если он задан, иначе в LRU-кэше на ``cache_size`` записей.
+    Комментарии ревьюеров бывают длинными, и ограничение по памяти
+    надёжнее ограничения по числу записей.
+    """
+
+    def __init__(self, templates=TEMPLATES, verdicts=VERDICTS, locale='ru',
+                 parse_mode=None, cache_size=CACHE_SIZE, cache=None):
+        if locale not in templates or locale not in verdicts or any(
+                name not in templates[locale]
+                for items in templates.values() for name in items):
+            raise ValueError(f'Нет шаблонов или вердиктов для языка {locale}.')
+        parse_mode = parse_mode_name(parse_mode)
+        self.locale = locale
+        self.parse_mode = parse_mode
+        self.verdicts = verdicts
+        self.templates = {
+            (language, name): Template(source, parse_mode)
+            for language, items in templates.items()
+            for name, source in items.items()}
+        if cache is None:
+            self.status = lru_cache(maxsize=cache_size)(self._status)
+        else:
+            self.status = lambda *args: cache.get_or_set(
+                args, lambda: self._status(*args))
+
+    def template(self, name, locale=None):
+        """Шаблон на языке ``locale`` или на языке по умолчанию."""
+        template = self.templates.get((locale or self.locale, name))
+        return template or self.templates[self.locale, name]
+
+    def render(self, name, locale=None, **values):
+        """Текст по шаблону без кэширования."""
+        return self.template(name, locale).render(values)
+
+    def verdict(self, status, locale=None):
+        """Вердикт для статуса; KeyError для неизвестного статуса."""
+        verdicts = self.verdicts.get(locale or self.locale)
+        if verdicts is None or status not in verdicts:
+            verdicts = self.verdicts[self.locale]
+        return verdicts[status]
+
+    def _status(self, homework_name, status, locale=None,
+                reviewer_comment=None):
+        """Уведомление об изменении статуса работы."""
+        name = ('status_changed_comment' if reviewer_comment
+                else 'status_changed')
+        return self.render(
+            name, locale, homework_name=homework_name,
+            verdict=self.verdict(status, locale),
+            reviewer_comment=reviewer_comment)
+
+    def send_options(self):
+        """Параметры ``send_message`` для режима разметки."""
+        return {'parse_mode': self.parse_mode} if self.parse_mode else {}
@@ -0,0 +1,274 @@
+"""Опрос множества получателей по расписанию."""
+import random
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from clock import system_clock
+from leadership import ensure_leadership
+from scheduler import Scheduler
+
+
+WORKERS = 8
+# Предел увеличения интервала опроса при повторяющихся ошибках.
+MAX_BACKOFF = 3600
+# Окно, на которое растягиваются первые опросы после запуска.
+RAMP_UP = 60
+# Наибольшая случайная добавка к интервалу, доля периода.
+JITTER = 0.05
+
+
+def phase(name, period):
+    """Постоянное смещение опросов получателя внутри периода.
+
+    Вычисляется по имени, поэтому не меняется между перезапусками
+    и одинаково во всех экземплярах бота.
+    """
+    return zlib.crc32(name.encode()) / 2 ** 32 * period
+
+
+class TenantRuntime:
+    """Сроки опросов, пул обработчиков и состояние получателей.
+
+    ``poll(tenant)`` выполняет один опрос получателя. Часы передаются
+    снаружи: с ``clock.VirtualClock`` метод ``run_until`` прогоняет
+    расписание синхронно и мгновенно.
+
+    Опросы каждого получателя привязаны к его фазе внутри периода,
+    поэтому нагрузка распределена по периоду равномерно, сколько бы
+    получателей ни было и когда бы ни запустились экземпляры.
+    Опоздание опросов относительно расписания передаётся в
+    ``monitor`` (``slo.SLOMonitor``) как показатель ``scheduler_lag``.
+    При перегрузке ``shedder`` (``shedding.LoadShedder``) решает, какие
+    из наступивших опросов выполнить, а какие отложить. Получив роль
+    ведущего, экземпляр вызывает ``take_over``.
+    """
+
+    def __init__(self, tenants, poll, clock=system_clock, workers=WORKERS,
+                 elector=None, ramp_up=RAMP_UP, jitter=JITTER, rng=None,
+                 monitor=None, shedder=None, on_takeover=None):
+        self.poll = poll
+        self.on_takeover = on_takeover
+        self.clock = clock
+        self.workers = workers
+        self.elector = elector
+        self.ramp_up = ramp_up
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self.monitor = monitor
+        self.shedder = shedder
+        self.tenants = {tenant.name: tenant for tenant in tenants}
+        self.scheduler = Scheduler(clock=clock.monotonic)
+        self.polls = 0
+        # Опросов в очереди пула и в работе.
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._polling = set()
+        self._executor = None
+
+    def _jitter(self, period):
+        """Случайная добавка к интервалу."""
+        return self.rng.uniform(0, self.jitter * period)
+
+    def next_delay(self, tenant):
+        """Интервал до следующего опроса.
+
+        Без ошибок - до ближайшего момента фазы получателя; при ошибках
+        подряд интервал удваивается, но не больше ``MAX_BACKOFF``.
+        """
+        period = tenant.period
+        if tenant.failures:
+            delay = min(period * 2 ** min(tenant.failures - 1, 16),
+                        max(MAX_BACKOFF, period))
+            return delay + self._jitter(period)
+        now = self.clock.time()
+        offset = phase(tenant.name, period)
+        slot = ((now - offset) // period + 1) * period + offset
+        return slot - now + self._jitter(period)
+
+    def start_delay(self, tenant):
+        """Задержка первого опроса: запуски распределены по ``ramp_up``."""
+        window = min(self.ramp_up, tenant.period)
+        return phase(tenant.name, window) + self._jitter(window)
+
+    def start(self, deadlines=None):
+        """Начальные курсоры и постановка всех получателей в расписание.
+
+        ``deadlines`` - сроки опросов (unix-время) из снимка состояния;
+        сроки, наступившие за время перезапуска, распределяются по
+        ``ramp_up`` как при обычном запуске.
+        """
+        deadlines = deadlines or {}
+        now = self.clock.time()
+        for tenant in self.tenants.values():
+            if tenant.cursor is None:
+                tenant.cursor = int(now)
+            if tenant.paused:
+                continue
+            delay = deadlines.get(tenant.name, now) - now
+            if delay <= 0:
+                delay = self.start_delay(tenant)
+            self.scheduler.schedule_in(tenant.name, delay)
+
+    def poll_now(self, tenant):
+        """Опрос получателя и постановка следующего опроса.
+
+        Одновременно идёт не больше одного опроса получателя:
+        внеочередной опрос во время текущего пропускается.
+        """
+        with self._lock:
+            if tenant.name in self._polling:
+                return
+            self._polling.add(tenant.name)
+        try:
+            self.polls += 1
+            self.poll(tenant)
+        finally:
+            with self._lock:
+                self._polling.discard(tenant.name)
+            if self.tenants.get(tenant.name) is tenant and not tenant.paused:
+                self.scheduler.schedule_in(
+                    tenant.name, self.next_delay(tenant))
+
+    def _run_pending(self, tenant):
+        try:
+            self.poll_now(tenant)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def dispatch(self, names, lag=0.0):
+        """Допуск наступивших опросов; возвращает допущенных.
+
+        Отложенные переносятся на ``shedder.delay`` секунд, пропущенные -
+        на следующий обычный срок.
+        """
+        tenants = [self.tenants.get(name) for name in names]
+        tenants = [tenant for tenant in tenants
+                   if tenant is not None and not tenant.paused]
+        if self.shedder is None:
+            return tenants
+        admitted, delayed, shed = self.shedder.admit(
+            tenants, lag, self.pending)
+        for tenant in delayed:
+            self.scheduler.schedule_in(tenant.name, self.shedder.delay)
+        for tenant in shed:
+            self.scheduler.schedule_in(tenant.name, self.next_delay(tenant))
+        return admitted
+
+    def get(self, name):
+        """Получатель по имени; KeyError, если его нет."""
+        return self.tenants[name]
+
+    def add(self, tenant):
+        """Добавление получателя во время работы."""
+        with self._lock:
+            if tenant.name in self.tenants:
+                raise ValueError(f'Получатель {tenant.name} уже есть.')
+            if tenant.cursor is None:
+                tenant.cursor = int(self.clock.time())
+            self.tenants[tenant.name] = tenant
+        if not tenant.paused:
+            self.scheduler.schedule_in(tenant.name, self.start_delay(tenant))
+
+    def remove(self, name):
+        """Удаление получателя; опрос в работе завершится без повтора."""
+        with self._lock:
+            tenant = self.tenants.pop(name)
+        self.scheduler.cancel(name)
+        return tenant
+
+    def pause(self, name):
+        """Приостановка опросов получателя."""
+        tenant = self.get(name)
+        tenant.paused = True
+        self.scheduler.cancel(name)
+        return tenant
+
+    def resume(self, name):
+        """Возобновление опросов по обычному расписанию."""
+        tenant = self.get(name)
+        if tenant.paused:
+            tenant.paused = False
+            self.scheduler.schedule_in(name, self.next_delay(tenant))
+        return tenant
+
+    def poll_soon(self, name):
+        """Внеочередной опрос получателя на ближайшем шаге расписания."""
+        tenant = self.get(name)
+        self.scheduler.schedule_in(name, 0)
+        return tenant
+
+    def state(self, tenant):
+        """Состояние опроса получателя для просмотра."""
+        deadline = self.scheduler.deadline(tenant.name)
+        return {
+            'name': tenant.name,
+            'chat_id': tenant.chat_id,
+            'period': tenant.period,
+            'cursor': tenant.cursor,
+            # Копия: статусы меняются потоками опроса.
+            'statuses': {str(key): status
+                         for key, status in list(tenant.statuses.items())},
+            'paused': tenant.paused,
+            'quarantined': tenant.quarantined,
+            'next_poll_in': None if deadline is None else max(
+                deadline - self.clock.monotonic(), 0),
+            'last_error': tenant.last_error,
+            'error_count': tenant.error_count,
+            'failures': tenant.failures,
+        }
+
+    def states(self):
+        """Состояние всех получателей."""
+        return [self.state(tenant) for tenant in list(self.tenants.values())]
+
+    def take_over(self):
+        """Обновление состояния после получения роли ведущего.
+
+        Резервный экземпляр хранит курсоры со своего запуска, и опрос
+        с них повторил бы уведомления прежнего ведущего. Курсоры
+        сдвигаются на текущий момент, а ``on_takeover(runtime)`` может
+        затем загрузить более точное состояние, например из снимка.
+        """
+        now = int(self.clock.time())
+        for tenant in list(self.tenants.values()):
+            tenant.cursor = now
+        if self.on_takeover is not None:
+            self.on_takeover(self)
+
+    def run_forever(self, deadlines=None):
+        """Опрос по расписанию в пуле потоков."""
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='tenant')
+        self.start(deadlines)
+        while True:
+            due = self.scheduler.wait_due()
+            if self.monitor is not None:
+                self.monitor.observe('scheduler_lag', self.scheduler.lag)
+            if ensure_leadership(self.elector):
+                self.take_over()
+            for tenant in self.dispatch(due, self.scheduler.lag):
+                with self._lock:
+                    self.pending += 1
+                self._executor.submit(self._run_pending, tenant)
+
+    def stop(self):
+        """Остановка пула: начатые опросы завершаются, очередь отменяется."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+    def run_until(self, moment):
+        """Синхронный прогон расписания до момента ``moment``.
+
+        Время часов переводится от срока к сроку; опросы выполняются
+        в текущем потоке по порядку.
+        """
+        while True:
+            deadline = self.scheduler.next_deadline()
+            if deadline is None or deadline > moment:
+                break
+            self.clock.advance_to(deadline)
+            for tenant in self.dispatch(self.scheduler.pop_due(deadline)):
+                self.poll_now(tenant)
+        self.clock.advance_to(moment)
@@ -0,0 +1,109 @@
+"""Планировщик сроков следующего опроса для множества получателей."""
+import heapq
+import itertools
+import threading
+import time
+
+
+class Scheduler:
+    """Куча сроков с отложенным удалением отменённых записей.
+
+    Постановка и перенос срока стоят O(log n): старая запись
+    в куче не ищется, а помечается недействительной и отбрасывается
+    при извлечении. Методы потокобезопасны.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        # Опоздание последнего извлечения относительно самого раннего срока.
+        self.lag = 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def schedule(self, key, deadline):
+        """Постановка или перенос срока для ключа."""
+        with self._condition:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                entry[2] = None
+            entry = [deadline, next(self._counter), key]
+            self._entries[key] = entry
+            heapq.heappush(self._heap, entry)
+            if self._heap[0] is entry:
+                self._condition.notify_all()
+
+    def schedule_in(self, key, delay):
+        """Постановка срока через ``delay`` секунд от текущего момента."""
+        self.schedule(key, self._clock() + delay)
+
+    def cancel(self, key):
+        """Отмена срока; возвращает True, если ключ был запланирован."""
+        with self._condition:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            entry[2] = None
+            self._condition.notify_all()
+            return True
+
+    def deadline(self, key):
+        """Срок для ключа или None."""
+        entry = self._entries.get(key)
+        return None if entry is None else entry[0]
+
+    def next_deadline(self):
+        """Ближайший действующий срок или None."""
+        with self._condition:
+            self._drop_cancelled()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_cancelled(self):
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+
+    def pop_due(self, now=None):
+        """Извлечение всех ключей, срок которых наступил."""
+        if now is None:
+            now = self._clock()
+        due = []
+        with self._condition:
+            self._drop_cancelled()
+            if self._heap and self._heap[0][0] <= now:
+                self.lag = now - self._heap[0][0]
+            while self._heap and self._heap[0][0] <= now:
+                _, _, key = heapq.heappop(self._heap)
+                del self._entries[key]
+                due.append(key)
+                self._drop_cancelled()
+        return due
+
+    def wait_due(self, timeout=None):
+        """Ожидание ближайшего срока; возвращает наступившие ключи.
+
+        Ожидание прерывается, если появляется более ранний срок.
+        По истечении ``timeout`` возвращает пустой список.
+        """
+        started = self._clock()
+        with self._condition:
+            while True:
+                now = self._clock()
+                due = self.pop_due(now)
+                if due:
+                    return due
+                waits = []
+                if self._heap:
+                    waits.append(self._heap[0][0] - now)
+                if timeout is not None:
+                    left = started + timeout - now
+                    if left <= 0:
+                        return []
+                    waits.append(left)
+                self._condition.wait(min(waits) if waits else None)
@@ -0,0 +1,99 @@
+"""Теневой режим: сообщения не отправляются, а записываются в файл."""
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class ShadowBot:
+    """Заменитель бота Telegram, записывающий сообщения в JSON Lines.
+
+    Каждая строка файла - одно сообщение, которое было бы
+    отправлено, с временем относительно запуска прогона.
+    """
+
+    def __init__(self, path, clock=time.monotonic):
+        self.path = path
+        self._clock = clock
+        self._started = clock()
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Запись сообщения вместо отправки."""
+        record = {'chat_id': str(chat_id),
+                  'text': text,
+                  'at': time.time(),
+                  'offset': round(self._clock() - self._started, 6)}
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+        return record
+
+    def get_me(self):
+        """Проверка бота: в теневом режиме Telegram не вызывается."""
+
+    def get_chat(self, chat_id):
+        """Проверка чата: в теневом режиме Telegram не вызывается."""
+
+    def close(self):
+        """Закрытие файла записей."""
+        self._file.close()
+
+
+def read_records(path):
+    """Чтение записей теневого прогона."""
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def diff_runs(baseline, candidate):
+    """Сравнение двух теневых прогонов.
+
+    Сообщения сопоставляются по паре (чат, текст). Возвращает
+    пропавшие и лишние сообщения, а также смещение по времени
+    для совпавших (насколько позже от начала прогона они появились
+    в новом прогоне).
+    """
+    def key(record):
+        return record['chat_id'], record['text']
+
+    baseline_offsets = {}
+    for record in baseline:
+        baseline_offsets.setdefault(key(record), []).append(record['offset'])
+    missing = Counter(key(record) for record in baseline)
+    extra = Counter(key(record) for record in candidate)
+    matched = missing & extra
+    delays = []
+    for record in candidate:
+        offsets = baseline_offsets.get(key(record))
+        if offsets:
+            delays.append(record['offset'] - offsets.pop(0))
+    delays.sort()
+    return {
+        'matched': sum(matched.values()),
+        'missing': sorted((missing - matched).elements()),
+        'extra': sorted((extra - matched).elements()),
+        'median_delay': delays[len(delays) // 2] if delays else None,
+        'max_delay': delays[-1] if delays else None,
+    }
+
+
+def main(argv=None):
+    """Командная строка для сравнения теневых прогонов."""
+    parser = argparse.ArgumentParser(
+        description='Сравнение результатов двух теневых прогонов.')
+    parser.add_argument('baseline', help='Файл базового прогона.')
+    parser.add_argument('candidate', help='Файл проверяемого прогона.')
+    args = parser.parse_args(argv)
+    result = diff_runs(read_records(args.baseline),
+                       read_records(args.candidate))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 1 if result['missing'] or result['extra'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
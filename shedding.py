@@ -0,0 +1,83 @@
+"""Приоритетное ограничение опросов при перегрузке.
+
+Когда опросы не успевают за расписанием, откладывать всех поровну
+значит задерживать и важные уведомления. ``LoadShedder`` делит
+наступившие опросы по приоритету: получатели с работой на проверке
+опрашиваются всегда, недавно активные - пока есть место в очереди,
+а остальные откладываются или пропускают период.
+"""
+import time
+
+from metrics import registry as default_registry
+
+
+REVIEWING = 0
+ACTIVE = 1
+IDLE = 2
+
+# Получатель активен, если статус менялся за последние трое суток.
+ACTIVE_WINDOW = 3 * 24 * 60 * 60
+MAX_LAG = 60
+# Через сколько секунд повторить отложенный опрос активного получателя.
+DELAY = 30
+
+
+def priority(tenant, now):
+    """Приоритет получателя: меньше - важнее."""
+    if 'reviewing' in tenant.statuses.values():
+        return REVIEWING
+    if tenant.changed_at is not None and now - tenant.changed_at <= (
+            ACTIVE_WINDOW):
+        return ACTIVE
+    return IDLE
+
+
+class LoadShedder:
+    """Допуск наступивших опросов с учётом перегрузки.
+
+    Перегрузка - опоздание расписания больше ``max_lag`` секунд или
+    очередь опросов длиннее ``queue_limit``. Без перегрузки допускаются
+    все опросы. При перегрузке опросы получателей с работой на проверке
+    допускаются всегда, остальные по приоритету - пока очередь не
+    заполнится; не вошедшие активные откладываются на ``delay`` секунд,
+    а простаивающие пропускают период.
+    """
+
+    def __init__(self, queue_limit, max_lag=MAX_LAG, delay=DELAY,
+                 clock=time.time, registry=default_registry):
+        self.queue_limit = queue_limit
+        self.max_lag = max_lag
+        self.delay = delay
+        self.clock = clock
+        self.registry = registry
+
+    def overloaded(self, lag, pending):
+        """Есть ли перегрузка."""
+        return lag > self.max_lag or pending >= self.queue_limit
+
+    def admit(self, tenants, lag, pending):
+        """Разделение на допущенных, отложенных и пропущенных."""
+        overloaded = self.overloaded(lag, pending)
+        self.registry.gauge('shedding.overloaded').set(int(overloaded))
+        self.registry.gauge('shedding.queue_depth').set(pending)
+        if not overloaded:
+            return list(tenants), [], []
+        now = self.clock()
+        room = max(self.queue_limit - pending, 0)
+        if lag > self.max_lag:
+            # Расписание уже отстаёт: очередь должна успеть разойтись.
+            room //= 2
+        admitted, delayed, shed = [], [], []
+        for rank, tenant in sorted(
+                ((priority(tenant, now), tenant) for tenant in tenants),
+                key=lambda item: item[0]):
+            if rank == REVIEWING or room > 0:
+                admitted.append(tenant)
+                room -= 1
+            elif rank == ACTIVE:
+                delayed.append(tenant)
+                self.registry.counter('shedding.delayed.active').inc()
+            else:
+                shed.append(tenant)
+                self.registry.counter('shedding.shed.idle').inc()
+        return admitted, delayed, shed
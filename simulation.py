@@ -0,0 +1,97 @@
+"""Моделирование опроса на виртуальном времени со сценарием ответов API."""
+import json
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+from http import HTTPStatus
+
+import homework
+from clock import VirtualClock
+from runtime import TenantRuntime
+
+
+ApiCall = namedtuple('ApiCall', ('at', 'token', 'from_date'))
+SentMessage = namedtuple('SentMessage', ('at', 'chat_id', 'text'))
+SimulationResult = namedtuple(
+    'SimulationResult', ('runtime', 'calls', 'messages'))
+
+
+class ScriptedResponse:
+    """Ответ API из сценария с интерфейсом ``requests.Response``."""
+
+    def __init__(self, data, status_code=HTTPStatus.OK):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        """Данные ответа."""
+        return self._data
+
+    @property
+    def content(self):
+        """Тело ответа в JSON для декодеров из ``decoding``."""
+        return json.dumps(self._data).encode()
+
+
+class ScriptedAPI:
+    """Заменитель ``requests.get``, отвечающий по сценарию.
+
+    ``script(now, token, from_date)`` возвращает ``ScriptedResponse``
+    или выбрасывает исключение ``requests``.
+    """
+
+    def __init__(self, script, clock):
+        self.script = script
+        self.clock = clock
+        self.calls = []
+
+    def __call__(self, url, headers, params, **kwargs):
+        token = headers['Authorization'].removeprefix('OAuth ')
+        from_date = params['from_date']
+        self.calls.append(ApiCall(self.clock.time(), token, from_date))
+        return self.script(self.clock.time(), token, from_date)
+
+
+class RecordingBot:
+    """Заменитель бота, запоминающий сообщения с виртуальным временем."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.messages = []
+
+    def send_message(self, chat_id, text, **kwargs):
+        """Запись сообщения."""
+        self.messages.append(SentMessage(self.clock.time(), chat_id, text))
+
+
+@contextmanager
+def quiet_logs():
+    """Отключение лога бота на время моделирования."""
+    disabled = homework.logger.disabled
+    homework.logger.disabled = True
+    try:
+        yield
+    finally:
+        homework.logger.disabled = disabled
+
+
+def simulate(tenants, script, duration, start=0, quiet=True, clock=None,
+             **runtime_options):
+    """Прогон опроса получателей на ``duration`` виртуальных секунд.
+
+    Используется тот же ``homework.poll_tenant`` и то же расписание,
+    что и в работе бота; меняются только часы, API и бот.
+    ``runtime_options`` передаются в ``TenantRuntime``; ``clock`` нужен,
+    чтобы построить на тех же часах, например, ``LoadShedder``.
+    """
+    clock = clock or VirtualClock(start)
+    api = ScriptedAPI(script, clock)
+    bot = RecordingBot(clock)
+    runtime = TenantRuntime(
+        tenants,
+        lambda tenant: homework.poll_tenant(bot, tenant, http_get=api,
+                                            clock=clock),
+        clock=clock, **runtime_options)
+    with quiet_logs() if quiet else nullcontext():
+        runtime.start()
+        runtime.run_until(start + duration)
+    return SimulationResult(runtime, api.calls, bot.messages)
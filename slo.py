@@ -0,0 +1,174 @@
+"""Наблюдение за показателями качества работы бота и оповещения.
+
+Для каждой цели (SLO) хранятся события за скользящее окно: удачные
+и неудачные. Скорость расходования бюджета ошибок - доля неудачных
+событий, делённая на допустимую долю ``1 - target``. Оповещение
+отправляется, когда скорость превышает порог и в длинном, и в коротком
+окне: длинное отсекает единичные выбросы, короткое - давно
+закончившиеся сбои.
+"""
+import logging
+import math
+import threading
+import time
+from collections import deque
+
+from metrics import registry as default_registry
+
+
+logger = logging.getLogger(__name__)
+
+
+LONG_WINDOW = 3600
+SHORT_WINDOW = 300
+# Бюджет на 30 дней при такой скорости расходуется за двое суток.
+BURN_RATE = 14.4
+MIN_EVENTS = 3
+COOLDOWN = 3600
+CHECK_INTERVAL = 60
+
+
+class Objective:
+    """Цель: доля удачных событий не ниже ``target``.
+
+    Если задан ``threshold``, событием считается измерение, и оно
+    удачно, когда значение не больше порога.
+    """
+
+    def __init__(self, name, target, threshold=None, unit='с'):
+        if not 0 < target < 1:
+            raise ValueError('Цель должна быть долей от 0 до 1.')
+        self.name = name
+        self.target = target
+        self.threshold = threshold
+        self.unit = unit
+
+    def __repr__(self):
+        return f'Objective({self.name!r}, {self.target})'
+
+
+class SLOMonitor:
+    """Скользящие показатели по целям и оповещения о нарушениях.
+
+    ``observe`` и ``record`` дёшевы и вызываются на горячем пути;
+    проверка целей выполняется в ``check`` - вручную или в фоновом
+    потоке после ``start``. Оповещение по одной цели отправляется
+    не чаще раза в ``cooldown`` секунд, после восстановления цели
+    отправляется одно сообщение об этом.
+    """
+
+    def __init__(self, objectives, clock=time.monotonic,
+                 long_window=LONG_WINDOW, short_window=SHORT_WINDOW,
+                 burn_rate=BURN_RATE, min_events=MIN_EVENTS,
+                 cooldown=COOLDOWN, registry=default_registry):
+        self.objectives = {item.name: item for item in objectives}
+        self.clock = clock
+        self.long_window = long_window
+        self.short_window = short_window
+        self.burn_rate_threshold = burn_rate
+        self.min_events = min_events
+        self.cooldown = cooldown
+        self.registry = registry
+        self._events = {name: deque() for name in self.objectives}
+        self._alerted = {}
+        self._lock = threading.Lock()
+        self._alert = None
+        self._stopped = threading.Event()
+
+    def record(self, name, good, value=None):
+        """Учёт события цели: удачного или нет."""
+        now = self.clock()
+        with self._lock:
+            events = self._events[name]
+            events.append((now, good, value))
+            self._prune(events, now)
+
+    def observe(self, name, value):
+        """Учёт измерения для цели с порогом."""
+        self.record(name, value <= self.objectives[name].threshold, value)
+
+    def _prune(self, events, now):
+        while events and events[0][0] < now - self.long_window:
+            events.popleft()
+
+    def _window(self, name, window):
+        now = self.clock()
+        with self._lock:
+            events = self._events[name]
+            self._prune(events, now)
+            return [event for event in events if event[0] >= now - window]
+
+    def burn_rate(self, name, window=None):
+        """Скорость расходования бюджета ошибок за окно."""
+        events = self._window(name, window or self.long_window)
+        if not events:
+            return 0.0
+        bad = sum(not good for _, good, _ in events)
+        return bad / len(events) / (1 - self.objectives[name].target)
+
+    def percentile(self, name, quantile, window=None):
+        """Квантиль измерений за окно или None, если их нет."""
+        values = sorted(value for _, _, value in self._window(
+            name, window or self.long_window) if value is not None)
+        if not values:
+            return None
+        return values[max(math.ceil(quantile * len(values)) - 1, 0)]
+
+    def _breached(self, name):
+        """Нарушена ли цель в обоих окнах."""
+        if len(self._window(name, self.long_window)) < self.min_events:
+            return False
+        return (self.burn_rate(name) >= self.burn_rate_threshold
+                and self.burn_rate(name, self.short_window)
+                >= self.burn_rate_threshold)
+
+    def describe(self, name):
+        """Текст оповещения о нарушении цели."""
+        objective = self.objectives[name]
+        text = (f'SLO {name}: бюджет ошибок расходуется в '
+                f'{self.burn_rate(name):.1f} раз быстрее допустимого '
+                f'(за {self.short_window // 60} мин: '
+                f'{self.burn_rate(name, self.short_window):.1f}).')
+        if objective.threshold is not None:
+            p99 = self.percentile(name, 0.99)
+            text += (f' p99 = {p99:.2f} {objective.unit} при пороге '
+                     f'{objective.threshold} {objective.unit}.')
+        return text
+
+    def check(self):
+        """Проверка всех целей; возвращает отправленные оповещения."""
+        now = self.clock()
+        messages = []
+        for name in self.objectives:
+            self.registry.gauge(f'slo.{name}.burn_rate').set(
+                self.burn_rate(name))
+            alerted = self._alerted.get(name)
+            if self._breached(name):
+                if alerted is None or now - alerted >= self.cooldown:
+                    self._alerted[name] = now
+                    messages.append(self.describe(name))
+            elif alerted is not None:
+                del self._alerted[name]
+                messages.append(f'SLO {name}: показатель восстановился.')
+        for message in messages:
+            logger.warning(message)
+            if self._alert is not None:
+                self._alert(message)
+        return messages
+
+    def _run(self, interval):
+        while not self._stopped.wait(interval):
+            try:
+                self.check()
+            except Exception as error:
+                logger.error(f'Ошибка проверки SLO: {error}')
+
+    def start(self, alert, interval=CHECK_INTERVAL):
+        """Периодическая проверка целей с отправкой через ``alert``."""
+        self._alert = alert
+        threading.Thread(target=self._run, args=(interval,),
+                         name='slo-monitor', daemon=True).start()
+
+    def stop(self):
+        """Остановка периодической проверки."""
+        self._stopped.set()
@@ -0,0 +1,196 @@
+"""Снимок состояния опроса получателей для тёплого перезапуска.
+
+Файл: заголовок (сигнатура, версия формата, длина и CRC32 данных)
+и данные - JSON, сжатый zlib. Снимок записывается во временный файл
+рядом с основным и подменяет его через ``os.replace``, поэтому
+при сбое во время записи остаётся предыдущий целый снимок.
+"""
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+import zlib
+
+from exceptions import SnapshotError
+from quota import token_key
+
+
+logger = logging.getLogger(__name__)
+
+
+MAGIC = b'HWSS'
+VERSION = 1
+HEADER = struct.Struct('<4sHII')
+# Снимок старше этого срока считается устаревшим и не загружается.
+MAX_AGE = 24 * 60 * 60
+INTERVAL = 30
+
+
+def tenant_state(runtime, tenant, now):
+    """Состояние получателя для снимка."""
+    deadline = runtime.scheduler.deadline(tenant.name)
+    return {
+        'name': tenant.name,
+        'token': token_key(tenant.practicum_token),
+        'cursor': tenant.cursor,
+        # Копия: статусы меняются потоками опроса во время записи.
+        'statuses': [[key, status]
+                     for key, status in list(tenant.statuses.items())],
+        'last_error': tenant.last_error,
+        'error_count': tenant.error_count,
+        'failures': tenant.failures,
+        'paused': tenant.paused,
+        'changed_at': tenant.changed_at,
+        'next_poll_at': None if deadline is None else (
+            now + deadline - runtime.clock.monotonic()),
+    }
+
+
+def encode(runtime):
+    """Снимок состояния всех получателей в двоичном виде."""
+    now = runtime.clock.time()
+    state = {
+        'created_at': now,
+        'tenants': [tenant_state(runtime, tenant, now)
+                    for tenant in list(runtime.tenants.values())],
+    }
+    data = zlib.compress(json.dumps(
+        state, ensure_ascii=False, separators=(',', ':')).encode())
+    return HEADER.pack(MAGIC, VERSION, len(data), zlib.crc32(data)) + data
+
+
+def decode(blob):
+    """Состояние из двоичного снимка с проверкой целостности."""
+    if len(blob) < HEADER.size:
+        raise SnapshotError('Снимок обрезан.')
+    magic, version, size, checksum = HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise SnapshotError('Файл не является снимком состояния.')
+    if version != VERSION:
+        raise SnapshotError(f'Неподдерживаемая версия снимка: {version}.')
+    data = blob[HEADER.size:]
+    if len(data) != size or zlib.crc32(data) != checksum:
+        raise SnapshotError('Снимок повреждён.')
+    try:
+        return json.loads(zlib.decompress(data))
+    except (zlib.error, ValueError) as err:
+        raise SnapshotError(f'Снимок не читается: {err}') from err
+
+
+def save(path, runtime):
+    """Атомарная запись снимка: временный файл, fsync и подмена."""
+    blob = encode(runtime)
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(
+        dir=directory, prefix='.snapshot-')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(blob)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    directory_descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(directory_descriptor)
+    finally:
+        os.close(directory_descriptor)
+    return len(blob)
+
+
+def load(path):
+    """Чтение снимка; ``SnapshotError``, если он негоден."""
+    with open(path, 'rb') as file:
+        return decode(file.read())
+
+
+def restore(runtime, state, max_age=MAX_AGE):
+    """Перенос состояния из снимка в получателей ``runtime``.
+
+    Пропускаются получатели, которых больше нет или у которых сменился
+    токен. Возвращает сроки следующих опросов для ``runtime.start``.
+    """
+    now = runtime.clock.time()
+    age = now - state['created_at']
+    if not 0 <= age <= max_age:
+        raise SnapshotError(f'Снимок устарел: создан {age:.0f} с назад.')
+    deadlines = {}
+    for item in state['tenants']:
+        tenant = runtime.tenants.get(item['name'])
+        if tenant is None or item['token'] != token_key(
+                tenant.practicum_token):
+            continue
+        tenant.cursor = item['cursor']
+        tenant.statuses = {key: status for key, status in item['statuses']}
+        tenant.last_error = item['last_error']
+        tenant.error_count = item['error_count']
+        tenant.failures = item['failures']
+        tenant.paused = item['paused']
+        tenant.changed_at = item.get('changed_at')
+        if item['next_poll_at'] is not None:
+            deadlines[tenant.name] = item['next_poll_at']
+    logger.info(f'Состояние восстановлено из снимка для {len(deadlines)} '
+                f'получателей из {len(runtime.tenants)}.')
+    return deadlines
+
+
+def warm_start(path, runtime, max_age=MAX_AGE):
+    """Загрузка снимка, если он есть и годен; иначе холодный старт."""
+    try:
+        return restore(runtime, load(path), max_age)
+    except FileNotFoundError:
+        return {}
+    except (SnapshotError, KeyError, TypeError) as err:
+        logger.warning(f'Снимок {path} не использован: {err}')
+        return {}
+
+
+class SnapshotWriter:
+    """Периодическая запись снимка в фоновом потоке.
+
+    С ``elector`` (``leadership.LeaderElector``) снимок пишет только
+    ведущий: состояние резервного экземпляра устарело, и его снимок
+    затёр бы снимок ведущего.
+    """
+
+    def __init__(self, path, runtime, interval=INTERVAL, elector=None):
+        self.path = path
+        self.runtime = runtime
+        self.interval = interval
+        self.elector = elector
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def write(self):
+        """Запись снимка с журналированием ошибок.
+
+        Любая ошибка только логируется, чтобы не остановить поток
+        записи: следующий снимок может оказаться удачным.
+        """
+        if self.elector is not None and not self.elector.is_leader:
+            return
+        try:
+            save(self.path, self.runtime)
+        except Exception as err:
+            logger.error(f'Ошибка записи снимка {self.path}: {err}')
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+    def start(self):
+        """Запуск периодической записи."""
+        self._thread = threading.Thread(
+            target=self._run, name='snapshot', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Остановка и запись последнего снимка."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write()
@@ -0,0 +1,79 @@
+"""Получатели уведомлений: настройки и состояние опроса."""
+import json
+
+
+class Tenant:
+    """Один отслеживаемый аккаунт Практикума и его чат в Telegram."""
+
+    def __init__(self, name, practicum_token, chat_id, period,
+                 telegram_token=None, locale=None):
+        self.name = name
+        self.practicum_token = practicum_token
+        self.chat_id = chat_id
+        self.period = period
+        # Токен отдельного бота получателя; без него - общий бот.
+        self.telegram_token = telegram_token
+        # Язык уведомлений; без него - язык по умолчанию.
+        self.locale = locale
+        # Время, начиная с которого запрашиваются изменения статусов.
+        self.cursor = None
+        # Последний известный статус каждой работы.
+        self.statuses = {}
+        self.last_error = None
+        self.error_count = 0
+        # Ошибок подряд: по ним увеличивается интервал опроса.
+        self.failures = 0
+        # Причина исключения из опроса, если учётные данные неверны.
+        self.quarantined = None
+        # Опрос приостановлен через административный API.
+        self.paused = False
+        # Когда в последний раз менялся статус какой-либо работы.
+        self.changed_at = None
+
+    def __repr__(self):
+        return f'Tenant({self.name!r})'
+
+    @property
+    def headers(self):
+        """Заголовки запроса к API с токеном получателя."""
+        return {'Authorization': f'OAuth {self.practicum_token}'}
+
+
+def homework_key(homework):
+    """Ключ работы в кэше статусов."""
+    homework_id = homework.get('id')
+    return homework_id if homework_id is not None else homework.get(
+        'homework_name')
+
+
+def tenant_from_dict(item, default_period):
+    """Получатель из описания в виде словаря.
+
+    Ключи: ``name``, ``practicum_token``, ``chat_id`` и необязательные
+    ``period``, ``telegram_token`` и ``locale``.
+    """
+    try:
+        return Tenant(
+            name=str(item['name']),
+            practicum_token=item['practicum_token'],
+            chat_id=str(item['chat_id']),
+            period=item.get('period', default_period),
+            telegram_token=item.get('telegram_token'),
+            locale=item.get('locale'))
+    except (KeyError, TypeError, AttributeError) as err:
+        raise ValueError(
+            f'Некорректное описание получателя {item}: {err}') from err
+
+
+def load_tenants(path, default_period):
+    """Чтение списка получателей из JSON-файла.
+
+    Файл содержит список описаний получателей для ``tenant_from_dict``.
+    """
+    with open(path, encoding='utf-8') as file:
+        data = json.load(file)
+    tenants = [tenant_from_dict(item, default_period) for item in data]
+    names = [tenant.name for tenant in tenants]
+    if len(set(names)) != len(names):
+        raise ValueError('Имена получателей должны быть уникальными.')
+    return tenants
@@ -0,0 +1,129 @@
+import json
+from http import HTTPStatus
+from http.client import HTTPConnection
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from admin import AdminServer
+from clock import VirtualClock
+from exceptions import CheckTokensError
+from logs import RedactingFilter
+from runtime import TenantRuntime
+from tenants import Tenant
+
+
+@pytest.fixture
+def admin():
+    clock = VirtualClock(1000)
+    polled = []
+    runtime = TenantRuntime(
+        [Tenant('anna', 'token-a', '1', 600)],
+        lambda tenant: polled.append(tenant.name),
+        clock=clock, ramp_up=0, jitter=0)
+    runtime.start()
+
+    def prepare(tenant):
+        if tenant.practicum_token == 'bad':
+            tenant.quarantined = 'practicum_token: 401'
+            raise CheckTokensError('Нет получателей с верными данными.')
+
+    server = AdminServer(runtime, 0, 600, prepare=prepare)
+    server.start()
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    def call(method, path, data=None):
+        body = None if data is None else json.dumps(data).encode()
+        request = Request(url + path, data=body, method=method)
+        try:
+            with urlopen(request, timeout=1) as response:
+                return response.status, json.load(response)
+        except HTTPError as error:
+            return error.code, json.load(error)
+
+    call.port = server.server_address[1]
+    yield runtime, call, polled
+    server.shutdown()
+    server.server_close()
+
+
+class TestAdminAPI:
+
+    def test_list_and_state(self, admin):
+        _, call, _ = admin
+        status, data = call('GET', '/tenants')
+        assert status == HTTPStatus.OK
+        assert [item['name'] for item in data] == ['anna']
+        status, data = call('GET', '/tenants/anna')
+        assert data['cursor'] == 1000
+        assert data['next_poll_in'] is not None
+        assert 'token-a' not in json.dumps(data), (
+            'Токен получателя не должен выдаваться через API.'
+        )
+        assert call('GET', '/tenants/boris')[0] == HTTPStatus.NOT_FOUND
+
+    def test_add_and_remove(self, admin):
+        runtime, call, _ = admin
+        tenant = {'name': 'boris', 'practicum_token': 't', 'chat_id': 2}
+        status, data = call('POST', '/tenants', tenant)
+        assert status == HTTPStatus.CREATED
+        assert data['period'] == 600
+        assert 'boris' in runtime.scheduler, (
+            'Добавленный получатель должен попасть в расписание.'
+        )
+        assert call('POST', '/tenants', tenant)[0] == HTTPStatus.CONFLICT
+        assert call('POST', '/tenants', {'name': 'x'})[0] == (
+            HTTPStatus.BAD_REQUEST)
+        assert call('DELETE', '/tenants/boris')[0] == HTTPStatus.OK
+        assert 'boris' not in runtime.tenants
+        assert 'boris' not in runtime.scheduler
+
+    def test_pause_resume_and_poll(self, admin):
+        runtime, call, polled = admin
+        status, data = call('POST', '/tenants/anna/pause')
+        assert data['paused'] and data['next_poll_in'] is None
+        runtime.run_until(runtime.clock.time() + 3600)
+        assert polled == [], 'Приостановленный получатель не опрашивается.'
+        call('POST', '/tenants/anna/resume')
+        call('POST', '/tenants/anna/poll')
+        runtime.run_until(runtime.clock.time())
+        assert polled == ['anna'], (
+            'Внеочередной опрос должен выполняться сразу.'
+        )
+
+    def test_tenant_with_bad_credentials_is_rejected(self, admin):
+        runtime, call, _ = admin
+        status, data = call('POST', '/tenants', {
+            'name': 'mallory', 'practicum_token': 'bad', 'chat_id': 3})
+        assert status == HTTPStatus.UNPROCESSABLE_ENTITY
+        assert data['error'] == 'practicum_token: 401'
+        assert 'mallory' not in runtime.tenants, (
+            'Получатель с неверными учётными данными не добавляется.'
+        )
+
+    @pytest.mark.parametrize('length', ('-1', 'abc'))
+    def test_bad_content_length(self, admin, length):
+        _, call, _ = admin
+        connection = HTTPConnection('127.0.0.1', call.port, timeout=1)
+        connection.putrequest('POST', '/tenants')
+        connection.putheader('Content-Length', length)
+        connection.endheaders()
+        response = connection.getresponse()
+        assert response.status == HTTPStatus.BAD_REQUEST
+        connection.close()
+
+
+def test_admitted_tenant_is_verified_and_redacted(homework_module,
+                                                  monkeypatch):
+    checked = []
+    monkeypatch.setattr(homework_module, 'log_redactor',
+                        RedactingFilter())
+    monkeypatch.setattr(homework_module, 'verify_credentials',
+                        lambda bot, tenants: checked.extend(tenants))
+    tenant = Tenant('boris', 'secret-token', '2', 600)
+    homework_module.admit_tenant(None, tenant)
+    assert checked == [tenant], (
+        'Получатель из API должен проходить ту же проверку, что при запуске.'
+    )
+    assert homework_module.log_redactor.redact('secret-token') == '***'
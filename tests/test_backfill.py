@@ -0,0 +1,100 @@
+import threading
+
+import backfill as backfill_module
+import snapshot
+from backfill import backfill, merge_homeworks
+from tenants import Tenant
+
+
+def make_tenant(name):
+    return Tenant(name, f'token-{name}', f'chat-{name}', 600)
+
+
+class TestBackfill:
+
+    def test_merge_keeps_latest_status(self):
+        homeworks = merge_homeworks([
+            {'id': 1, 'status': 'reviewing',
+             'date_updated': '2024-01-01T10:00:00Z'},
+            {'id': 1, 'status': 'approved',
+             'date_updated': '2024-01-02T10:00:00Z'},
+            {'id': 2, 'status': 'rejected',
+             'date_updated': '2024-01-01T10:00:00Z'},
+        ])
+        assert {item['id']: item['status'] for item in homeworks} == {
+            1: 'approved', 2: 'rejected'
+        }
+
+    def test_tenants_are_loaded_in_parallel(self):
+        tenants = [make_tenant(str(number)) for number in range(4)]
+        barrier = threading.Barrier(4, timeout=1)
+
+        def fetch(tenant):
+            barrier.wait()
+            return {'homeworks': [{'id': 1, 'status': 'approved'}],
+                    'current_date': 100}
+
+        assert backfill(tenants, fetch, workers=4) == {}
+        for tenant in tenants:
+            assert tenant.cursor == 100
+            assert tenant.statuses == {1: 'approved'}
+
+    def test_failed_tenant_does_not_stop_others(self):
+        tenants = [make_tenant('ok'), make_tenant('broken')]
+
+        def fetch(tenant):
+            if tenant.name == 'broken':
+                raise ValueError('401')
+            return {'homeworks': [], 'current_date': 100}
+
+        errors = backfill(tenants, fetch)
+        assert list(errors) == ['broken']
+        assert tenants[0].cursor == 100
+        assert tenants[1].cursor is None
+
+
+def test_seeded_status_is_not_sent_again(
+        monkeypatch, homework_module, data_with_new_hw_status):
+    tenant = make_tenant('student')
+    monkeypatch.setattr(homework_module, 'request_api',
+                        lambda *args: data_with_new_hw_status)
+    backfill([tenant], homework_module.fetch_history)
+    sent = []
+    monkeypatch.setattr(
+        homework_module, 'send_message_to',
+        lambda bot, chat_id, message: sent.append(message) or True)
+    homework_module.poll_tenant(None, tenant)
+    assert sent == [], (
+        'Статус, загруженный из истории, не должен отправляться повторно.'
+    )
+
+
+def test_main_cursor_starts_after_history(
+        monkeypatch, homework_module, data_with_new_hw_status):
+    monkeypatch.setattr(homework_module, 'BACKFILL_ON_START', True)
+    monkeypatch.setattr(homework_module, 'SNAPSHOT_PATH', None)
+    monkeypatch.setattr(homework_module, 'request_api',
+                        lambda *args: dict(data_with_new_hw_status,
+                                           current_date=100))
+    assert homework_module.start_cursor() == 100, (
+        'С BACKFILL_ON_START main должен начинать с отметки истории.'
+    )
+
+
+def test_cli_saves_seeded_state(tmp_path, monkeypatch, homework_module):
+    path = str(tmp_path / 'state.snap')
+    monkeypatch.setattr(homework_module, 'SNAPSHOT_PATH', None)
+    monkeypatch.setattr(homework_module, 'HISTORY_DB_PATH', None)
+    assert backfill_module.main() == 2, (
+        'Без снимка и базы истории загружать историю некуда.'
+    )
+    monkeypatch.setattr(homework_module, 'SNAPSHOT_PATH', path)
+    monkeypatch.setattr(homework_module, 'configured_tenants',
+                        lambda: [make_tenant('student')])
+    monkeypatch.setattr(homework_module, 'request_api', lambda *args: {
+        'homeworks': [{'id': 1, 'homework_name': 'hw', 'status': 'approved'}],
+        'current_date': 100})
+    assert backfill_module.main() == 0
+    state = snapshot.load(path)
+    assert state['tenants'][0]['cursor'] == 100
+    assert state['tenants'][0]['statuses'] == [[1, 'approved']]
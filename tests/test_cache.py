@@ -0,0 +1,73 @@
+import pytest
+
+import homework
+from cache import BudgetCache, approximate_size
+from clock import VirtualClock
+from metrics import Registry
+from rendering import Renderer
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock()
+
+
+def make_cache(clock, budget=10_000, ttl=None):
+    # Каждая запись занимает 400 байт: 200 на запись, 100 на ключ и значение.
+    return BudgetCache(budget, ttl, name='test', clock=clock.monotonic,
+                       registry=Registry(), sizeof=lambda value: 100)
+
+
+class TestBudgetCache:
+
+    def test_size_includes_nested_values(self):
+        small = {'homeworks': []}
+        large = {'homeworks': [{'status': 'approved' * 10}] * 10}
+        assert approximate_size(large) > approximate_size(small) + 1000
+
+    def test_lru_eviction_keeps_memory_flat(self, clock):
+        cache = make_cache(clock, budget=4000)
+        for tenant in range(1000):
+            cache.set(('tenant', tenant), 'response')
+            cache.get(('tenant', 0))
+        assert cache.size <= 4000, 'Кэш не должен выходить за бюджет.'
+        assert len(cache) == 10
+        assert ('tenant', 0) in cache, (
+            'Недавно использованная запись не должна вытесняться.'
+        )
+        assert ('tenant', 1) not in cache
+        assert cache._evictions.value == 990
+
+    def test_ttl_and_counters(self, clock):
+        registry = Registry()
+        cache = BudgetCache(10_000, ttl=60, name='test', clock=clock.monotonic,
+                            registry=registry)
+        calls = []
+        for _ in range(3):
+            cache.get_or_set('key', lambda: calls.append(1) or 'value')
+        clock.advance(61)
+        assert cache.get('key') is None
+        assert calls == [1], 'Свежее значение должно браться из кэша.'
+        metrics = registry.snapshot()
+        assert metrics['cache.test.hits'] == 2
+        assert metrics['cache.test.misses'] == 2
+        assert metrics['cache.test.expirations'] == 1
+        assert metrics['cache.test.entries'] == 0
+
+    def test_oversized_value_is_not_stored(self, clock):
+        cache = make_cache(clock, budget=250)
+        assert not cache.set('key', 'value')
+        assert len(cache) == 0 and cache.size == 0
+
+
+def test_notifications_are_cached_within_budget(clock):
+    cache = make_cache(clock, budget=800)
+    renderer = Renderer(verdicts={'ru': homework.HOMEWORK_VERDICTS},
+                        cache=cache)
+    for name in ('hw1', 'hw2', 'hw3', 'hw1'):
+        renderer.status(name, 'approved')
+    assert len(cache) == 2 and cache.size <= 800, (
+        'Кэш уведомлений не должен выходить за бюджет памяти.'
+    )
+    assert renderer.status('hw1', 'approved').startswith(
+        'Изменился статус проверки работы "hw1".')
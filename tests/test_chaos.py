@@ -0,0 +1,72 @@
+import pytest
+import telebot
+
+import chaos
+from chaos import ChaosHarness, Event, Fault, FaultReport, Report, gate
+from clock import VirtualClock
+from limiter import AdaptiveLimiter
+from metrics import Registry
+from quota import SingleFlight
+from slo import SLOMonitor
+
+PERIOD = 1
+
+
+@pytest.fixture(autouse=True)
+def isolated_bot(monkeypatch):
+    """Прогон со своими лимитером и SLO; глобалы восстановятся."""
+    homework = chaos.homework
+    registry = Registry()
+    monkeypatch.setattr(homework, 'api_limiter',
+                        AdaptiveLimiter(registry=registry))
+    monkeypatch.setattr(homework, 'single_flight', SingleFlight())
+    monkeypatch.setattr(homework, 'slo_monitor', SLOMonitor(
+        homework.slo_monitor.objectives.values(), registry=registry))
+    monkeypatch.setattr(telebot.apihelper, 'API_URL',
+                        telebot.apihelper.API_URL)
+
+
+def run(events, faults, duration):
+    return ChaosHarness(events, faults, duration, PERIOD,
+                        clock=VirtualClock(1000)).run()
+
+
+def test_recovers_from_api_faults():
+    faults = [Fault('http_status', 4, 4, {'status': 503}),
+              Fault('malformed', 20, 4)]
+    events = [Event(6, 1, 'work1', 'reviewing'),
+              Event(22, 1, 'work1', 'approved')]
+    report = run(events, faults, 36)
+    assert gate(report, max_detect=PERIOD, max_recover=4 * PERIOD,
+                max_amplification=1) == [], (
+        'Бот должен обнаруживать сбой API за период и восстанавливаться '
+        'без потерь уведомлений.'
+    )
+
+
+def test_chaos_run_is_deterministic():
+    faults = [Fault('reset', 2, 3), Fault('latency', 8, 2, {'delay': 0.5})]
+    events = [Event(3, 1, 'work1', 'approved')]
+    assert run(events, faults, 16) == run(events, faults, 16), (
+        'Прогон на виртуальных часах должен повторяться в точности.'
+    )
+
+
+def test_lost_acknowledgement_is_counted_as_duplicate():
+    faults = [Fault('telegram', 2, 4, {'deliver': True})]
+    events = [Event(3, 1, 'work1', 'approved')]
+    report = run(events, faults, 12)
+    assert report.lost == []
+    assert report.duplicated >= 1, (
+        'Сообщение, ответ на которое потерян, отправляется повторно.'
+    )
+    assert report.faults[0].detected_after is not None
+
+
+def test_gate_reports_violations():
+    fault = Fault('reset', 1, 1)
+    report = Report([FaultReport(fault, 0.1, None, 30, 3.0)],
+                    [('work1', 'approved')], 0, 10, 40, 1)
+    violations = gate(report, max_detect=1, max_recover=1,
+                      max_amplification=2)
+    assert len(violations) == 3
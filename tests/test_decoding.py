@@ -0,0 +1,57 @@
+import json
+
+import pytest
+import requests
+
+import decoding
+import homework
+
+PAYLOAD = json.dumps({
+    'homeworks': [{'id': 1, 'homework_name': 'hw.zip', 'status': 'approved',
+                   'reviewer_comment': 'Принято!', 'lesson_name': 'Урок',
+                   'date_updated': '2021-04-11T10:31:09Z'}],
+    'current_date': 1618137069}, ensure_ascii=False).encode()
+
+
+class FakeResponse:
+    status_code = 200
+    content = PAYLOAD
+
+
+class TestDecoders:
+
+    def test_projection_keeps_only_needed_keys(self):
+        decoder = decoding.get_decoder('projected', homework.RESPONSE_KEYS)
+        data = decoder.decode(PAYLOAD)
+        assert data == {
+            'homeworks': [{'id': 1, 'homework_name': 'hw.zip',
+                           'status': 'approved',
+                           'reviewer_comment': 'Принято!',
+                           'date_updated': '2021-04-11T10:31:09Z'}],
+            'current_date': 1618137069}
+        assert data == decoding.project(json.loads(PAYLOAD),
+                                        frozenset(homework.RESPONSE_KEYS))
+
+    def test_fast_falls_back_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(decoding, 'orjson', None)
+        decoder = decoding.get_decoder('fast')
+        assert decoder.name == 'stdlib'
+        assert decoder.decode(PAYLOAD) == json.loads(PAYLOAD)
+
+    def test_unknown_decoder(self):
+        with pytest.raises(ValueError):
+            decoding.get_decoder('simdjson')
+
+    def test_api_answer_uses_configured_decoder(self, monkeypatch):
+        monkeypatch.setattr(homework, 'json_decoder', decoding.get_decoder(
+            'projected', homework.RESPONSE_KEYS))
+        monkeypatch.setattr(requests, 'get',
+                            lambda *args, **kwargs: FakeResponse())
+        response = homework.get_api_answer(0)
+        assert 'lesson_name' not in response['homeworks'][0]
+        assert response['homeworks'][0]['reviewer_comment'] == 'Принято!', (
+            'Комментарий ревьюера нужен для уведомления с комментарием.'
+        )
+        assert homework.check_response(response)[0]['status'] == 'approved', (
+            'Сокращённый ответ должен проходить проверку.'
+        )
@@ -0,0 +1,72 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import telebot
+
+from delivery import DeliveryClient
+from dispatch import FanOutDispatcher
+
+ROUND_TRIP = 0.05
+
+
+class SlowTelegram(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.server.connections.add(self.client_address)
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        time.sleep(ROUND_TRIP)
+        body = (b'{"ok": true, "result": {"message_id": 1, "date": 0, '
+                b'"chat": {"id": 1, "type": "private"}}}')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Очередь по умолчанию (5) отбрасывает одновременные подключения.
+    request_queue_size = 64
+
+
+@pytest.fixture
+def telegram():
+    server = Server(('127.0.0.1', 0), SlowTelegram)
+    server.connections = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    saved = (telebot.apihelper.API_URL, telebot.apihelper.session,
+             telebot.apihelper.SESSION_TIME_TO_LIVE)
+    telebot.apihelper.API_URL = (
+        f'http://127.0.0.1:{server.server_address[1]}/bot{{0}}/{{1}}')
+    yield server
+    (telebot.apihelper.API_URL, telebot.apihelper.session,
+     telebot.apihelper.SESSION_TIME_TO_LIVE) = saved
+    server.shutdown()
+    server.server_close()
+
+
+def test_throughput_scales_with_concurrency(telegram):
+    client = DeliveryClient(pool_size=20)
+    client.install()
+    bot = client.bot('1:token')
+    assert client.bot('1:token') is bot, 'Бот на токен создаётся один раз.'
+    dispatcher = FanOutDispatcher(max_workers=20, retries=0)
+    started = time.monotonic()
+    results = dispatcher.dispatch(
+        lambda chat_id: bot.send_message(chat_id, 'text'), range(40))
+    elapsed = time.monotonic() - started
+    client.close()
+    assert all(result.ok for result in results)
+    assert elapsed < 40 * ROUND_TRIP / 4, (
+        'Одновременные отправки не должны ждать друг друга.'
+    )
+    assert len(telegram.connections) <= 20, (
+        'Соединения должны браться из общего пула.'
+    )
@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+from dispatch import FanOutDispatcher
+
+
+class TestFanOutDispatcher:
+
+    def test_sends_to_all_destinations_in_parallel(self):
+        dispatcher = FanOutDispatcher(max_workers=4)
+        barrier = threading.Barrier(3, timeout=1)
+
+        def send(destination):
+            # Отправка завершится, только если все три идут одновременно.
+            barrier.wait()
+
+        started = time.monotonic()
+        results = dispatcher.dispatch(send, ['1', '2', '3'])
+        assert time.monotonic() - started < 1
+        assert [result.destination for result in results] == ['1', '2', '3']
+        assert all(result.ok for result in results), (
+            'Сообщение должно быть доставлено каждому получателю.'
+        )
+
+    def test_retries_each_destination_separately(self):
+        dispatcher = FanOutDispatcher(
+            retries=2, retry_delay=0, errors=(ValueError,))
+        calls = {'ok': 0, 'flaky': 0, 'broken': 0}
+
+        def send(destination):
+            calls[destination] += 1
+            if destination == 'flaky' and calls[destination] < 2:
+                raise ValueError('flaky')
+            if destination == 'broken':
+                raise ValueError('broken')
+
+        results = dispatcher.dispatch(send, ['ok', 'flaky', 'broken'])
+        assert [(result.ok, result.attempts) for result in results] == [
+            (True, 1), (True, 2), (False, 3)
+        ]
+        assert isinstance(results[2].error, ValueError)
+        assert calls == {'ok': 1, 'flaky': 2, 'broken': 3}
+
+
+def test_send_message_fans_out_to_extra_chats(monkeypatch, homework_module):
+    sent = []
+
+    class Bot:
+        def send_message(self, chat_id, text):
+            sent.append(chat_id)
+
+    monkeypatch.setattr(homework_module, 'TELEGRAM_CHAT_ID', '12345')
+    monkeypatch.setattr(
+        homework_module, 'TELEGRAM_EXTRA_CHAT_IDS', ['-100', '-200'])
+    assert homework_module.send_message(Bot(), 'message') is True
+    assert sorted(sent) == ['-100', '-200', '12345']
+
+
+class BreakLoop(Exception):
+    pass
+
+
+def test_failing_extra_chat_does_not_repeat_message(
+        monkeypatch, homework_module, data_with_new_hw_status):
+    sent, requested, cycles = [], [], []
+
+    class Bot:
+        def __init__(self, token=None):
+            pass
+
+        def send_message(self, chat_id, text, **kwargs):
+            if chat_id == '-100':
+                raise homework_module.requests.ConnectionError('Нет сети')
+            sent.append(chat_id)
+
+    def get_api_answer(timestamp):
+        requested.append(timestamp)
+        if timestamp < 200:
+            return dict(data_with_new_hw_status, current_date=200)
+        return {'homeworks': [], 'current_date': 300}
+
+    def sleep(seconds):
+        cycles.append(seconds)
+        if len(cycles) == 2:
+            raise BreakLoop
+
+    monkeypatch.setattr(homework_module, 'TELEGRAM_CHAT_ID', '1')
+    monkeypatch.setattr(
+        homework_module, 'TELEGRAM_EXTRA_CHAT_IDS', ['-100', '-200'])
+    monkeypatch.setattr(homework_module, 'dispatcher', FanOutDispatcher(
+        retries=0, errors=homework_module.SEND_ERRORS))
+    monkeypatch.setattr(homework_module, 'check_tokens', lambda: None)
+    monkeypatch.setattr(homework_module.telebot, 'TeleBot', Bot)
+    monkeypatch.setattr(homework_module.delivery, 'install', lambda: None)
+    monkeypatch.setattr(homework_module, 'start_slo_alerts',
+                        lambda bot: None)
+    monkeypatch.setattr(homework_module, 'start_election', lambda: None)
+    monkeypatch.setattr(homework_module, 'run_configured_mode',
+                        lambda *args: None)
+    monkeypatch.setattr(homework_module, 'get_api_answer', get_api_answer)
+    monkeypatch.setattr(homework_module.time, 'sleep', sleep)
+    monkeypatch.setattr(homework_module.time, 'time', lambda: 100)
+    with pytest.raises(BreakLoop):
+        homework_module.main()
+    assert requested == [100, 200], (
+        'Сбой дополнительного чата не должен задерживать отметку.'
+    )
+    assert sorted(sent) == ['-200', '1'], (
+        'Основной чат не должен получать сообщение повторно.'
+    )
@@ -0,0 +1,78 @@
+import history
+
+
+def make_homework(name, status, date_updated):
+    return {
+        'id': 1,
+        'homework_name': name,
+        'status': status,
+        'date_updated': date_updated
+    }
+
+
+class TestHistoryStore:
+
+    def fill_store(self, path):
+        store = history.HistoryStore(str(path), flush_interval=0.01)
+        events = (
+            ('hw1.zip', 'reviewing', '2024-01-01T10:00:00Z'),
+            ('hw1.zip', 'rejected', '2024-01-01T11:00:00Z'),
+            ('hw1.zip', 'reviewing', '2024-01-02T10:00:00Z'),
+            ('hw1.zip', 'approved', '2024-01-02T10:30:00Z'),
+            ('hw2.zip', 'reviewing', '2024-01-02T12:00:00Z'),
+            ('hw2.zip', 'approved', '2024-01-02T14:00:00Z'),
+        )
+        for name, status, date_updated in events:
+            store.record('12345', make_homework(name, status, date_updated))
+        store.close()
+        return history.connect(str(path))
+
+    def test_records_are_written_in_background(self, tmp_path):
+        connection = self.fill_store(tmp_path / 'history.db')
+        count = connection.execute(
+            'SELECT COUNT(*) FROM status_history').fetchone()[0]
+        assert count == 6, (
+            'Все изменения статусов должны попасть в базу после `close()`.'
+        )
+        mode = connection.execute('PRAGMA journal_mode').fetchone()[0]
+        assert mode == 'wal'
+
+    def test_repeated_change_is_stored_once(self, tmp_path):
+        path = str(tmp_path / 'history.db')
+        store = history.HistoryStore(path, flush_interval=0.01)
+        homework = make_homework('hw1.zip', 'reviewing',
+                                 '2024-01-01T10:00:00Z')
+        for observed_at in (100, 200, 300):
+            store.record('12345', homework, observed_at)
+        store.close()
+        count = history.connect(path).execute(
+            'SELECT COUNT(*) FROM status_history').fetchone()[0]
+        assert count == 1, (
+            'Одно изменение статуса из разных опросов должно '
+            'записываться один раз.'
+        )
+
+    def test_time_in_reviewing(self, tmp_path):
+        connection = self.fill_store(tmp_path / 'history.db')
+        result = history.time_in_status(connection)
+        assert result == [
+            ('12345', 'hw2.zip', 7200),
+            ('12345', 'hw1.zip', 5400),
+        ]
+
+    def test_turnaround_percentiles(self, tmp_path):
+        connection = self.fill_store(tmp_path / 'history.db')
+        result = history.turnaround_percentiles(
+            connection, percentiles=(50, 100))
+        assert result == {50: 3600, 100: 7200}
+        assert history.turnaround_percentiles(
+            connection, tenant='unknown') == {}
+
+    def test_daily_volumes(self, tmp_path):
+        connection = self.fill_store(tmp_path / 'history.db')
+        assert history.daily_volumes(connection) == [
+            ('2024-01-01', 'rejected', 1),
+            ('2024-01-01', 'reviewing', 1),
+            ('2024-01-02', 'approved', 2),
+            ('2024-01-02', 'reviewing', 2),
+        ]
@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+
+import journal
+
+
+class TestJournal:
+
+    def test_events_are_read_back_in_order(self, tmp_path):
+        log = journal.Journal(str(tmp_path), segment_size=200,
+                              commit_interval=0.01)
+        for number in range(50):
+            log.append({'type': 'status', 'number': number})
+        log.close()
+        assert len(journal.segments(str(tmp_path))) > 1, (
+            'Переполненный сегмент должен сменяться новым.'
+        )
+        assert [event['number'] for event in journal.read_journal(
+            str(tmp_path))] == list(range(50))
+
+    def test_group_commit(self, tmp_path, monkeypatch):
+        fsyncs = []
+        real_fsync = os.fsync
+        monkeypatch.setattr(journal.os, 'fsync',
+                            lambda fd: fsyncs.append(fd) or real_fsync(fd))
+        log = journal.Journal(str(tmp_path), commit_interval=0.05)
+        threads = [
+            threading.Thread(target=lambda: [
+                log.append({'type': 'delivery'}) for _ in range(200)])
+            for _ in range(4)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert log.wait_durable(800, timeout=1)
+        log.close()
+        assert time.monotonic() - started < 1
+        assert len(fsyncs) < 20, (
+            'События должны фиксироваться на диске группами.'
+        )
+        assert len(list(journal.read_journal(str(tmp_path)))) == 800
+
+    def test_torn_tail_is_dropped(self, tmp_path):
+        log = journal.Journal(str(tmp_path))
+        log.append({'number': 1})
+        log.append({'number': 2})
+        log.close()
+        path = journal.segments(str(tmp_path))[-1]
+        os.truncate(path, os.path.getsize(path) - 3)
+        assert [event['number'] for event in journal.read_journal(
+            str(tmp_path))] == [1]
+        log = journal.Journal(str(tmp_path))
+        log.append({'number': 3})
+        log.close()
+        assert [event['number'] for event in journal.read_journal(
+            str(tmp_path))] == [1, 3], (
+            'После восстановления новые события должны читаться.'
+        )
+
+    def test_failed_commit_is_discarded(self, tmp_path, monkeypatch):
+        log = journal.Journal(str(tmp_path), commit_interval=0.01)
+        first = log.append({'number': 1})
+        assert log.wait_durable(first, timeout=1)
+        real_file = log._file
+
+        class FullDisk:
+            name = real_file.name
+            closed = False
+
+            def tell(self):
+                return real_file.tell()
+
+            def write(self, data):
+                real_file.write(data[:5])
+                real_file.flush()
+                raise OSError(28, 'No space left on device')
+
+            def close(self):
+                real_file.close()
+
+        log._file = FullDisk()
+        second = log.append({'number': 2})
+        assert not log.wait_durable(second, timeout=1), (
+            'Ожидающий должен узнать, что событие не записано.'
+        )
+        third = log.append({'number': 3})
+        assert log.wait_durable(third, timeout=1)
+        log.close()
+        assert [event['number'] for event in journal.read_journal(
+            str(tmp_path))] == [1, 3], (
+            'События после сбоя записи должны оставаться читаемыми.'
+        )
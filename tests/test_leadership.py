@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+from leadership import LeaderElector, SQLiteLeaseBackend
+from runtime import TenantRuntime
+from tenants import Tenant
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Stop(Exception):
+    pass
+
+
+class Handover:
+    """Резерв, который становится ведущим, а после опроса - снова резервом."""
+
+    name = 'bot'
+
+    def __init__(self):
+        self.is_leader = False
+        self.promoted = False
+
+    def wait_for_leadership(self):
+        if self.promoted:
+            raise Stop
+        self.is_leader = self.promoted = True
+
+
+class TestLeadership:
+
+    def test_lease_has_single_owner(self, tmp_path):
+        clock = FakeClock()
+        path = str(tmp_path / 'lease.db')
+        first = SQLiteLeaseBackend(path, clock=clock)
+        second = SQLiteLeaseBackend(path, clock=clock)
+        assert first.acquire('bot', 'a', ttl=10) is True
+        assert second.acquire('bot', 'b', ttl=10) is False, (
+            'Пока аренда действует, второй экземпляр не может её взять.'
+        )
+        assert first.acquire('bot', 'a', ttl=10) is True
+        assert second.acquire('shard-2', 'b', ttl=10) is True
+        clock.now += 11
+        assert second.acquire('bot', 'b', ttl=10) is True
+        assert first.acquire('bot', 'a', ttl=10) is False
+
+    def test_release(self, tmp_path):
+        backend = SQLiteLeaseBackend(str(tmp_path / 'lease.db'))
+        backend.acquire('bot', 'a', ttl=10)
+        backend.release('bot', 'a')
+        assert backend.acquire('bot', 'b', ttl=10) is True
+
+    def test_standby_takes_over(self, tmp_path):
+        path = str(tmp_path / 'lease.db')
+        leader = LeaderElector(SQLiteLeaseBackend(path), 'bot', owner='a',
+                               ttl=0.3, heartbeat=0.05)
+        standby = LeaderElector(SQLiteLeaseBackend(path), 'bot', owner='b',
+                                ttl=0.3, heartbeat=0.05)
+        leader.start()
+        standby.start()
+        assert leader.is_leader
+        assert not standby.is_leader
+        leader.stop()
+        assert standby.wait_for_leadership(timeout=1), (
+            'Резервный экземпляр должен стать ведущим после остановки '
+            'прежнего.'
+        )
+        standby.stop()
+
+    def test_new_leader_does_not_poll_from_stale_cursor(self):
+        elector = Handover()
+        polled, restored = [], []
+
+        def poll(tenant):
+            polled.append(tenant.cursor)
+            elector.is_leader = False
+
+        tenant = Tenant('anna', 'token', '1', 0.05)
+        tenant.cursor = 100
+        runtime = TenantRuntime(
+            [tenant], poll, elector=elector, ramp_up=0, jitter=0,
+            on_takeover=lambda runtime: restored.append(True))
+        started = int(time.time())
+        with pytest.raises(Stop):
+            runtime.run_forever()
+        runtime.stop()
+        assert len(polled) == 1 and polled[0] >= started, (
+            'Новый ведущий должен опрашивать с текущего момента, а не '
+            'с курсора своего запуска.'
+        )
+        assert restored == [True]
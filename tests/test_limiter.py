@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+from limiter import AdaptiveLimiter
+from metrics import Registry
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def limiter():
+    clock = FakeClock()
+    registry = Registry()
+    limiter = AdaptiveLimiter(initial=4, max_limit=8, clock=clock,
+                              registry=registry)
+    return limiter, clock, registry
+
+
+def run_batch(limiter, clock, latency, overloaded=False):
+    """Запросы на весь лимит, завершившиеся через ``latency``."""
+    started = [limiter.acquire() for _ in range(int(limiter.limit))]
+    clock.now += latency
+    for value in started:
+        limiter.release(value, overloaded)
+
+
+class TestLimiter:
+
+    def test_grows_while_healthy(self, limiter):
+        limiter, clock, registry = limiter
+        for _ in range(20):
+            run_batch(limiter, clock, 0.1)
+        assert int(limiter.limit) == 8, (
+            'Лимит должен расти до верхней границы, пока ответы быстрые.')
+        assert registry.snapshot()['limiter.api.limit'] == 8
+
+    def test_does_not_grow_when_underused(self, limiter):
+        limiter, clock, _ = limiter
+        for _ in range(10):
+            limiter.release(limiter.acquire(), False)
+        assert int(limiter.limit) == 4, (
+            'Незанятый лимит не должен расти.')
+
+    def test_halves_once_on_overload(self, limiter):
+        limiter, clock, registry = limiter
+        run_batch(limiter, clock, 0.1, overloaded=True)
+        assert int(limiter.limit) == 2, (
+            'Ответы, начатые до снижения, не должны снижать лимит снова.')
+        assert registry.snapshot()['limiter.api.decreases'] == 1
+
+    def test_decreases_on_latency_growth(self, limiter):
+        limiter, clock, _ = limiter
+        run_batch(limiter, clock, 0.1)
+        for _ in range(3):
+            run_batch(limiter, clock, 1.0)
+        assert int(limiter.limit) < 4, (
+            'Рост задержки относительно базовой должен снижать лимит.')
+        assert limiter.limit >= limiter.min_limit
+
+    @pytest.mark.timeout(5)
+    def test_blocks_above_limit(self):
+        limiter = AdaptiveLimiter(initial=1, registry=Registry())
+        started = limiter.acquire()
+        acquired = threading.Event()
+        thread = threading.Thread(
+            target=lambda: (limiter.acquire(), acquired.set()))
+        thread.start()
+        assert not acquired.wait(0.1), 'Лимит не должен превышаться.'
+        limiter.release(started)
+        assert acquired.wait(1)
+        thread.join()
@@ -0,0 +1,91 @@
+import io
+import json
+import logging
+
+import logs
+
+
+def make_logger(name, **options):
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    filters = logs.configure(logger, **options)
+    return logger, stream, filters
+
+
+class TestLogs:
+
+    def test_sampling_per_call_site(self):
+        logger, stream, _ = make_logger('test.sampling', every=3)
+        for number in range(7):
+            logger.debug(f'first {number}')
+        logger.debug('second')
+        lines = stream.getvalue().splitlines()
+        assert lines == ['first 0', 'first 3', 'first 6', 'second'], (
+            'Из одного места должна проходить каждая N-я запись, '
+            'другие места считаются отдельно.')
+
+    def test_suppressed_count_and_rate(self):
+        now = [0.0]
+        sampler = logs.SamplingFilter(per_second=2, clock=lambda: now[0])
+        record = logging.LogRecord(
+            'test', logging.INFO, __file__, 1, 'text', (), None)
+        passed = [sampler.filter(record) for _ in range(5)]
+        assert passed == [True, True, False, False, False]
+        now[0] = 1.5
+        assert sampler.filter(record)
+        assert record.suppressed == 3, (
+            'Число отброшенных записей должно попасть в следующую.')
+
+    def test_warnings_are_not_sampled(self):
+        logger, stream, _ = make_logger('test.warnings', every=100)
+        for _ in range(5):
+            logger.warning('warning')
+        assert len(stream.getvalue().splitlines()) == 5
+
+    def test_each_handler_samples_on_its_own(self):
+        streams = [io.StringIO(), io.StringIO()]
+        logger = logging.getLogger('test.handlers')
+        logger.handlers = [logging.StreamHandler(stream) for stream in streams]
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        logs.configure(logger, every=2)
+        for number in range(4):
+            logger.debug(f'line {number}')
+        for stream in streams:
+            assert stream.getvalue().splitlines() == ['line 0', 'line 2'], (
+                'Выборка не должна зависеть от числа обработчиков.')
+
+    def test_unsampled_records_always_pass(self):
+        logger, stream, _ = make_logger('test.unsampled', every=100)
+        for number in range(3):
+            logger.debug('poll %s', number, extra=logs.UNSAMPLED)
+        assert stream.getvalue().splitlines() == [
+            'poll 0', 'poll 1', 'poll 2'], (
+            'Записи, по которым считаются интервалы опроса, '
+            'не должны отбрасываться.')
+
+    def test_secrets_are_redacted(self):
+        logger, stream, filters = make_logger('test.redaction')
+        filters[-1].add('known-secret')
+        logger.debug('headers %s', {'Authorization': 'OAuth y0_token'})
+        logger.error('https://api.telegram.org/bot123:AA-bb_cc/sendMessage')
+        logger.info('value known-secret')
+        output = stream.getvalue()
+        for secret in ('y0_token', 'AA-bb_cc', 'known-secret'):
+            assert secret not in output, 'Токены не должны попадать в лог.'
+        assert "'OAuth ***'" in output
+
+    def test_json_with_context(self):
+        logger, stream, _ = make_logger('test.json', json_format=True)
+        cycle = logs.start_cycle('alice')
+        logger.info('polled')
+        data = json.loads(stream.getvalue())
+        assert data['message'] == 'polled'
+        assert data['level'] == 'INFO'
+        assert data['tenant'] == 'alice'
+        assert data['cycle'] == cycle
+        assert data['site'].startswith('test_logs:')
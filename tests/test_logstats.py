@@ -0,0 +1,87 @@
+import json
+
+import logstats
+
+
+LOG_LINES = [
+    '2024-01-01 10:00:00,000 - __main__ - DEBUG - Программа начала запрос '
+    'на адрес https://practicum.yandex.ru',
+    'Программа начала запрос на адрес https://practicum.yandex.ru',
+    '2024-01-01 10:00:01,000 - __main__ - ERROR - Ошибка при отправке '
+    'сообщения: timeout. (Тип ошибки: ApiException)',
+    '2024-01-01 10:10:00,500 - __main__ - DEBUG - Программа начала запрос '
+    'на адрес https://practicum.yandex.ru',
+    '2024-01-01 10:10:01,000 - __main__ - ERROR - Сбой в работе программы: '
+    'Статус-код ответа отличается от успешного: 500.',
+    '2024-01-01 10:20:00,000 - __main__ - DEBUG - Программа начала запрос '
+    'на адрес https://practicum.yandex.ru',
+]
+
+
+class TestLogStats:
+
+    def write_logs(self, tmp_path):
+        path = tmp_path / 'bot.log'
+        # Старшая часть лога - в ротированной копии.
+        (tmp_path / 'bot.log.1').write_text(
+            '\n'.join(LOG_LINES[:3]) + '\n', encoding='utf-8')
+        path.write_text('\n'.join(LOG_LINES[3:]) + '\n', encoding='utf-8')
+        return str(path)
+
+    def test_report(self, tmp_path):
+        report = logstats.analyze(self.write_logs(tmp_path), workers=1)
+        assert report['send_failures'] == 1
+        assert dict(report['top_errors']) == {
+            'ApiException': 1,
+            'Статус-код ответа отличается от успешного': 1,
+        }
+        assert report['poll_interval']['polls'] == 3
+        assert report['poll_interval']['min'] == 599.5
+        assert report['poll_interval']['max'] == 600.5
+        assert report['timeline'][0] == {
+            'minute': '2024-01-01 10:00', 'lines': 2, 'errors': 1,
+            'error_rate': 0.5
+        }
+
+    def test_chunks_match_single_pass(self, tmp_path):
+        path = self.write_logs(tmp_path)
+        single = logstats.analyze(path, workers=1)
+        chunks = logstats.split_chunks(path, len(open(path, 'rb').read()), 3)
+        assert len(chunks) > 1, 'Файл должен делиться на части.'
+        results = [logstats.scan_chunk(path, *chunk) for chunk in chunks]
+        results.insert(0, logstats.scan_chunk(
+            path + '.1', 0, len(open(path + '.1', 'rb').read())))
+        assert logstats.summarize(results, top=10) == single
+
+
+def json_line(time, level, message, tenant=None):
+    record = {'time': time, 'level': level, 'logger': 'homework',
+              'message': message, 'site': 'homework:1'}
+    if tenant:
+        record['tenant'] = tenant
+    return json.dumps(record, ensure_ascii=False)
+
+
+def test_json_log_with_intervals_per_tenant(tmp_path):
+    poll = 'Программа начала запрос на адрес https://practicum.yandex.ru'
+    lines = [
+        json_line('2024-01-01T10:00:00+00:00', 'DEBUG', poll, 'alice'),
+        json_line('2024-01-01T10:00:05+00:00', 'DEBUG', poll, 'bob'),
+        json_line('2024-01-01T10:00:06+00:00', 'ERROR',
+                  'Ошибка при отправке сообщения: timeout. '
+                  '(Тип ошибки: ApiException)', 'bob'),
+        json_line('2024-01-01T10:01:00+00:00', 'DEBUG', poll, 'alice'),
+        json_line('2024-01-01T10:01:05+00:00', 'DEBUG', poll, 'bob'),
+        'не запись лога',
+    ]
+    path = tmp_path / 'bot.log'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    report = logstats.analyze(str(path), workers=1)
+    assert report['send_failures'] == 1
+    assert dict(report['top_errors']) == {'ApiException': 1}
+    assert report['timeline'][0]['lines'] == 3
+    assert report['poll_interval']['min'] == 60, (
+        'Интервалы нужно считать между опросами одного получателя.'
+    )
+    assert report['poll_interval']['max'] == 60
+    assert set(report['poll_interval_by_tenant']) == {'alice', 'bob'}
@@ -0,0 +1,143 @@
+import threading
+
+from metrics import Registry
+from pipeline import Pipeline, Stage
+
+
+class TestPipeline:
+
+    def test_items_flow_through_all_stages(self):
+        registry = Registry()
+        results = []
+        pipeline = Pipeline([
+            Stage('split', lambda text: text.split(), registry=registry),
+            Stage('upper', lambda word: [word.upper()], workers=3,
+                  registry=registry),
+            Stage('collect', results.append, registry=registry),
+        ])
+        pipeline.start()
+        pipeline.submit('a b c')
+        pipeline.submit('d')
+        pipeline.join()
+        pipeline.stop()
+        assert sorted(results) == ['A', 'B', 'C', 'D']
+        snapshot = registry.snapshot()
+        assert snapshot['pipeline.split.processed'] == 2
+        assert snapshot['pipeline.upper.processed'] == 4
+
+    def test_stage_error_does_not_stop_pipeline(self):
+        registry = Registry()
+        errors = []
+
+        def handler(number):
+            if number == 0:
+                raise ZeroDivisionError('zero')
+            return [number]
+
+        results = []
+        pipeline = Pipeline(
+            [Stage('check', handler, registry=registry),
+             Stage('collect', results.append, registry=registry)],
+            on_error=lambda stage, item, error: errors.append(
+                (stage.name, item)))
+        pipeline.start()
+        for number in (1, 0, 2):
+            pipeline.submit(number)
+        pipeline.join()
+        pipeline.stop()
+        assert results == [1, 2]
+        assert errors == [('check', 0)]
+        assert registry.snapshot()['pipeline.check.errors'] == 1
+
+    def test_backpressure_blocks_submit(self):
+        release = threading.Event()
+        stage = Stage('slow', lambda item: release.wait(1) and [],
+                      queue_size=1, registry=Registry())
+        pipeline = Pipeline([stage])
+        pipeline.start()
+        pipeline.submit(1)
+        pipeline.submit(2)
+        submitted = threading.Event()
+        thread = threading.Thread(
+            target=lambda: (pipeline.submit(3), submitted.set()))
+        thread.start()
+        assert not submitted.wait(0.1), (
+            'Постановка в заполненную очередь должна блокироваться.'
+        )
+        release.set()
+        assert submitted.wait(1)
+        pipeline.join()
+        pipeline.stop()
+
+
+def test_build_pipeline_sends_parsed_status(
+        monkeypatch, homework_module, data_with_new_hw_status):
+    sent = []
+    monkeypatch.setattr(homework_module, 'get_api_answer',
+                        lambda timestamp: data_with_new_hw_status)
+    monkeypatch.setattr(homework_module, 'send_message',
+                        lambda bot, message: sent.append(message))
+    pipeline = homework_module.build_pipeline(bot=None)
+    pipeline.start()
+    pipeline.submit(0)
+    pipeline.join()
+    pipeline.stop()
+    assert len(sent) == 1
+    assert sent[0].endswith(homework_module.HOMEWORK_VERDICTS['approved'])
+
+
+def test_build_pipeline_reports_error_again_after_recovery(
+        monkeypatch, homework_module, data_with_new_hw_status):
+    sent = []
+    responses = iter((ValueError('сбой'), data_with_new_hw_status,
+                      ValueError('сбой')))
+
+    def get_api_answer(timestamp):
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(homework_module, 'get_api_answer', get_api_answer)
+    monkeypatch.setattr(homework_module, 'send_message',
+                        lambda bot, message: sent.append(message))
+    pipeline = homework_module.build_pipeline(bot=None)
+    pipeline.start()
+    for _ in range(3):
+        pipeline.submit(0)
+        pipeline.join()
+    pipeline.stop()
+    errors = [message for message in sent if 'сбой' in message]
+    assert len(errors) == 2, (
+        'Повторившаяся после успешного опроса ошибка должна '
+        'сообщаться снова.'
+    )
+
+
+def test_build_pipeline_moves_cursor_after_send(
+        monkeypatch, homework_module, data_with_new_hw_status):
+    requested, sent = [], []
+    cursor = {'from_date': 100}
+    changed = dict(data_with_new_hw_status, current_date=200)
+    changed['homeworks'] = data_with_new_hw_status['homeworks'] * 2
+
+    def get_api_answer(timestamp):
+        requested.append(timestamp)
+        if timestamp < 200:
+            return changed
+        return {'homeworks': [], 'current_date': 300}
+
+    monkeypatch.setattr(homework_module, 'get_api_answer', get_api_answer)
+    monkeypatch.setattr(homework_module, 'send_message',
+                        lambda bot, message: sent.append(message) or True)
+    pipeline = homework_module.build_pipeline(None, cursor=cursor)
+    pipeline.start()
+    for _ in range(2):
+        pipeline.submit(cursor['from_date'])
+        pipeline.join()
+    pipeline.stop()
+    assert requested == [100, 200], (
+        'Следующий цикл должен запрашивать изменения с новой отметки.'
+    )
+    assert len(sent) == 2, 'Уведомляться должно о каждой работе один раз.'
+    assert cursor['from_date'] == 300
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from exceptions import QuotaExceededError
+from quota import QuotaLedger, SingleFlight
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestQuotaLedger:
+
+    def test_budget_is_shared_between_ledgers(self, tmp_path):
+        clock = FakeClock()
+        path = str(tmp_path / 'quota.db')
+        first = QuotaLedger(path, limit=2, window=60, timeout=0.05,
+                            clock=clock)
+        second = QuotaLedger(path, limit=2, window=60, timeout=0.05,
+                             clock=clock)
+        first.acquire('OAuth token')
+        second.acquire('OAuth token')
+        with pytest.raises(QuotaExceededError):
+            first.acquire('OAuth token')
+        # Лимит считается отдельно для каждого токена.
+        second.acquire('OAuth other')
+        assert first.used('OAuth token') == 2
+        clock.now += 61
+        second.acquire('OAuth token')
+        assert first.used('OAuth token') == 1
+
+    def test_token_is_not_stored(self, tmp_path):
+        path = tmp_path / 'quota.db'
+        QuotaLedger(str(path)).acquire('OAuth secret-token')
+        assert b'secret-token' not in path.read_bytes()
+
+
+class TestSingleFlight:
+
+    def test_concurrent_calls_are_merged(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def request():
+            calls.append(1)
+            started.set()
+            release.wait(1)
+            return {'homeworks': []}
+
+        results = []
+        leader = threading.Thread(
+            target=lambda: results.append(single_flight.do('key', request)))
+        leader.start()
+        started.wait(1)
+        followers = [
+            threading.Thread(
+                target=lambda: results.append(
+                    single_flight.do('key', request)))
+            for _ in range(3)]
+        for follower in followers:
+            follower.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in (leader, *followers):
+            thread.join()
+        assert len(calls) == 1, 'Одинаковые запросы должны объединяться.'
+        assert len(results) == 4
+        assert single_flight.do('key', lambda: 'new') == 'new'
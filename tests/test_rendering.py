@@ -0,0 +1,64 @@
+import pytest
+
+import homework
+from rendering import HTML, MARKDOWN_V2, Renderer, escape
+
+VERDICTS = {'ru': homework.HOMEWORK_VERDICTS,
+            'en': {'approved': 'Approved!'}}
+
+
+class TestRendering:
+
+    def test_plain_text_matches_parse_status(self):
+        renderer = Renderer(verdicts=VERDICTS)
+        assert renderer.status('hw.zip', 'approved') == (
+            'Изменился статус проверки работы "hw.zip". '
+            f'{homework.HOMEWORK_VERDICTS["approved"]}')
+
+    def test_markdown_and_html_escaping(self):
+        assert escape('user_hw-1.zip (v2)!', MARKDOWN_V2) == (
+            r'user\_hw\-1\.zip \(v2\)\!')
+        renderer = Renderer(verdicts=VERDICTS, parse_mode=HTML)
+        message = renderer.status('<b>hw</b> & co', 'approved')
+        assert '&lt;b&gt;hw&lt;/b&gt; &amp; co' in message
+        renderer = Renderer(verdicts=VERDICTS, parse_mode=MARKDOWN_V2)
+        assert renderer.status('hw.zip', 'approved').endswith(
+            r'Ура\!'), 'Текст шаблона тоже должен экранироваться.'
+
+    def test_locale_fallback(self):
+        renderer = Renderer(verdicts=VERDICTS)
+        assert renderer.status('hw', 'approved', 'en') == (
+            'Review status of "hw" has changed. Approved!')
+        assert renderer.status('hw', 'rejected', 'en').endswith(
+            homework.HOMEWORK_VERDICTS['rejected']), (
+            'Без перевода вердикта используется язык по умолчанию.'
+        )
+        assert renderer.status('hw', 'approved', 'de').startswith(
+            'Изменился статус')
+
+    def test_settings_are_checked(self):
+        renderer = Renderer(verdicts=VERDICTS, parse_mode='markdownv2')
+        assert renderer.parse_mode == MARKDOWN_V2, (
+            'Режим разметки должен приниматься в любом регистре.'
+        )
+        assert renderer.status('hw.zip', 'approved').endswith(r'Ура\!')
+        with pytest.raises(ValueError):
+            Renderer(verdicts=VERDICTS, parse_mode='markdown2')
+        with pytest.raises(ValueError):
+            Renderer(verdicts=VERDICTS, locale='de')
+
+    def test_rendered_messages_are_cached(self):
+        renderer = Renderer(verdicts=VERDICTS)
+        for _ in range(100):
+            renderer.status('hw', 'reviewing', 'ru', 'Хорошо')
+        info = renderer.status.cache_info()
+        assert info.hits == 99 and info.misses == 1
+        assert renderer.status('hw', 'reviewing', 'ru', 'Хорошо').endswith(
+            'Комментарий ревьюера: Хорошо')
+
+
+def test_error_message_is_escaped(monkeypatch):
+    monkeypatch.setattr(homework, 'renderer', Renderer(
+        verdicts=VERDICTS, parse_mode=MARKDOWN_V2))
+    assert homework.error_message(ValueError('Код 500.')) == (
+        r'Сбой в работе программы: Код 500\.')
@@ -0,0 +1,111 @@
+import threading
+import time
+
+from scheduler import Scheduler
+from tenants import Tenant
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestScheduler:
+
+    def test_pop_due_in_deadline_order(self):
+        clock = FakeClock()
+        scheduler = Scheduler(clock=clock)
+        scheduler.schedule('b', 20)
+        scheduler.schedule('a', 10)
+        scheduler.schedule('c', 30)
+        clock.now = 25
+        assert scheduler.pop_due() == ['a', 'b']
+        assert scheduler.next_deadline() == 30
+        assert len(scheduler) == 1
+
+    def test_reschedule_and_cancel(self):
+        scheduler = Scheduler(clock=FakeClock())
+        scheduler.schedule('a', 10)
+        scheduler.schedule('b', 20)
+        scheduler.schedule('a', 30)
+        assert scheduler.deadline('a') == 30
+        assert scheduler.pop_due(25) == ['b'], (
+            'После переноса срока старая запись не должна срабатывать.'
+        )
+        assert scheduler.cancel('a') is True
+        assert scheduler.cancel('a') is False
+        assert scheduler.pop_due(100) == []
+        assert scheduler.next_deadline() is None
+
+    def test_wait_due_wakes_up_on_earlier_deadline(self):
+        scheduler = Scheduler()
+        scheduler.schedule_in('late', 60)
+        result = []
+        thread = threading.Thread(
+            target=lambda: result.extend(scheduler.wait_due(timeout=1)))
+        thread.start()
+        time.sleep(0.05)
+        scheduler.schedule_in('early', 0)
+        thread.join()
+        assert result == ['early']
+
+    def test_wait_due_timeout(self):
+        scheduler = Scheduler()
+        scheduler.schedule_in('late', 60)
+        assert scheduler.wait_due(timeout=0.01) == []
+
+
+class TestPollTenant:
+
+    def test_cursor_moves_and_errors_reported_once(
+            self, monkeypatch, homework_module, data_with_new_hw_status):
+        tenant = Tenant('student', 'token', '777', 600)
+        tenant.cursor = 0
+        sent = []
+        monkeypatch.setattr(
+            homework_module, 'send_message_to',
+            lambda bot, chat_id, message: sent.append((chat_id, message))
+            or True)
+        monkeypatch.setattr(homework_module, 'request_api',
+                            lambda *args: data_with_new_hw_status)
+        homework_module.poll_tenant(None, tenant)
+        assert tenant.cursor == data_with_new_hw_status['current_date']
+        assert sent[0][0] == '777'
+
+        def broken_request(*args):
+            raise ValueError('upstream is down')
+
+        monkeypatch.setattr(homework_module, 'request_api', broken_request)
+        homework_module.poll_tenant(None, tenant)
+        homework_module.poll_tenant(None, tenant)
+        assert tenant.error_count == 2
+        assert len(sent) == 2, (
+            'Повторяющаяся ошибка должна отправляться получателю один раз.'
+        )
+
+    def test_all_changed_homeworks_are_notified(
+            self, monkeypatch, homework_module):
+        tenant = Tenant('student', 'token', '777', 600)
+        tenant.cursor = 0
+        response = {
+            'homeworks': [
+                {'id': 2, 'homework_name': 'hw2', 'status': 'approved'},
+                {'id': 1, 'homework_name': 'hw1', 'status': 'reviewing'}],
+            'current_date': 100}
+        sent = []
+        monkeypatch.setattr(
+            homework_module, 'send_message_to',
+            lambda bot, chat_id, message: sent.append(message) or True)
+        monkeypatch.setattr(homework_module, 'request_api',
+                            lambda *args: response)
+        homework_module.poll_tenant(None, tenant)
+        assert len(sent) == 2, (
+            'Нужно уведомлять обо всех работах из ответа, а не о первой.'
+        )
+        assert '"hw1"' in sent[0] and '"hw2"' in sent[1], (
+            'Уведомления должны идти от давних изменений к новым.'
+        )
+        assert tenant.statuses == {1: 'reviewing', 2: 'approved'}
@@ -0,0 +1,45 @@
+import shadow
+from tenants import Tenant
+
+
+class TestShadow:
+
+    def test_shadow_bot_records_messages(self, tmp_path, homework_module,
+                                         monkeypatch):
+        path = str(tmp_path / 'shadow.jsonl')
+        bot = shadow.ShadowBot(path)
+        monkeypatch.setattr(homework_module, 'TELEGRAM_CHAT_ID', '12345')
+        assert homework_module.send_message(bot, 'Статус изменился') is True
+        bot.close()
+        records = shadow.read_records(path)
+        assert [(record['chat_id'], record['text']) for record in records] == [
+            ('12345', 'Статус изменился')
+        ], 'В теневом режиме сообщение должно попасть в файл.'
+        assert records[0]['offset'] >= 0
+
+    def test_tenant_with_own_token_uses_shadow_bot(
+            self, tmp_path, homework_module, monkeypatch):
+        path = str(tmp_path / 'shadow.jsonl')
+        monkeypatch.setattr(homework_module, 'SHADOW_LOG_PATH', path)
+        bot = shadow.ShadowBot(path)
+        tenant = Tenant('anna', 'token', '1', 600, telegram_token='1:own')
+        assert homework_module.tenant_bot(bot, tenant) is bot, (
+            'В теневом режиме сообщения получателя со своим ботом тоже '
+            'должны записываться в файл.'
+        )
+        bot.close()
+
+    def test_diff_runs(self):
+        baseline = [
+            {'chat_id': '1', 'text': 'a', 'offset': 1.0},
+            {'chat_id': '1', 'text': 'b', 'offset': 2.0},
+        ]
+        candidate = [
+            {'chat_id': '1', 'text': 'a', 'offset': 1.5},
+            {'chat_id': '2', 'text': 'c', 'offset': 3.0},
+        ]
+        result = shadow.diff_runs(baseline, candidate)
+        assert result['matched'] == 1
+        assert result['missing'] == [('1', 'b')]
+        assert result['extra'] == [('2', 'c')]
+        assert result['max_delay'] == 0.5
@@ -0,0 +1,67 @@
+import pytest
+
+from clock import VirtualClock
+from metrics import Registry
+from runtime import TenantRuntime
+from shedding import ACTIVE, IDLE, REVIEWING, LoadShedder, priority
+from tenants import Tenant
+
+NOW = 1_000_000
+
+
+def make_tenants():
+    reviewing = Tenant('reviewing', 't1', '1', 600)
+    reviewing.statuses = {1: 'reviewing'}
+    active = Tenant('active', 't2', '2', 600)
+    active.statuses = {2: 'approved'}
+    active.changed_at = NOW - 3600
+    idle = Tenant('idle', 't3', '3', 600)
+    idle.statuses = {3: 'approved'}
+    return [idle, active, reviewing]
+
+
+@pytest.fixture
+def shedder():
+    return LoadShedder(queue_limit=4, max_lag=60, delay=30,
+                       clock=lambda: NOW, registry=Registry())
+
+
+class TestLoadShedder:
+
+    def test_priorities(self):
+        assert [priority(tenant, NOW) for tenant in make_tenants()] == [
+            IDLE, ACTIVE, REVIEWING]
+
+    def test_everything_is_admitted_without_overload(self, shedder):
+        admitted, delayed, shed = shedder.admit(make_tenants(), 0, 0)
+        assert len(admitted) == 3 and not delayed and not shed
+
+    def test_overload_keeps_reviewing_tenants(self, shedder):
+        admitted, delayed, shed = shedder.admit(make_tenants(), 0, 4)
+        assert [tenant.name for tenant in admitted] == ['reviewing'], (
+            'Получатели с работой на проверке опрашиваются и при перегрузке.'
+        )
+        assert [tenant.name for tenant in delayed] == ['active']
+        assert [tenant.name for tenant in shed] == ['idle']
+        metrics = shedder.registry.snapshot()
+        assert metrics['shedding.delayed.active'] == 1
+        assert metrics['shedding.shed.idle'] == 1
+        assert metrics['shedding.overloaded'] == 1
+
+    def test_remaining_room_goes_by_priority(self, shedder):
+        admitted, _, shed = shedder.admit(make_tenants(), 61, 0)
+        assert [tenant.name for tenant in admitted] == [
+            'reviewing', 'active']
+        assert [tenant.name for tenant in shed] == ['idle']
+
+    def test_runtime_reschedules_shed_polls(self, shedder):
+        clock = VirtualClock(NOW)
+        runtime = TenantRuntime(make_tenants(), lambda tenant: None,
+                                clock=clock, jitter=0, shedder=shedder)
+        runtime.pending = 4
+        admitted = runtime.dispatch(['idle', 'active', 'reviewing'])
+        assert [tenant.name for tenant in admitted] == ['reviewing']
+        assert runtime.scheduler.deadline('active') == NOW + 30
+        assert NOW < runtime.scheduler.deadline('idle') <= NOW + 600, (
+            'Пропущенный опрос переносится на следующий срок.'
+        )
@@ -0,0 +1,136 @@
+import time
+from collections import Counter
+from http import HTTPStatus
+
+from clock import VirtualClock
+from runtime import TenantRuntime
+from shedding import ACTIVE, LoadShedder, priority
+from simulation import ScriptedResponse, simulate
+from tenants import Tenant
+
+DAY = 24 * 60 * 60
+
+
+def make_tenants(count, period=600):
+    return [Tenant(f'student{number}', f'token{number}', str(number), period)
+            for number in range(count)]
+
+
+class TestVirtualClock:
+
+    def test_sleep_is_instant(self):
+        clock = VirtualClock(start=100)
+        started = time.monotonic()
+        clock.sleep(DAY)
+        assert clock.time() == 100 + DAY
+        assert time.monotonic() - started < 0.1
+
+
+class TestSimulation:
+
+    def test_day_of_polling_runs_fast(self):
+        def script(now, token, from_date):
+            return ScriptedResponse(
+                {'homeworks': [], 'current_date': int(now)})
+
+        started = time.monotonic()
+        result = simulate(make_tenants(20), script, duration=DAY)
+        assert time.monotonic() - started < 1.5, (
+            'Моделирование суток опроса должно занимать доли секунды.'
+        )
+        # Каждый получатель опрашивается раз в 10 минут.
+        polls = Counter(call.token for call in result.calls)
+        assert set(polls.values()) <= {DAY // 600, DAY // 600 + 1}
+        assert result.messages == []
+
+    def test_status_change_is_delivered_once(self):
+        def script(now, token, from_date):
+            homeworks = []
+            if now >= 3000:
+                homeworks = [{'id': 1, 'homework_name': 'hw.zip',
+                              'status': 'approved'}]
+            return ScriptedResponse(
+                {'homeworks': homeworks, 'current_date': int(now)})
+
+        result = simulate(make_tenants(1), script, duration=6000, jitter=0)
+        assert [message.chat_id for message in result.messages] == ['0']
+        assert 3000 <= result.messages[0].at < 3600
+
+    def test_state_uses_virtual_time(self):
+        def script(now, token, from_date):
+            homeworks = []
+            if now >= 3000:
+                homeworks = [{'id': 1, 'homework_name': 'hw.zip',
+                              'status': 'approved'}]
+            return ScriptedResponse(
+                {'homeworks': homeworks, 'current_date': int(now)})
+
+        clock = VirtualClock()
+        shedder = LoadShedder(queue_limit=4, clock=clock.time)
+        result = simulate(make_tenants(1), script, duration=6000, jitter=0,
+                          clock=clock, shedder=shedder)
+        tenant = result.runtime.tenants['student0']
+        assert tenant.changed_at == result.messages[0].at, (
+            'Время изменения должно идти по часам моделирования.'
+        )
+        assert priority(tenant, shedder.clock()) == ACTIVE
+
+    def test_backoff_on_errors(self):
+        def script(now, token, from_date):
+            if now < 3 * 60 * 60:
+                return ScriptedResponse(
+                    {}, status_code=HTTPStatus.INTERNAL_SERVER_ERROR)
+            return ScriptedResponse(
+                {'homeworks': [], 'current_date': int(now)})
+
+        result = simulate(make_tenants(1), script, duration=DAY,
+                          ramp_up=0, jitter=0)
+        moments = [call.at for call in result.calls]
+        intervals = [later - earlier
+                     for earlier, later in zip(moments, moments[1:])]
+        assert intervals[:4] == [600, 1200, 2400, 3600], (
+            'При ошибках подряд интервал опроса должен расти.'
+        )
+        assert intervals[-1] == 600
+        assert len(result.messages) == 1, (
+            'Повторяющаяся ошибка отправляется получателю один раз.'
+        )
+
+
+class TestPhases:
+
+    def run_polls(self, tenants, duration, **options):
+        clock = VirtualClock()
+        moments = []
+        runtime = TenantRuntime(
+            tenants, lambda tenant: moments.append(clock.time()),
+            clock=clock, **options)
+        runtime.start()
+        runtime.run_until(duration)
+        return moments
+
+    def test_startup_is_spread_over_ramp_up(self):
+        moments = self.run_polls(make_tenants(500), 59, ramp_up=60)
+        assert len(moments) > 400, (
+            'Первые опросы должны распределяться по окну разгона.'
+        )
+        per_second = Counter(int(moment) for moment in moments)
+        assert max(per_second.values()) < 30
+
+    def test_load_is_flat_across_period(self):
+        moments = self.run_polls(make_tenants(1200), 3 * 600)
+        per_minute = Counter(int(moment // 60) for moment in moments
+                             if moment >= 600)
+        assert len(per_minute) == 20
+        mean = sum(per_minute.values()) / len(per_minute)
+        assert max(per_minute.values()) < 1.5 * mean, (
+            'Опросы должны распределяться по периоду равномерно.'
+        )
+
+    def test_phase_is_stable(self):
+        tenant = make_tenants(1)[0]
+        first = self.run_polls([tenant], 3 * 600, jitter=0)
+        second = self.run_polls([tenant], 3 * 600, jitter=0, ramp_up=0)
+        assert first[1:] == second[1:], (
+            'Фаза опросов получателя не должна зависеть от запуска.'
+        )
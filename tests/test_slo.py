@@ -0,0 +1,62 @@
+import pytest
+
+from clock import VirtualClock
+from metrics import Registry
+from slo import Objective, SLOMonitor
+
+
+@pytest.fixture
+def monitor():
+    clock = VirtualClock()
+    monitor = SLOMonitor(
+        [Objective('api_latency', 0.99, threshold=5),
+         Objective('send_success', 0.9)],
+        clock=clock.monotonic, burn_rate=10, cooldown=600,
+        registry=Registry())
+    return monitor, clock
+
+
+class TestSLOMonitor:
+
+    def test_healthy_service_does_not_alert(self, monitor):
+        monitor, _ = monitor
+        for _ in range(100):
+            monitor.observe('api_latency', 0.3)
+            monitor.record('send_success', True)
+        assert monitor.check() == []
+        assert monitor.percentile('api_latency', 0.99) == 0.3
+
+    def test_alert_is_rate_limited_and_resolved(self, monitor):
+        monitor, clock = monitor
+        for _ in range(10):
+            monitor.observe('api_latency', 9)
+            clock.advance(10)
+        alerts = monitor.check()
+        assert len(alerts) == 1 and 'api_latency' in alerts[0], (
+            'При быстром расходе бюджета ошибок должно быть оповещение.'
+        )
+        assert 'p99 = 9.00' in alerts[0]
+        clock.advance(60)
+        monitor.observe('api_latency', 9)
+        assert monitor.check() == [], (
+            'Повторное оповещение не должно приходить раньше cooldown.'
+        )
+        clock.advance(monitor.long_window)
+        for _ in range(10):
+            monitor.observe('api_latency', 0.1)
+        assert monitor.check() == ['SLO api_latency: показатель восстановился.']
+
+    def test_old_failures_do_not_alert(self, monitor):
+        monitor, clock = monitor
+        for _ in range(10):
+            monitor.record('send_success', False)
+        clock.advance(monitor.short_window + 1)
+        for _ in range(10):
+            monitor.record('send_success', True)
+        assert monitor.burn_rate('send_success') == pytest.approx(5)
+        assert monitor.check() == [], (
+            'Сбой, закончившийся за пределами короткого окна, '
+            'не должен вызывать оповещение.'
+        )
+        assert monitor.registry.snapshot()[
+            'slo.send_success.burn_rate'] == pytest.approx(5)
@@ -0,0 +1,111 @@
+import os
+
+import pytest
+
+import snapshot
+from clock import VirtualClock
+from exceptions import SnapshotError
+from runtime import TenantRuntime
+from tenants import Tenant
+
+
+def make_runtime(clock, token='token-a'):
+    tenants = [Tenant('anna', token, '1', 600), Tenant('boris', 'b', '2', 600)]
+    return TenantRuntime(tenants, lambda tenant: None, clock=clock,
+                         ramp_up=60, jitter=0)
+
+
+@pytest.fixture
+def saved(tmp_path):
+    clock = VirtualClock(1_000_000)
+    runtime = make_runtime(clock)
+    runtime.start()
+    runtime.run_until(clock.time() + 900)
+    anna = runtime.tenants['anna']
+    anna.statuses = {7: 'approved', 'work': 'reviewing'}
+    anna.failures = 2
+    anna.last_error = 'Сбой'
+    path = str(tmp_path / 'state.snap')
+    snapshot.save(path, runtime)
+    return path, clock, runtime
+
+
+class TestSnapshot:
+
+    def test_warm_restart_restores_state(self, saved):
+        path, clock, old = saved
+        clock.advance(30)
+        runtime = make_runtime(clock)
+        deadlines = snapshot.warm_start(path, runtime)
+        anna = runtime.tenants['anna']
+        assert anna.statuses == {7: 'approved', 'work': 'reviewing'}
+        assert anna.failures == 2 and anna.last_error == 'Сбой'
+        assert anna.cursor == old.tenants['anna'].cursor
+        runtime.start(deadlines)
+        for name in ('anna', 'boris'):
+            assert runtime.scheduler.deadline(name) == pytest.approx(
+                old.scheduler.deadline(name)), (
+                'Сроки опросов должны сохраняться после перезапуска.'
+            )
+        assert os.listdir(os.path.dirname(path)) == [
+            'state.snap'], 'Временные файлы не должны оставаться.'
+
+    def test_changed_token_is_not_restored(self, saved):
+        path, clock, _ = saved
+        runtime = make_runtime(clock, token='new-token')
+        deadlines = snapshot.warm_start(path, runtime)
+        assert 'anna' not in deadlines
+        assert runtime.tenants['anna'].statuses == {}
+
+    def test_damaged_or_missing_snapshot_is_ignored(self, saved):
+        path, clock, _ = saved
+        with open(path, 'rb') as file:
+            blob = bytearray(file.read())
+        blob[-1] ^= 0xFF
+        with pytest.raises(SnapshotError):
+            snapshot.decode(bytes(blob))
+        with open(path, 'wb') as file:
+            file.write(blob)
+        assert snapshot.warm_start(path, make_runtime(clock)) == {}
+        assert snapshot.warm_start(path + '.missing',
+                                   make_runtime(clock)) == {}
+
+    def test_stale_snapshot_is_rejected(self, saved):
+        path, clock, _ = saved
+        clock.advance(snapshot.MAX_AGE + 1)
+        with pytest.raises(SnapshotError):
+            snapshot.restore(make_runtime(clock), snapshot.load(path))
+        runtime = make_runtime(clock)
+        assert snapshot.warm_start(path, runtime) == {}
+        assert runtime.tenants['anna'].statuses == {}, (
+            'Устаревший снимок не должен загружаться.'
+        )
+
+    def test_writer_survives_any_error(self, saved, monkeypatch, caplog):
+        path, _, runtime = saved
+
+        def broken(path, runtime):
+            raise RuntimeError('dictionary changed size during iteration')
+
+        monkeypatch.setattr(snapshot, 'save', broken)
+        writer = snapshot.SnapshotWriter(path, runtime)
+        writer.write()
+        assert 'dictionary changed size' in caplog.text, (
+            'Ошибка записи снимка должна логироваться, а не останавливать '
+            'поток.'
+        )
+
+    def test_standby_does_not_overwrite_snapshot(self, saved):
+        path, _, runtime = saved
+
+        class Standby:
+            is_leader = False
+
+        with open(path, 'rb') as file:
+            before = file.read()
+        runtime.tenants['anna'].statuses = {}
+        snapshot.SnapshotWriter(path, runtime, elector=Standby()).write()
+        with open(path, 'rb') as file:
+            assert file.read() == before, (
+                'Резервный экземпляр не должен перезаписывать снимок.'
+            )
@@ -0,0 +1,64 @@
+import pytest
+
+from exceptions import InvalidResponseError
+from validation import ResponseValidator, field
+
+
+validator = ResponseValidator(
+    envelope_fields=(
+        field('homeworks', list),
+        field('current_date', int)),
+    item_fields=(
+        field('homework_name', str),
+        field('status', str, choices=('approved', 'reviewing')),
+        field('id', int, required=False)))
+
+
+class TestResponseValidator:
+
+    def test_valid_items_pass(self):
+        items = [{'homework_name': 'hw1', 'status': 'approved', 'id': 1},
+                 {'homework_name': 'hw2', 'status': 'reviewing'}]
+        result = validator.validate(
+            {'homeworks': items, 'current_date': 1})
+        assert result.items == items
+        assert result.rejections == []
+
+    def test_bad_items_are_rejected_not_raised(self):
+        items = [
+            {'homework_name': 'hw1', 'status': 'approved'},
+            {'homework_name': 'hw2', 'status': 'unknown'},
+            {'status': 'approved'},
+            {'homework_name': 'hw4', 'status': 'approved', 'id': True},
+            'hw5',
+        ]
+        result = validator.validate(
+            {'homeworks': items, 'current_date': 1})
+        assert result.items == items[:1], (
+            'Корректные работы должны пройти проверку, '
+            'даже если в ответе есть некорректные.'
+        )
+        assert [rejection.index for rejection in result.rejections] == [
+            1, 2, 3, 4
+        ]
+        assert 'нет ключа "homework_name"' in result.rejections[1].reasons
+
+    @pytest.mark.parametrize('response', [
+        [],
+        {'current_date': 1},
+        {'homeworks': {}, 'current_date': 1},
+        {'homeworks': []},
+        {'homeworks': [], 'current_date': '1'},
+    ])
+    def test_invalid_envelope_raises_type_error(self, response):
+        with pytest.raises(InvalidResponseError):
+            validator.validate(response)
+        assert issubclass(InvalidResponseError, TypeError)
+
+
+def test_check_response_skips_rejected_items(homework_module):
+    homeworks = homework_module.check_response({
+        'homeworks': [{'homework_name': 'hw1', 'status': 'unknown'},
+                      {'homework_name': 'hw2', 'status': 'approved'}],
+        'current_date': 1})
+    assert [homework['homework_name'] for homework in homeworks] == ['hw2']
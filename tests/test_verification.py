@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+from telebot.apihelper import ApiTelegramException
+
+from exceptions import CheckTokensError, UnsuccessfulHTTPStatusCodeError
+from tenants import Tenant
+from verification import quarantine, verify
+
+
+def telegram_error(code, description):
+    return ApiTelegramException(
+        'getChat', None, {'error_code': code, 'description': description})
+
+
+class Bot:
+    def __init__(self, bad_chats=(), bad_token=False, delay=0,
+                 error=None):
+        self.bad_chats = bad_chats
+        self.bad_token = bad_token
+        self.delay = delay
+        self.error = error
+
+    def get_me(self):
+        if self.bad_token:
+            raise telegram_error(401, 'Unauthorized')
+        if self.error:
+            raise self.error
+
+    def get_chat(self, chat_id):
+        time.sleep(self.delay)
+        if chat_id in self.bad_chats:
+            raise telegram_error(400, 'Bad Request: chat not found')
+
+
+def make_tenants():
+    return [Tenant(name, f'token-{name}', f'chat-{name}', 600)
+            for name in ('a', 'b', 'c')]
+
+
+def check_practicum(tenant):
+    if tenant.name == 'c':
+        raise UnsuccessfulHTTPStatusCodeError('401', 401)
+
+
+class TestVerification:
+
+    def test_all_problems_are_reported_at_once(self):
+        tenants = make_tenants()
+        problems = verify(Bot(bad_chats=('chat-b',)), tenants,
+                          check_practicum)
+        assert sorted((problem.tenant.name, problem.check)
+                      for problem in problems) == [
+            ('b', 'telegram_chat'), ('c', 'practicum_token')
+        ]
+        healthy = quarantine(tenants, problems)
+        assert [tenant.name for tenant in healthy] == ['a']
+        assert tenants[2].quarantined.startswith('practicum_token')
+
+    def test_checks_run_concurrently_within_deadline(self):
+        barrier = threading.Barrier(3, timeout=1)
+
+        def slow_practicum(tenant):
+            barrier.wait()
+
+        started = time.monotonic()
+        problems = verify(Bot(), make_tenants(), slow_practicum)
+        assert problems == []
+        assert time.monotonic() - started < 1
+
+    def test_deadline(self):
+        problems = verify(Bot(delay=0.5), make_tenants()[:1],
+                          check_practicum, deadline=0.05)
+        assert [problem.check for problem in problems] == ['telegram_chat']
+        assert isinstance(problems[0].error, TimeoutError)
+
+    def test_transient_errors_do_not_quarantine(self):
+        tenants = make_tenants()
+
+        def unavailable(tenant):
+            raise UnsuccessfulHTTPStatusCodeError('503', 503)
+
+        problems = verify(Bot(delay=0.5), tenants, unavailable,
+                          deadline=0.05)
+        assert problems and not any(problem.fatal for problem in problems)
+        assert quarantine(tenants, problems) == tenants, (
+            'Таймауты и ошибки сервера не должны исключать получателей.'
+        )
+
+
+def test_bad_bot_token_stops_startup(homework_module, monkeypatch):
+    monkeypatch.setattr(homework_module, 'request_api', lambda *args: {})
+    with pytest.raises(CheckTokensError):
+        homework_module.verify_credentials(
+            Bot(bad_token=True), make_tenants())
+
+
+def test_get_me_blip_does_not_stop_startup(homework_module, monkeypatch):
+    monkeypatch.setattr(homework_module, 'request_api', lambda *args: {})
+    tenants = homework_module.verify_credentials(
+        Bot(error=telegram_error(429, 'Too Many Requests')), make_tenants())
+    assert len(tenants) == 3, (
+        'Временный сбой getMe не должен останавливать бота.'
+    )
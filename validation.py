@@ -0,0 +1,113 @@
+"""Строгая проверка ответа API homework_statuses."""
+from collections import namedtuple
+
+from exceptions import InvalidResponseError
+
+
+Field = namedtuple('Field', ('name', 'types', 'required', 'choices'))
+Rejection = namedtuple('Rejection', ('index', 'item', 'reasons'))
+ValidationResult = namedtuple('ValidationResult', ('items', 'rejections'))
+
+
+def field(name, types, required=True, choices=None):
+    """Описание поля схемы."""
+    if not isinstance(types, tuple):
+        types = (types,)
+    return Field(name, types, required,
+                 frozenset(choices) if choices is not None else None)
+
+
+class ResponseValidator:
+    """Проверка конверта ответа и всех работ за один проход.
+
+    Схема один раз компилируется в конструкторе в функцию-предикат,
+    которая проверяет работу одним выражением; причины отклонения
+    собираются отдельно и только для неподходящих работ. Ошибки
+    конверта (ответ не словарь, нет списка работ, нет ``current_date``)
+    выбрасывают исключение, а неподходящие работы лишь попадают
+    в список отклонённых. Типы сверяются точно, как их создаёт
+    разбор JSON: ``True`` не считается целым числом.
+    """
+
+    def __init__(self, envelope_fields, item_fields):
+        self._envelope = self._compile(envelope_fields)
+        self._items = self._compile(item_fields)
+        self._is_valid_item = self._compile_predicate(item_fields)
+
+    @staticmethod
+    def _compile_predicate(fields):
+        """Сборка функции быстрой проверки работы по схеме."""
+        namespace = {}
+        conditions = []
+        for number, item in enumerate(fields):
+            namespace[f't{number}'] = item.types
+            value = f'v{number}'
+            condition = f'{value}.__class__ in t{number}'
+            if item.choices is not None:
+                namespace[f'c{number}'] = item.choices
+                condition = f'{condition} and {value} in c{number}'
+            if item.required:
+                conditions.append(
+                    f'(({value} := d.get({item.name!r})) is not None '
+                    f'and {condition})')
+            else:
+                conditions.append(
+                    f'(({value} := d.get({item.name!r})) is None '
+                    f'or ({condition}))')
+        source = f'lambda d: {" and ".join(conditions) or "True"}'
+        return eval(compile(source, '<schema>', 'eval'), namespace)
+
+    @staticmethod
+    def _compile(fields):
+        """Подготовка схемы к подробной проверке."""
+        return tuple(
+            (item.name, item.types, item.required, item.choices)
+            for item in fields)
+
+    @staticmethod
+    def _check(data, checks):
+        """Список нарушений схемы для одного словаря."""
+        reasons = []
+        for name, types, required, choices in checks:
+            value = data.get(name)
+            if value is None:
+                if required:
+                    reasons.append(f'нет ключа "{name}"')
+                continue
+            if value.__class__ not in types:
+                reasons.append(f'ключ "{name}" имеет тип '
+                               f'{type(value).__name__}')
+            elif choices is not None and value not in choices:
+                reasons.append(f'недопустимое значение "{name}": {value}')
+        return reasons
+
+    def validate(self, response):
+        """Проверка ответа, возвращает годные и отклонённые работы."""
+        if not isinstance(response, dict):
+            raise InvalidResponseError(
+                'Ответ API не имеет структуры словаря. '
+                f'Получен тип данных {type(response)}.')
+        reasons = self._check(response, self._envelope)
+        if reasons:
+            raise InvalidResponseError(
+                f'Некорректный ответ API: {"; ".join(reasons)}.')
+        homeworks = response['homeworks']
+        is_valid = self._is_valid_item
+        items = [item for item in homeworks
+                 if item.__class__ is dict and is_valid(item)]
+        if len(items) == len(homeworks):
+            return ValidationResult(items, [])
+        return ValidationResult(items, self._reject(homeworks))
+
+    def _reject(self, homeworks):
+        """Причины отклонения для каждой неподходящей работы."""
+        rejections = []
+        for index, item in enumerate(homeworks):
+            if item.__class__ is not dict:
+                rejections.append(Rejection(
+                    index, item, [f'работа имеет тип {type(item).__name__}']))
+                continue
+            reasons = self._check(item, self._items)
+            if reasons:
+                rejections.append(Rejection(index, item, reasons))
+        return rejections
@@ -0,0 +1,80 @@
+"""Проверка учётных данных получателей при запуске."""
+import logging
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+logger = logging.getLogger(__name__)
+
+
+DEADLINE = 15.0
+WORKERS = 16
+BOT_CHECK = 'telegram_bot'
+# Отказы в доступе: после них повторять проверку бессмысленно.
+AUTH_STATUSES = frozenset((401, 403))
+AUTH_MESSAGES = ('chat not found',)
+
+
+def auth_failure(error):
+    """Является ли ошибка отказом в доступе, а не временным сбоем."""
+    status = getattr(error, 'error_code', None) or getattr(
+        error, 'status_code', None)
+    if status in AUTH_STATUSES:
+        return True
+    text = str(error).lower()
+    return any(message in text for message in AUTH_MESSAGES)
+
+
+class Problem(namedtuple('Problem', ('tenant', 'check', 'error'))):
+    """Проблема, найденная проверкой."""
+
+    @property
+    def fatal(self):
+        """Отказ в доступе; таймауты и ошибки сервера временные."""
+        return auth_failure(self.error)
+
+
+def verify(bot, tenants, check_practicum, deadline=DEADLINE,
+           workers=WORKERS, bot_for=None):
+    """Одновременная проверка бота, чатов и токенов Практикума.
+
+    Для бота вызывается ``getMe``, для каждого получателя - ``getChat``
+    и ``check_practicum(tenant)``; чат проверяется ботом получателя
+    ``bot_for(tenant)``, если он задан. Все проверки ограничены общим
+    сроком ``deadline``; незавершённые к сроку считаются ошибкой.
+    Возвращает список всех найденных проблем.
+    """
+    executor = ThreadPoolExecutor(max_workers=workers,
+                                  thread_name_prefix='verify')
+    checks = {executor.submit(bot.get_me): (None, BOT_CHECK)}
+    for tenant in tenants:
+        tenant_bot = bot_for(tenant) if bot_for else bot
+        checks[executor.submit(tenant_bot.get_chat, tenant.chat_id)] = (
+            tenant, 'telegram_chat')
+        checks[executor.submit(check_practicum, tenant)] = (
+            tenant, 'practicum_token')
+    started = time.monotonic()
+    done, pending = wait(checks, timeout=deadline)
+    # Не ждём зависшие проверки: их результат уже не нужен.
+    executor.shutdown(wait=False, cancel_futures=True)
+    problems = []
+    for future, (tenant, check) in checks.items():
+        if future in pending:
+            error = TimeoutError(f'Проверка не завершилась за {deadline} с.')
+        else:
+            error = future.exception()
+        if error is not None:
+            problems.append(Problem(tenant, check, error))
+    logger.info(f'Проверено получателей: {len(tenants)}, найдено проблем: '
+                f'{len(problems)} за {time.monotonic() - started:.2f} с.')
+    return problems
+
+
+def quarantine(tenants, problems):
+    """Пометка получателей с отказом в доступе; возвращает исправных."""
+    for problem in problems:
+        if problem.tenant is not None and problem.fatal:
+            problem.tenant.quarantined = (
+                f'{problem.check}: {problem.error}')
+    return [tenant for tenant in tenants if not tenant.quarantined]